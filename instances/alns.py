@@ -0,0 +1,277 @@
+# Búsqueda de vecindario grande adaptativa (ALNS): destruir y reparar
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Miles de swaps al azar mueven a dos empleados por vez. Aquí cada iteración
+# libera una parte de la asignación (una zona en un día, los miembros de un
+# grupo en toda la semana, un subconjunto al azar de un día o un bloque
+# grupo-zona) y la reconstruye con un flujo de costo mínimo sobre los mismos
+# datos que usa el constructivo: acierto de preferencia >> sentarse en la zona
+# donde más se sienta el grupo >> costo convexo de ocupación por zona (como
+# `flow_day` de staged.py, pero sólo sobre los empleados liberados). La
+# reparación nunca pierde C1 porque la asignación anterior es factible en la
+# red. El operador grupo-zona es el que mueve C2: libera a un grupo y a los
+# ocupantes de una zona y fuerza esa zona como objetivo del grupo, así que el
+# bloque completo se puede reunir de una vez.
+#
+# Al estilo de Ropke y Pisinger (2006), cada operador de destrucción tiene un
+# peso que se actualiza por segmentos según lo que consiguió (nuevo mejor,
+# mejora de la actual, peor aceptado o lateral) y se elige por ruleta. La
+# aceptación es de recocido: una reparación peor se acepta con probabilidad
+# exp(delta/T), con T en unidades de C2 bajando geométricamente. El tamaño de
+# la destrucción (nivel) crece cuando la búsqueda se estanca y vuelve a 1 con
+# cada nuevo mejor.
+
+import math
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from deadline import Clock
+from lex_objective import LexObjective
+from min_cost_flow import MinCostFlow
+from problem_index import NO_DESK, ProblemIndex, Score, compile_instance
+from staged import group_targets
+
+# Puntos por resultado: nuevo mejor, mejora de la actual, peor aceptado por
+# el recocido y lateral (otra solución con el mismo puntaje). Una reparación
+# que reconstruye exactamente la misma solución no suma puntos.
+SIGMA_BEST, SIGMA_IMPROVED, SIGMA_WORSE, SIGMA_LATERAL = 33, 9, 3, 1
+
+Rows = List[List[int]]
+# día -> (empleados liberados, zona forzada por grupo para la reparación)
+Destroyed = Dict[int, Tuple[List[int], Dict[int, int]]]
+
+
+def repair_day(index: ProblemIndex, day: int, row: List[int], freed: List[int], targets: List[int]) -> None:
+    """
+    Vuelve a sentar en sitio a los empleados `freed` (ya sin escritorio en
+    `row`) en los escritorios libres del día con un flujo de costo mínimo.
+    """
+    if not freed:
+        return
+    desk_zone, emp_group, prefs = index.desk_zone, index.emp_group, index.prefs
+    n_zones = len(index.zones)
+    used = set(row)
+    desks = [d for d in range(index.n_listed_desks) if d not in used]
+    fixed_occ = [0] * n_zones
+    for d in row:
+        if d >= 0 and desk_zone[d] >= 0:
+            fixed_occ[desk_zone[d]] += 1
+    cap = [0] * n_zones
+    for d in desks:
+        if desk_zone[d] >= 0:
+            cap[desk_zone[d]] += 1
+
+    # Pesos lexicográficos: cada nivel supera la suma máxima del siguiente
+    n_p = len(index.present_list[day]) or len(freed)
+    w3 = 1
+    w2 = n_p * n_p + 1
+    w1 = w2 * (len(freed) + 1)
+
+    s, t = 0, 1
+    emp0 = 2
+    desk0 = emp0 + len(freed)
+    occ0 = desk0 + len(desks)
+    net = MinCostFlow(occ0 + n_zones)
+    arcs = []
+    for k, e in enumerate(freed):
+        net.add_edge(s, emp0 + k, 1, 0)
+        g = emp_group[e]
+        tz = targets[g] if g >= 0 else -1
+        pe = prefs[e]
+        for j, d in enumerate(desks):
+            bonus = (w1 if d in pe else 0) + (w2 if tz >= 0 and desk_zone[d] == tz else 0)
+            arcs.append((e, d, net.add_edge(emp0 + k, desk0 + j, 1, -bonus)))
+    for j, d in enumerate(desks):
+        z = desk_zone[d]
+        net.add_edge(desk0 + j, occ0 + z if z >= 0 else t, 1, 0)
+    # La k-ésima persona nueva en la zona z cuesta 2(ocupación fija + k) - 1
+    for z in range(n_zones):
+        for k in range(1, cap[z] + 1):
+            net.add_edge(occ0 + z, t, 1, w3 * (2 * (fixed_occ[z] + k) - 1))
+    net.solve(s, t, len(freed))
+    for e, d, arc in arcs:
+        if net.flow_on(arc):
+            row[e] = d
+
+
+# ---------- Operadores de destrucción ----------
+# Reciben (índice, filas, rng, nivel) y devuelven {día: (empleados liberados,
+# zona forzada por grupo)}.
+
+def destroy_zone_day(index: ProblemIndex, rows: Rows, rng: random.Random, level: int) -> Destroyed:
+    """Libera a quienes se sientan en `level` zonas al azar de un día."""
+    day = rng.randrange(index.n_days)
+    row = rows[day]
+    zones = sorted({index.desk_zone[d] for d in row if d >= 0 and index.desk_zone[d] >= 0})
+    chosen = set(rng.sample(zones, min(level, len(zones))))
+    return {day: ([e for e, d in enumerate(row) if d >= 0 and index.desk_zone[d] in chosen], {})}
+
+
+def destroy_group_week(index: ProblemIndex, rows: Rows, rng: random.Random, level: int) -> Destroyed:
+    """Libera a los miembros de `level` grupos al azar en todos los días."""
+    if not index.groups:
+        return {}
+    groups = rng.sample(range(len(index.groups)), min(level, len(index.groups)))
+    members = [e for g in groups for e in index.group_members[g]]
+    return {day: ([e for e in members if row[e] >= 0], {}) for day, row in enumerate(rows)}
+
+
+def destroy_random_desks(index: ProblemIndex, rows: Rows, rng: random.Random, level: int,
+                         base: int = 4) -> Destroyed:
+    """Libera `level * base` empleados sentados al azar de un día."""
+    day = rng.randrange(index.n_days)
+    seated = [e for e, d in enumerate(rows[day]) if d >= 0]
+    return {day: (rng.sample(seated, min(level * base, len(seated))), {})}
+
+
+def destroy_group_zone(index: ProblemIndex, rows: Rows, rng: random.Random, level: int) -> Destroyed:
+    """
+    Bloques grupo-zona: en un día, para `level` grupos al azar, libera a sus
+    miembros y a quienes ocupan la zona elegida (la de un miembro al azar,
+    así que pesan más las zonas donde el grupo ya está) sin ser del grupo.
+    La reparación apunta ese grupo a esa zona: el bloque se puede reunir
+    aunque la zona estuviera llena de otros.
+    """
+    day = rng.randrange(index.n_days)
+    row = rows[day]
+    desk_zone, emp_group = index.desk_zone, index.emp_group
+    seated = {}
+    for e, d in enumerate(row):
+        if d >= 0 and emp_group[e] >= 0 and desk_zone[d] >= 0:
+            seated.setdefault(emp_group[e], []).append(e)
+    if not seated:
+        return {}
+    groups = rng.sample(sorted(seated), min(level, len(seated)))
+    forced = {g: desk_zone[row[rng.choice(seated[g])]] for g in groups}
+    zones = set(forced.values())
+    freed = [e for e, d in enumerate(row)
+             if d >= 0 and (emp_group[e] in forced or desk_zone[d] in zones)]
+    return {day: (freed, forced)}
+
+
+DESTROY_OPERATORS: Dict[str, Callable[[ProblemIndex, Rows, random.Random, int], Destroyed]] = {
+    "zone_day": destroy_zone_day,
+    "group_week": destroy_group_week,
+    "random_desks": destroy_random_desks,
+    "group_zone": destroy_group_zone,
+}
+
+
+def _add(a: Score, b: Score) -> Score:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def _sub(a: Score, b: Score) -> Score:
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def alns(instance: dict,
+         initial: Dict[str, Dict[str, Optional[str]]],
+         iters: int = 1000,
+         seed: Optional[int] = None,
+         segment: int = 25,
+         reaction: float = 0.3,
+         max_level: int = 4,
+         stall: int = 30,
+         t_start: float = 1.0,
+         t_end: float = 0.05,
+         deadline: Optional[float] = None,
+         stats: Optional[dict] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    ALNS desde `initial`: `iters` iteraciones de destruir (operador elegido
+    por ruleta según su peso) y reparar con flujo de costo mínimo. Se acepta
+    la reparación si no empeora la solución actual (orden lexicográfico) y,
+    si empeora, con probabilidad exp(delta/T): T baja de `t_start` a `t_end`
+    (en unidades de C2) a lo largo de las iteraciones.
+    Cada `segment` iteraciones el peso de cada operador se mueve una fracción
+    `reaction` hacia sus puntos promedio del segmento. El nivel de
+    destrucción sube (hasta `max_level`) tras `stall` iteraciones sin nuevo
+    mejor y vuelve a 1 con cada nuevo mejor. Si se pasa `stats` (dict), se
+    llena con usos, resultados y peso final por operador.
+    """
+    rng = random.Random(seed)
+    index = compile_instance(instance)
+    rows = index.encode(initial)
+    day_scores = [index.score_day(row) for row in rows]
+    current = (sum(s[0] for s in day_scores), sum(s[1] for s in day_scores), sum(s[2] for s in day_scores))
+    best, best_rows = current, [row[:] for row in rows]
+
+    names = list(DESTROY_OPERATORS)
+    weights = [1.0] * len(names)
+    seg_points = [0.0] * len(names)
+    seg_uses = [0] * len(names)
+    totals = {name: {"uses": 0, "best": 0, "improved": 0, "worse": 0, "lateral": 0, "unchanged": 0, "rejected": 0} for name in names}
+    objective = LexObjective(index)
+    # Temperatura en unidades de C2: perder un punto de C2 se acepta con
+    # probabilidad exp(-1/t); perder C1 (peso w1) nunca en la práctica
+    t0, t1 = t_start * objective.w2, t_end * objective.w2
+    level, since_best = 1, 0
+    # Cada reparación resuelve un flujo: se consulta el reloj en cada iteración
+    clock = Clock(deadline, every=1)
+
+    for it in range(iters if index.n_days else 0):
+        if clock.expired():
+            break
+        k = rng.choices(range(len(names)), weights=weights)[0]
+        destroyed = DESTROY_OPERATORS[names[k]](index, rows, rng, level)
+        saved = {day: (rows[day][:], day_scores[day]) for day in destroyed}
+        candidate = current
+        for day, (freed, forced) in destroyed.items():
+            row = rows[day]
+            targets = group_targets(index, row)
+            for g, z in forced.items():
+                targets[g] = z
+            for e in freed:
+                row[e] = NO_DESK
+            repair_day(index, day, row, freed, targets)
+            new_score = index.score_day(row)
+            candidate = _add(candidate, _sub(new_score, day_scores[day]))
+            day_scores[day] = new_score
+
+        stat = totals[names[k]]
+        stat["uses"] += 1
+        seg_uses[k] += 1
+        if candidate > best:
+            outcome, points = "best", SIGMA_BEST
+            level, since_best = 1, 0
+        else:
+            since_best += 1
+            if since_best >= stall:
+                level, since_best = min(level + 1, max_level), 0
+            if candidate > current:
+                outcome, points = "improved", SIGMA_IMPROVED
+            elif candidate == current:
+                if all(rows[day] == row for day, (row, _) in saved.items()):
+                    outcome, points = "unchanged", 0
+                else:
+                    outcome, points = "lateral", SIGMA_LATERAL
+            else:
+                T = t0 * (t1 / t0) ** (it / max(1, iters - 1))
+                delta = objective.delta(_sub(candidate, current))
+                outcome, points = ("worse", SIGMA_WORSE) if rng.random() < math.exp(delta / T) else (None, 0)
+        if outcome is not None:
+            stat[outcome] += 1
+            seg_points[k] += points
+            current = candidate
+            if outcome == "best":
+                best, best_rows = candidate, [row[:] for row in rows]
+        else:
+            stat["rejected"] += 1
+            for day, (row, score) in saved.items():
+                rows[day] = row
+                day_scores[day] = score
+
+        if (it + 1) % segment == 0:
+            for i in range(len(names)):
+                if seg_uses[i]:
+                    weights[i] = (1 - reaction) * weights[i] + reaction * seg_points[i] / seg_uses[i]
+                weights[i] = max(weights[i], 0.1)
+            seg_points = [0.0] * len(names)
+            seg_uses = [0] * len(names)
+
+    if stats is not None:
+        for name, w in zip(names, weights):
+            stats[name] = dict(totals[name], weight=round(w, 3))
+        stats["level"] = level
+    return index.decode(best_rows)
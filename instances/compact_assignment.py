@@ -0,0 +1,136 @@
+# Representación compacta de una asignación semanal
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Las entregas representan una solución como `día -> empleado -> escritorio`
+# (dict de dicts con strings). Copiarla por cada vecino es lo que más memoria y
+# tiempo gastaban SA/ILS/GA; aquí la semana es un único array('i') de
+# días×empleados con el id del escritorio (-1 = sin escritorio).
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from fitness_cache import zobrist_hash, zobrist_key, zobrist_swap
+from problem_index import NO_DESK, ProblemIndex, Score
+
+
+class Assignment:
+    """
+    Asignación semanal sobre los ids de un `ProblemIndex`.
+
+    `swap` y `relocate` modifican la asignación en sitio y registran el
+    movimiento para poder revertirlo con `undo`: un swap queda como
+    (día, a, b) y una reubicación como (día, e, escritorio anterior,
+    escritorio nuevo). `commit` olvida los movimientos registrados (se llama
+    al aceptar un vecino). `snapshot` copia el array (memcpy) sin el
+    registro de movimientos. `zobrist()` calcula el hash de la asignación la
+    primera vez; desde entonces cada swap lo actualiza en O(1).
+    """
+
+    __slots__ = ("index", "seats", "n_employees", "_moves", "_zobrist")
+
+    def __init__(self, index: ProblemIndex, seats: Optional[array] = None):
+        self.index = index
+        self.n_employees = index.n_employees
+        self.seats = seats if seats is not None else array("i", [NO_DESK]) * (index.n_days * index.n_employees)
+        self._moves: List[Tuple[int, ...]] = []
+        self._zobrist: Optional[int] = None
+
+    # ---------- Conversión ----------
+    @classmethod
+    def from_dict(cls, index: ProblemIndex, assignment: Dict[str, Dict[str, Optional[str]]]) -> "Assignment":
+        seats = array("i")
+        for row in index.encode(assignment):
+            seats.extend(row)
+        return cls(index, seats)
+
+    def to_dict(self) -> Dict[str, Dict[str, Optional[str]]]:
+        return self.index.decode(self.rows())
+
+    def rows(self) -> List[array]:
+        n = self.n_employees
+        return [self.seats[day * n:(day + 1) * n] for day in range(self.index.n_days)]
+
+    # ---------- Acceso ----------
+    def desk(self, day: int, e: int) -> int:
+        return self.seats[day * self.n_employees + e]
+
+    def set_desk(self, day: int, e: int, d: int) -> None:
+        cell = day * self.n_employees + e
+        if self._zobrist is not None:
+            self._zobrist ^= zobrist_key(cell, self.seats[cell]) ^ zobrist_key(cell, d)
+        self.seats[cell] = d
+
+    def day_row(self, day: int) -> array:
+        n = self.n_employees
+        return self.seats[day * n:(day + 1) * n]
+
+    def assigned(self, day: int) -> List[int]:
+        """Empleados con escritorio en `day`, en el orden de `Employees`."""
+        base = day * self.n_employees
+        seats = self.seats
+        return [e for e in range(self.n_employees) if seats[base + e] >= 0]
+
+    def score(self) -> Score:
+        return self.index.score(self.rows())
+
+    def day_scores(self) -> List[Score]:
+        """(C1, C2, C3) de cada día; su suma es `score()`."""
+        return [self.index.score_day(row) for row in self.rows()]
+
+    def zobrist(self) -> int:
+        if self._zobrist is None:
+            self._zobrist = zobrist_hash(self.seats)
+        return self._zobrist
+
+    # ---------- Movimientos ----------
+    def swap(self, day: int, a: int, b: int) -> None:
+        base = day * self.n_employees
+        seats = self.seats
+        if self._zobrist is not None:
+            self._zobrist = zobrist_swap(self._zobrist, base + a, base + b, seats[base + a], seats[base + b])
+        seats[base + a], seats[base + b] = seats[base + b], seats[base + a]
+        self._moves.append((day, a, b))
+
+    def relocate(self, day: int, e: int, d: int) -> None:
+        """Mueve al empleado e al escritorio d (libre ese día) en `day`."""
+        old = self.desk(day, e)
+        self.set_desk(day, e, d)
+        self._moves.append((day, e, old, d))
+
+    def undo(self) -> Tuple[int, ...]:
+        """Revierte el último movimiento registrado y lo devuelve."""
+        move = self._moves.pop()
+        if len(move) == 4:
+            day, e, old, _ = move
+            self.set_desk(day, e, old)
+            return move
+        day, a, b = move
+        base = day * self.n_employees
+        seats = self.seats
+        if self._zobrist is not None:
+            self._zobrist = zobrist_swap(self._zobrist, base + a, base + b, seats[base + a], seats[base + b])
+        seats[base + a], seats[base + b] = seats[base + b], seats[base + a]
+        return day, a, b
+
+    def last_move(self) -> Tuple[int, ...]:
+        return self._moves[-1]
+
+    def commit(self) -> None:
+        self._moves.clear()
+
+    # ---------- Copias ----------
+    def snapshot(self) -> "Assignment":
+        copy = Assignment(self.index, array("i", self.seats))
+        copy._zobrist = self._zobrist
+        return copy
+
+    def restore(self, snap: "Assignment") -> None:
+        self.seats[:] = snap.seats
+        self._moves.clear()
+        self._zobrist = snap._zobrist
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Assignment) and self.index is other.index and self.seats == other.seats
+
+    __hash__ = None
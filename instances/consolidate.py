@@ -0,0 +1,131 @@
+# Movimiento compuesto: reunir un grupo en una zona durante un día
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# C2 premia el mayor cluster de cada grupo por día, pero un swap acerca a un
+# solo miembro y a menudo pasa por estados peores que el hill climbing
+# rechaza. "Reunir el grupo g en la zona z el día d" mueve de una vez a todos
+# los miembros que se pueda: cada miembro de fuera de z toma un escritorio de
+# z que esté libre (reubicación) o que ocupe alguien ajeno al grupo (swap: el
+# ocupante se queda con el escritorio del miembro). Qué miembro va a qué
+# escritorio se decide con un emparejamiento pequeño de costo mínimo que
+# primero maximiza los miembros movidos y luego C1, sin aceptar pares que
+# pierdan preferencias. El movimiento se aplica como una secuencia de swaps
+# y reubicaciones sobre `IncrementalEvaluator`, así que su delta es la suma
+# incremental y se revierte con `undo`.
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from compact_assignment import Assignment
+from incremental_eval import IncrementalEvaluator
+from min_cost_flow import MinCostFlow
+from problem_index import Score
+from relocate import FreeDesks
+
+# (miembro, escritorio destino, ocupante desplazado o -1 si el escritorio estaba libre)
+Plan = List[Tuple[int, int, int]]
+
+
+def plan_consolidation(assignment: Assignment, free: FreeDesks, day: int, g: int, z: int) -> Plan:
+    """Emparejamiento miembros de g fuera de z -> escritorios de z libres u ocupados por ajenos al grupo."""
+    index = assignment.index
+    row = assignment.day_row(day)
+    emp_group, desk_zone, prefs = index.emp_group, index.desk_zone, index.prefs
+    members = [e for e in index.group_members[g]
+               if emp_group[e] == g and row[e] >= 0 and desk_zone[row[e]] != z]
+    if not members:
+        return []
+    slots = [(d, -1) for d in free.in_zone(day, z)]
+    slots += [(d, e) for e, d in enumerate(row) if d >= 0 and desk_zone[d] == z and emp_group[e] != g]
+    if not slots:
+        return []
+
+    # Cardinalidad primero: W supera cualquier suma de ganancias de C1 (cada par gana a lo sumo 2)
+    W = 2 * len(members) + 1
+    s, t = 0, 1
+    net = MinCostFlow(2 + len(members) + len(slots))
+    arcs = []
+    for i, m in enumerate(members):
+        net.add_edge(s, 2 + i, 1, 0)
+        dm = row[m]
+        for j, (d, o) in enumerate(slots):
+            gain = (d in prefs[m]) - (dm in prefs[m])
+            if o >= 0:
+                gain += (dm in prefs[o]) - (d in prefs[o])
+            if gain >= 0:
+                arcs.append((m, d, o, net.add_edge(2 + i, 2 + len(members) + j, 1, -(W + gain))))
+    for j in range(len(slots)):
+        net.add_edge(2 + len(members) + j, t, 1, 0)
+    net.solve(s, t, len(members))
+    return [(m, d, o) for m, d, o, arc in arcs if net.flow_on(arc)]
+
+
+def apply_consolidation(evaluator: IncrementalEvaluator, day: int, plan: Plan) -> Score:
+    """
+    Aplica el plan como swaps/reubicaciones registrados (se revierten con
+    `undo_consolidation`) y devuelve su (ΔC1, ΔC2, ΔC3).
+    """
+    before = evaluator.day_score(day)
+    for m, d, o in plan:
+        if o >= 0:
+            evaluator.apply_swap(day, m, o)
+        else:
+            evaluator.apply_relocate(day, m, d)
+    after = evaluator.day_score(day)
+    return (after[0] - before[0], after[1] - before[1], after[2] - before[2])
+
+
+def undo_consolidation(evaluator: IncrementalEvaluator, plan: Plan) -> None:
+    for _ in plan:
+        evaluator.undo()
+
+
+def commit_consolidation(evaluator: IncrementalEvaluator, free: FreeDesks, day: int, plan: Plan,
+                         old_desks: Dict[int, int]) -> None:
+    """Da el movimiento por aceptado y actualiza los escritorios libres de las reubicaciones."""
+    evaluator.commit()
+    for m, d, o in plan:
+        if o < 0:
+            free.move(day, old_desks[m], d)
+
+
+def pick_consolidation(assignment: Assignment, rng: random.Random,
+                       days: List[int]) -> Optional[Tuple[int, int, int]]:
+    """
+    (día, grupo, zona) al azar: la zona es la de un miembro sentado elegido al
+    azar, así que las zonas donde el grupo ya se concentra salen más seguido.
+    None si ese día nadie con grupo está sentado en una zona.
+    """
+    index = assignment.index
+    day = rng.choice(days)
+    row = assignment.day_row(day)
+    seated = [e for e, d in enumerate(row) if d >= 0 and index.emp_group[e] >= 0 and index.desk_zone[d] >= 0]
+    if not seated:
+        return None
+    e = rng.choice(seated)
+    return day, index.emp_group[e], index.desk_zone[row[e]]
+
+
+def try_consolidation(evaluator: IncrementalEvaluator, free: FreeDesks, rng: random.Random,
+                      days: List[int], accept=None) -> Optional[Score]:
+    """
+    Propone un movimiento de reunión al azar y lo conserva si `accept(delta)`
+    (por defecto, si mejora estrictamente en orden lexicográfico). Devuelve
+    el delta aceptado o None si no hubo movimiento o se rechazó.
+    """
+    S = evaluator.assignment
+    move = pick_consolidation(S, rng, days)
+    if move is None:
+        return None
+    day, g, z = move
+    plan = plan_consolidation(S, free, day, g, z)
+    if not plan:
+        return None
+    old_desks = {m: S.desk(day, m) for m, _, _ in plan}
+    delta = apply_consolidation(evaluator, day, plan)
+    if (accept(delta) if accept is not None else delta > (0, 0, 0)):
+        commit_consolidation(evaluator, free, day, plan, old_desks)
+        return delta
+    undo_consolidation(evaluator, plan)
+    return None
@@ -0,0 +1,110 @@
+# Método constructivo aleatorizado sobre la instancia compilada
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import random
+from collections import Counter, defaultdict
+from typing import List
+
+from matching import UNMATCHED, hopcroft_karp
+from problem_index import NO_DESK, ProblemIndex
+
+
+def constructive_rows(index: ProblemIndex, seed: int = 42, randomize: bool = True, top_k_pref: int = 3) -> List[List[int]]:
+    """
+    Mismo constructivo de las entregas (top-k preferencias dentro de la zona
+    objetivo del grupo), pero sobre ids enteros. Consume el generador aleatorio
+    en el mismo orden, así que para una semilla produce la misma asignación.
+    """
+    rng = random.Random(seed)
+    desk_zone, emp_group, pref_list = index.desk_zone, index.emp_group, index.pref_list
+    listed_desks = range(index.n_listed_desks)
+    rows: List[List[int]] = []
+
+    for day in range(index.n_days):
+        present = index.present_list[day][:]
+        if randomize:
+            rng.shuffle(present)
+        row = [NO_DESK] * index.n_employees
+        used_desks = set()
+        group_zone_count = defaultdict(Counter)
+
+        for e in present:
+            g = emp_group[e]
+            target_zone = group_zone_count[g].most_common(1)[0][0] if (g >= 0 and group_zone_count[g]) else None
+
+            pref_avail = [d for d in pref_list[e] if d not in used_desks]
+            pref_avail_target = [d for d in pref_avail if desk_zone[d] == target_zone] if target_zone is not None else pref_avail[:]
+
+            chosen = None
+            if pref_avail_target:
+                chosen = rng.choice(pref_avail_target[:min(top_k_pref, len(pref_avail_target))]) if randomize else pref_avail_target[0]
+            elif pref_avail:
+                chosen = rng.choice(pref_avail[:min(top_k_pref, len(pref_avail))]) if randomize else pref_avail[0]
+            else:
+                free_desks = [d for d in listed_desks if d not in used_desks]
+                free_target = [d for d in free_desks if desk_zone[d] == target_zone] if target_zone is not None else free_desks[:]
+                pool = free_target if free_target else free_desks
+                chosen = rng.choice(pool) if (randomize and pool) else (pool[0] if pool else None)
+
+            if chosen is not None:
+                row[e] = chosen
+                used_desks.add(chosen)
+                if g >= 0 and desk_zone[chosen] >= 0:
+                    group_zone_count[g][desk_zone[chosen]] += 1
+        rows.append(row)
+
+    return rows
+
+
+def c1_optimal_rows(index: ProblemIndex, seed: int = 42, randomize: bool = True, top_k_pref: int = 3) -> List[List[int]]:
+    """
+    Constructivo con C1 óptimo por día: parte de `constructive_rows` y aumenta
+    sus aciertos de preferencia hasta un emparejamiento máximo (Hopcroft–Karp)
+    entre presentes y escritorios preferidos. Quien pierde su escritorio en un
+    camino aumentante conserva el anterior si quedó libre o recibe uno libre,
+    de preferencia en la zona donde más se sienta su grupo ese día.
+    """
+    rows = constructive_rows(index, seed=seed, randomize=randomize, top_k_pref=top_k_pref)
+    return [c1_optimal_day(index, day, row) for day, row in enumerate(rows)]
+
+
+def c1_optimal_day(index: ProblemIndex, day: int, row: List[int]) -> List[int]:
+    """Completa una fila (asignación de un día) a C1 máximo conservando lo posible de ella."""
+    desk_zone, emp_group, prefs = index.desk_zone, index.emp_group, index.prefs
+    present = index.present_list[day]
+    adj = [index.pref_list[e] for e in present]
+    initial = [row[e] if row[e] in prefs[e] else UNMATCHED for e in present]
+    matched = hopcroft_karp(adj, len(index.desks), initial)
+
+    new_row = [NO_DESK] * index.n_employees
+    used_desks = set()
+    for e, d in zip(present, matched):
+        if d != UNMATCHED:
+            new_row[e] = d
+            used_desks.add(d)
+    pending = []
+    for e, d in zip(present, matched):
+        if d == UNMATCHED:
+            if row[e] >= 0 and row[e] not in used_desks:
+                new_row[e] = row[e]
+                used_desks.add(row[e])
+            else:
+                pending.append(e)
+
+    group_zone_count = defaultdict(Counter)
+    for e, d in enumerate(new_row):
+        if d >= 0 and emp_group[e] >= 0 and desk_zone[d] >= 0:
+            group_zone_count[emp_group[e]][desk_zone[d]] += 1
+    free_desks = [d for d in range(index.n_listed_desks) if d not in used_desks]
+    for e in pending:
+        if not free_desks:
+            break
+        g = emp_group[e]
+        target_zone = group_zone_count[g].most_common(1)[0][0] if (g >= 0 and group_zone_count[g]) else None
+        chosen = next((d for d in free_desks if desk_zone[d] == target_zone), free_desks[0])
+        free_desks.remove(chosen)
+        new_row[e] = chosen
+        if g >= 0 and desk_zone[chosen] >= 0:
+            group_zone_count[g][desk_zone[chosen]] += 1
+    return new_row
@@ -0,0 +1,147 @@
+# Vecindario de intercambio cíclico (cadenas de expulsión de largo k)
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Un swap mueve a dos empleados, pero con listas de preferencia que se solapan
+# hay mejoras que sólo existen como ciclos: A toma el escritorio preferido de
+# B, B el de C y C el de A. Cualquier swap intermedio pierde C1 y el hill
+# climbing lo rechaza. Aquí se busca, por día, un ciclo de mejora en el grafo
+# "i toma el escritorio de j". El peso del arco es sustituto y separable:
+# acierto de preferencia ganado o perdido >> entrar o salir de la zona donde
+# más se sienta el grupo (la misma zona objetivo del constructivo). La
+# búsqueda es una DFS de profundidad k con el criterio de ganancia de
+# Lin-Kernighan: todo ciclo de ganancia positiva tiene una rotación cuyas
+# ganancias parciales son todas positivas, así que se podan los caminos cuya
+# suma parcial no es positiva. Cada ciclo candidato se aplica como k-1 swaps
+# sobre `IncrementalEvaluator`: se acepta si el delta exacto (C1, C2, C3)
+# mejora y si no se revierte con `undo`.
+
+from collections import Counter
+from typing import List, Optional
+
+from deadline import Clock
+from incremental_eval import IncrementalEvaluator
+from staged import group_targets
+
+
+def _arc_gains(evaluator: IncrementalEvaluator, day: int, k: int):
+    """
+    Para el día: escritorio de cada empleado sentado, vecinos candidatos de
+    cada uno (quienes ocupan un escritorio que prefiere o uno de la zona
+    objetivo de su grupo) y la función de ganancia del arco i -> j.
+    """
+    index = evaluator.index
+    row = evaluator.assignment.day_row(day)
+    desk_zone, emp_group, prefs = index.desk_zone, index.emp_group, index.prefs
+    targets = group_targets(index, row)
+    # Un acierto de preferencia pesa más que todos los cambios de zona del ciclo
+    W = k + 1
+    occupant = {d: e for e, d in enumerate(row) if d >= 0}
+    by_zone: List[List[int]] = [[] for _ in index.zones]
+    for e, d in enumerate(row):
+        if d >= 0 and desk_zone[d] >= 0:
+            by_zone[desk_zone[d]].append(e)
+
+    def target_of(e: int) -> int:
+        g = emp_group[e]
+        return targets[g] if g >= 0 else -1
+
+    def gain(i: int, j: int) -> int:
+        di, dj = row[i], row[j]
+        pi = prefs[i]
+        w = W * ((dj in pi) - (di in pi))
+        t = target_of(i)
+        if t >= 0:
+            w += (desk_zone[dj] == t) - (desk_zone[di] == t)
+        return w
+
+    neighbors = {}
+    for e in occupant.values():
+        cand = {occupant[d] for d in prefs[e] if d in occupant}
+        t = target_of(e)
+        if t >= 0 and desk_zone[row[e]] != t:
+            cand.update(by_zone[t])
+        cand.discard(e)
+        neighbors[e] = sorted(cand)
+    return neighbors, gain
+
+
+def _apply_cycle(evaluator: IncrementalEvaluator, day: int, cycle: List[int]):
+    """Aplica e_1 -> escritorio de e_2 -> ... -> e_m -> escritorio de e_1 como m-1 swaps y devuelve el delta."""
+    before = evaluator.day_score(day)
+    for a, b in zip(cycle, cycle[1:]):
+        evaluator.apply_swap(day, a, b)
+    after = evaluator.day_score(day)
+    return (after[0] - before[0], after[1] - before[1], after[2] - before[2])
+
+
+def improve_day(evaluator: IncrementalEvaluator, day: int, k: int = 3,
+                clock: Optional[Clock] = None, stats: Optional[Counter] = None) -> bool:
+    """
+    Busca en el día un ciclo de largo 2..k que mejore (C1, C2, C3) y lo
+    aplica. Devuelve True si aplicó uno. `stats` (Counter) cuenta los ciclos
+    evaluados con el delta exacto (cycles_checked) y los aplicados (cycles_applied).
+    """
+    neighbors, gain = _arc_gains(evaluator, day, k)
+    counters = stats if stats is not None else Counter()
+    path: List[int] = []
+    on_path = set()
+
+    def dfs(i: int, partial: int) -> bool:
+        start = path[0]
+        if len(path) >= 2:
+            total = partial + gain(i, start)
+            if total > 0:
+                counters["cycles_checked"] += 1
+                if _apply_cycle(evaluator, day, path) > (0, 0, 0):
+                    evaluator.commit()
+                    counters["cycles_applied"] += 1
+                    return True
+                for _ in range(len(path) - 1):
+                    evaluator.undo()
+        if len(path) == k:
+            return False
+        for j in neighbors[i]:
+            if j in on_path:
+                continue
+            g = partial + gain(i, j)
+            if g <= 0:
+                continue
+            path.append(j)
+            on_path.add(j)
+            found = dfs(j, g)
+            path.pop()
+            on_path.discard(j)
+            if found:
+                return True
+        return False
+
+    for s in sorted(neighbors):
+        if clock is not None and clock.expired():
+            return False
+        path[:] = [s]
+        on_path.clear()
+        on_path.add(s)
+        if dfs(s, 0):
+            return True
+    return False
+
+
+def cyclic_exchange_descent(evaluator: IncrementalEvaluator, days: List[int], k: int = 3,
+                            clock: Optional[Clock] = None, stats: Optional[Counter] = None) -> int:
+    """
+    Descenso por ciclos: recorre los días aplicando ciclos de mejora hasta
+    que una pasada completa no encuentra ninguno (o vence `clock`). Devuelve
+    el número de ciclos aplicados. Es determinista: no consume aleatoriedad.
+    """
+    applied = 0
+    improved = True
+    while improved:
+        improved = False
+        for day in days:
+            while improve_day(evaluator, day, k, clock, stats):
+                applied += 1
+                improved = True
+            if clock is not None and clock.timed_out:
+                return applied
+    return applied
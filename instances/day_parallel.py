@@ -0,0 +1,62 @@
+# Resolución por días en paralelo
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# C1, C2 y C3 son sumas de términos por día y todos los movimientos (swaps)
+# ocurren dentro de un mismo día, así que la semana se puede partir en
+# subproblemas de un día, resolverlos en procesos distintos y unir el resultado.
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+Solution = Dict[str, Dict[str, Optional[str]]]
+
+
+def day_instance(instance: dict, day: str) -> dict:
+    """Instancia restringida a un día (el resto de datos se comparte)."""
+    sub = dict(instance)
+    sub["Days"] = [day]
+    return sub
+
+
+def day_budget(total: int, n_days: int) -> int:
+    """
+    Reparte un presupuesto de movimientos pensado para la semana entre sus
+    días (en la semana completa cada día recibe en promedio total/n_días).
+    """
+    return max(1, math.ceil(total / max(1, n_days)))
+
+
+def _run_day(solve_day: Callable, instance: dict, day: str, seed: int,
+             initial: Optional[Solution]) -> Dict[str, Optional[str]]:
+    return solve_day(day_instance(instance, day), initial, seed)[day]
+
+
+def solve_days_parallel(instance: dict,
+                        solve_day: Callable,
+                        seed: int = 42,
+                        initial: Optional[Solution] = None,
+                        workers: Optional[int] = None) -> Solution:
+    """
+    Aplica `solve_day(sub_instancia, sub_inicial, semilla) -> solución` a cada
+    día en un pool de procesos y une las soluciones en el orden de `Days`.
+
+    `solve_day` debe ser una función de nivel de módulo (se envía a los
+    procesos con pickle); para fijar parámetros usar `functools.partial`.
+    El día i usa la semilla `seed + i`, de modo que el resultado no depende
+    del número de procesos. Con `workers=1` se resuelve en el proceso actual.
+    """
+    days: List[str] = list(instance.get("Days", []))
+    run = partial(_run_day, solve_day, instance)
+    seeds = [seed + i for i in range(len(days))]
+    # A cada proceso sólo se le envía su día de la solución inicial
+    initials = [{day: initial[day]} if initial is not None else None for day in days]
+
+    if workers == 1 or len(days) <= 1:
+        results = list(map(run, days, seeds, initials))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or len(days), len(days))) as pool:
+            results = list(pool.map(run, days, seeds, initials))
+    return dict(zip(days, results))
@@ -0,0 +1,42 @@
+# Límite de tiempo (modo "anytime") para los solvers
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Los solvers reciben `deadline`: un instante de `time.monotonic()` (o None
+# para no tener límite). Al vencer devuelven la mejor solución encontrada.
+
+import time
+from typing import Optional
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Instante en que vence un límite de `seconds` segundos (None = sin límite)."""
+    if seconds is None or seconds <= 0:
+        return None
+    return time.monotonic() + seconds
+
+
+class Clock:
+    """
+    Consulta el reloj de forma amortizada: `expired()` sólo lee la hora cada
+    `every` llamadas, así el costo por iteración es un contador. Una vez
+    vencido, `timed_out` queda en True.
+    """
+
+    __slots__ = ("deadline", "every", "timed_out", "_count")
+
+    def __init__(self, deadline: Optional[float], every: int = 256):
+        self.deadline = deadline
+        self.every = max(1, every)
+        self.timed_out = False
+        self._count = 0
+
+    def expired(self) -> bool:
+        if self.deadline is None or self.timed_out:
+            return self.timed_out
+        self._count += 1
+        if self._count < self.every:
+            return False
+        self._count = 0
+        self.timed_out = time.monotonic() >= self.deadline
+        return self.timed_out
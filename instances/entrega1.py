@@ -4,11 +4,26 @@
 # Universidad EAFIT - 2025
 
 import json
+import os
 import random
-from collections import defaultdict, Counter
+import sys
 import math
+from collections import Counter
+from functools import partial
 from typing import Dict, List, Tuple, Optional
 
+sys.path.append(os.path.dirname(__file__))
+from compact_assignment import Assignment
+from constructive import c1_optimal_rows, constructive_rows
+from day_parallel import day_budget, solve_days_parallel
+from deadline import Clock, deadline_after
+from incremental_eval import IncrementalEvaluator
+from lex_objective import lex_objective
+from parallel_tempering import format_exchange_stats, parallel_tempering
+from problem_index import compile_instance
+from relocate import FreeDesks, pick_relocation
+from staged import staged_optimize
+
 
 # ---------- Utilidades ----------
 def build_desk_to_zone(desks_z: Dict[str, List[str]]) -> Dict[str, str]:
@@ -33,137 +48,57 @@ def employees_present_today(day: str, days_e: Dict[str, List[str]], employees: L
 
 
 # ---------- 1) Método constructivo + aleatorización ----------
-def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3) -> Dict[str, Dict[str, Optional[str]]]:
-    rng = random.Random(seed)
-    employees = instance["Employees"]
-    desks = instance["Desks"]
-    days = instance.get("Days", [])
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    days_e = instance.get("Days_E", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-
-    assignment: Dict[str, Dict[str, Optional[str]]] = {day: {} for day in days}
-
-    for day in days:
-        present = employees_present_today(day, days_e, employees)
-        if randomize:
-            rng.shuffle(present)
-        used_desks = set()
-        group_zone_count = defaultdict(Counter)
-
-        for e in present:
-            g = employee_group(e, employees_g)
-            target_zone = group_zone_count[g].most_common(1)[0][0] if (g and group_zone_count[g]) else None
-
-            pref_list = desks_e.get(e, [])
-            pref_avail = [d for d in pref_list if d not in used_desks]
-            pref_avail_target = [d for d in pref_avail if d2z.get(d) == target_zone] if target_zone else pref_avail[:]
-
-            chosen = None
-            if pref_avail_target:
-                chosen = rng.choice(pref_avail_target[:min(top_k_pref, len(pref_avail_target))]) if randomize else pref_avail_target[0]
-            elif pref_avail:
-                chosen = rng.choice(pref_avail[:min(top_k_pref, len(pref_avail))]) if randomize else pref_avail[0]
-            else:
-                free_desks = [d for d in desks if d not in used_desks]
-                free_target = [d for d in free_desks if d2z.get(d) == target_zone] if target_zone else free_desks[:]
-                pool = free_target if free_target else free_desks
-                chosen = rng.choice(pool) if (randomize and pool) else (pool[0] if pool else None)
-
-            assignment[day][e] = chosen
-            if chosen:
-                used_desks.add(chosen)
-                if g:
-                    z = d2z.get(chosen)
-                    if z:
-                        group_zone_count[g][z] += 1
-
-        for e in employees:
-            assignment[day].setdefault(e, None)
-
-    return assignment
+def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3,
+                            c1_optimal: bool = False) -> Dict[str, Dict[str, Optional[str]]]:
+    """Con `c1_optimal=True` el constructivo se completa a C1 máximo por día (Hopcroft–Karp)."""
+    index = compile_instance(instance)
+    build = c1_optimal_rows if c1_optimal else constructive_rows
+    return index.decode(build(index, seed=seed, randomize=randomize, top_k_pref=top_k_pref))
 
 
 # ---------- 2) Puntaje lexicográfico ----------
 def score_solution_lex(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, int, int]:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
-
-    c1_pref_hits, c2_group_cohesion, c3_balance = 0, 0, 0
-
-    for day in days:
-        # C1: preferencias
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1_pref_hits += 1
-
-        # C2: cohesión de grupos
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2_group_cohesion += z_count.most_common(1)[0][1]
-
-        # C3: balance zonas
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3_balance += -(mx - mn)
-
-    return (c1_pref_hits, c2_group_cohesion, c3_balance)
-
-
-def _lex_to_scalar(score: Tuple[int, int, int]) -> int:
-    """Convierte el puntaje (C1, C2, C3) a un escalar para comparar en SA."""
-    c1, c2, c3 = score
-    return c1 * 10000 + c2 * 100 + c3
+    index = compile_instance(instance)
+    return index.score(index.encode(assignment))
 
 
 # ---------- 3) Búsqueda local por swaps ----------
-def local_search_swaps(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]],iters: int = 500, seed: int = 123) -> Dict[str, Dict[str, Optional[str]]]:
+def local_search_swaps(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]],iters: int = 500, seed: int = 123,
+                       stats: Optional[Counter] = None,
+                       deadline: Optional[float] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Hill climbing por swaps. Si se pasa `stats` (Counter), se le suman los
+    contadores de la evaluación perezosa (swaps evaluados y cálculos de C2/C3
+    omitidos). Con `deadline` (instante de `time.monotonic()`) se detiene al
+    vencer y devuelve la mejor solución hasta ese momento.
+    """
     rng = random.Random(seed)
-    # copia profunda "barata"
-    best = {day: m.copy() for day, m in assignment.items()}
-    best_score = score_solution_lex(instance, best)
+    index = compile_instance(instance)
+    # Se trabaja sobre la asignación compacta; los swaps se aplican en sitio
+    best = Assignment.from_dict(index, assignment)
+    evaluator = IncrementalEvaluator(best)
 
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    days = list(range(index.n_days))
+    # Un swap no cambia quién está sentado cada día
+    assigned = [best.assigned(day) for day in days]
+    clock = Clock(deadline)
 
     for _ in range(iters):
-        if not days:
+        if not days or clock.expired():
             break
         day = rng.choice(days)
-        assigned_today = [e for e in employees if best[day].get(e) is not None]
+        assigned_today = assigned[day]
         if len(assigned_today) < 2:
             continue
         a, b = rng.sample(assigned_today, 2)
 
-        new = {d: m.copy() for d, m in best.items()}
-        new[day][a], new[day][b] = new[day][b], new[day][a]
-
-        new_score = score_solution_lex(instance, new)
-        if new_score > best_score:  # comparación lexicográfica
-            best, best_score = new, new_score
+        if evaluator.swap_improves(day, a, b):  # mejora lexicográfica (evaluación perezosa)
+            evaluator.apply_swap(day, a, b)
+            evaluator.commit()
 
-    return best
+    if stats is not None:
+        stats.update(evaluator.counters)
+    return best.to_dict()
 
 
 def simulated_annealing_swaps(instance: dict,
@@ -172,47 +107,78 @@ def simulated_annealing_swaps(instance: dict,
                               t_inicial: float = 200.0,
                               t_final: float = 1.0,
                               alpha: float = 0.95,
-                              seed: int = 123) -> Dict[str, Dict[str, Optional[str]]]:
+                              seed: int = 123,
+                              deadline: Optional[float] = None,
+                              relocate_prob: float = 0.0) -> Dict[str, Dict[str, Optional[str]]]:
     """
     Metaheurística basada en búsqueda local (recocido simulado con swaps).
     Parte de la solución constructiva y aplica intercambios aceptando
-    empeoramientos con probabilidad controlada por la temperatura.
+    empeoramientos con probabilidad controlada por la temperatura. Con
+    `deadline` se detiene al vencer y devuelve la mejor solución encontrada.
+    Con `relocate_prob` > 0, esa fracción de los vecinos mueve a un empleado
+    a un escritorio libre en lugar de intercambiar dos.
     """
     rng = random.Random(seed)
-    current = {d: m.copy() for d, m in assignment.items()}
-    best = {d: m.copy() for d, m in assignment.items()}
-    current_score = score_solution_lex(instance, current)
-    best_score = current_score
-    current_val = _lex_to_scalar(current_score)
+    index = compile_instance(instance)
+    current = Assignment.from_dict(index, assignment)
+    best = current.snapshot()
+    evaluator = IncrementalEvaluator(current)
+    # Escalar lexicográfico con pesos según las cotas de la instancia (válido aunque C2 > 99)
+    objective = lex_objective(instance)
+    current_val = objective.scalar(evaluator.score)
     best_val = current_val
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    days = list(range(index.n_days))
+    assigned = [current.assigned(day) for day in days]
+    free = FreeDesks(current) if relocate_prob else None
     T = t_inicial
+    clock = Clock(deadline)
 
-    while T > t_final and days:
+    while T > t_final and days and not clock.timed_out:
         for _ in range(iters_per_temp):
+            if clock.expired():
+                break
+            if relocate_prob and rng.random() < relocate_prob:
+                move = pick_relocation(current, free, rng, assigned, days)
+                if move is None:
+                    continue
+                day, e, d = move
+                old = current.desk(day, e)
+                delta = objective.delta(evaluator.relocate_delta(day, e, d))
+                if delta > 0 or rng.random() < math.exp(delta / T):
+                    evaluator.apply_relocate(day, e, d)
+                    evaluator.commit()
+                    free.move(day, old, d)
+                    current_val += delta
+                    if current_val > best_val:
+                        best = current.snapshot()
+                        best_val = current_val
+                continue
             day = rng.choice(days)
-            assigned_today = [e for e in employees if current[day].get(e) is not None]
+            assigned_today = assigned[day]
             if len(assigned_today) < 2:
                 continue
             a, b = rng.sample(assigned_today, 2)
-            neighbor = {d: m.copy() for d, m in current.items()}
-            neighbor[day][a], neighbor[day][b] = neighbor[day][b], neighbor[day][a]
-            neighbor_score = score_solution_lex(instance, neighbor)
-            neighbor_val = _lex_to_scalar(neighbor_score)
-            delta = neighbor_val - current_val
+            delta = objective.delta(evaluator.swap_delta(day, a, b))
 
             if delta > 0 or rng.random() < math.exp(delta / T):
-                current = neighbor
-                current_score = neighbor_score
-                current_val = neighbor_val
-                if neighbor_val > best_val:
-                    best = {d: m.copy() for d, m in current.items()}
-                    best_score = neighbor_score
-                    best_val = neighbor_val
+                evaluator.apply_swap(day, a, b)
+                evaluator.commit()
+                current_val += delta
+                if current_val > best_val:
+                    best = current.snapshot()
+                    best_val = current_val
         T *= alpha
 
-    return best
+    return best.to_dict()
+
+
+# Subproblemas de un día para --parallel-days (nivel de módulo: se envían a otros procesos)
+def _solve_day_local(instance: dict, assignment, seed: int, iters: int = 500, deadline: Optional[float] = None):
+    return local_search_swaps(instance, assignment, iters=iters, seed=seed, deadline=deadline)
+
+
+def _solve_day_sa(instance: dict, assignment, seed: int, **sa_params):
+    return simulated_annealing_swaps(instance, assignment, seed=seed, **sa_params)
 
 
 # ---------- 4) Validación y reporte ----------
@@ -254,48 +220,14 @@ def validate_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional
 
 
 def report_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> None:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    index = compile_instance(instance)
 
     total_c1 = total_c2 = total_c3 = 0
     print("Reporte por día:")
-    for day in days:
-        c1 = 0
-        # C1
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1 += 1
-        # C2
-        c2 = 0
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2 += z_count.most_common(1)[0][1]
-        # C3
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        c3 = 0
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3 = -(mx - mn)
-        # conteo asignados
-        assigned = sum(1 for e in employees if assignment[day].get(e) is not None)
+    for day in index.days:
+        row = index.encode_day(assignment[day])
+        c1, c2, c3 = index.score_day(row)
+        assigned = sum(1 for d in row if d >= 0)
         print(f"- {day}: asignados={assigned} | C1={c1} C2={c2} C3={c3}")
         total_c1 += c1
         total_c2 += c2
@@ -324,46 +256,12 @@ def _groups_meeting_day(instance: dict, assignment: Dict[str, Dict[str, Optional
 
 
 def _isolated_employees(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, Dict[str, int]]:
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = _day_order(instance)
-    total = 0
+    # Un empleado se considera aislado si nadie más de su grupo está en su zona ese día
+    index = compile_instance(instance)
     per_day: Dict[str, int] = {}
-    # Preconstruir un mapa empleado->grupo
-    emp2g: Dict[str, Optional[str]] = {}
-    for g, members in employees_g.items():
-        for e in members:
-            emp2g[e] = g
-    for day in days:
-        m = assignment.get(day, {})
-        # Para cada grupo, conteo por zona
-        group_zone = defaultdict(Counter)
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if z:
-                group_zone[g][z] += 1
-        # Un empleado se considera aislado si nadie más de su grupo está en su zona ese día
-        isolated = 0
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if not z:
-                continue
-            if group_zone[g][z] <= 1:
-                isolated += 1
-        per_day[day] = isolated
-        total += isolated
-    return total, per_day
+    for day in _day_order(instance):
+        per_day[day] = index.isolated_day(index.encode_day(assignment.get(day, {})))
+    return sum(per_day.values()), per_day
 
 
 def export_csv_template(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]], export_dir: str) -> None:
@@ -421,6 +319,8 @@ if __name__ == "__main__":
                         help="Carpeta de salida (se creará si no existe)")
     parser.add_argument("--seed", type=int, default=42, help="Semilla para aleatorización")
     parser.add_argument("--top-k", type=int, default=3, help="Top-k preferencias a muestrear")
+    parser.add_argument("--c1-matching", action="store_true",
+                        help="Completa el constructivo a C1 óptimo por día con emparejamiento bipartito (Hopcroft–Karp)")
     
     # Búsqueda local activada por defecto; se puede desactivar con --no-local-search
     parser.add_argument("--local-search", dest="local_search", action="store_true",
@@ -428,13 +328,28 @@ if __name__ == "__main__":
     parser.add_argument("--no-local-search", dest="local_search", action="store_false",
                         help="Desactiva búsqueda local por swaps")
     parser.set_defaults(local_search=True)
-    parser.add_argument("--method", choices=["constructive", "local", "sa"], default=None,
-                        help="Elige el método de mejora: constructivo puro, búsqueda local o recocido (SA). Por defecto usa búsqueda local.")
+    parser.add_argument("--method", choices=["constructive", "local", "sa", "pt", "staged"], default=None,
+                        help="Elige el método de mejora: constructivo puro, búsqueda local, recocido (SA), parallel tempering (PT) o por etapas (C1 por emparejamiento, C2/C3 por flujo de costo mínimo). Por defecto usa búsqueda local.")
     parser.add_argument("--iters", type=int, default=1000, help="Iteraciones de búsqueda local")
     parser.add_argument("--sa-iters", type=int, default=200, help="Iteraciones por temperatura en SA")
     parser.add_argument("--tinit", type=float, default=200.0, help="Temperatura inicial para SA")
     parser.add_argument("--tfinal", type=float, default=1.0, help="Temperatura final para SA")
     parser.add_argument("--alpha", type=float, default=0.95, help="Factor de enfriamiento para SA")
+    parser.add_argument("--relocate-prob", type=float, default=0.0,
+                        help="Fracción de vecinos de SA que mueven a un empleado a un escritorio libre en vez de hacer un swap")
+    parser.add_argument("--replicas", type=int, default=8,
+                        help="Réplicas de PT a temperaturas geométricas entre --tfinal y --tinit")
+    parser.add_argument("--pt-rounds", type=int, default=100, help="Rondas de intercambio de PT")
+    parser.add_argument("--exchange-every", type=int, default=200,
+                        help="Movimientos de cada réplica de PT entre intercambios")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Límite de tiempo en segundos; al vencer se usa la mejor solución encontrada")
+    parser.add_argument("--staged-rounds", type=int, default=10,
+                        help="Perturbaciones de zonas objetivo por día en el método por etapas (los swaps finales usan --iters)")
+    parser.add_argument("--parallel-days", action="store_true",
+                        help="Resuelve cada día por separado en un pool de procesos (las iteraciones se reparten entre los días)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para --parallel-days (por defecto uno por día) o para las réplicas de PT (por defecto una por réplica, hasta los núcleos)")
     parser.add_argument("--stdout", action="store_true",
                         help="Imprime la solución por stdout en lugar de escribir archivo")
     parser.add_argument("--report", action="store_true", help="Imprime un reporte por día y totales")
@@ -468,9 +383,11 @@ if __name__ == "__main__":
     with open(instance_file, "r", encoding="utf-8") as f:
         instance = json.load(f)
 
+    deadline = deadline_after(args.time_limit)
+
     # Construcción inicial
     assignment = constructive_assignment(
-        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k
+        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k, c1_optimal=args.c1_matching
     )
 
     # Determinar método a aplicar
@@ -480,24 +397,72 @@ if __name__ == "__main__":
 
     if method == "local":
         before = score_solution_lex(instance, assignment)
-        assignment = local_search_swaps(instance, assignment, iters=args.iters, seed=args.seed)
+        if args.parallel_days:
+            assignment = solve_days_parallel(
+                instance,
+                partial(_solve_day_local, iters=day_budget(args.iters, len(instance.get("Days", []))), deadline=deadline),
+                seed=args.seed, initial=assignment, workers=args.workers
+            )
+        else:
+            ls_stats = Counter()
+            assignment = local_search_swaps(instance, assignment, iters=args.iters, seed=args.seed, stats=ls_stats,
+                                            deadline=deadline)
+            print("[Búsqueda local] Swaps evaluados: {}, cálculos de C2 omitidos: {}, de C3 omitidos: {}".format(
+                ls_stats["evaluated"], ls_stats["skipped_c2"], ls_stats["skipped_c3"]))
         after = score_solution_lex(instance, assignment)
         print("[Búsqueda local] Puntaje antes (C1, C2, C3):", before)
         print("[Búsqueda local] Puntaje después (C1, C2, C3):", after)
     elif method == "sa":
         before = score_solution_lex(instance, assignment)
-        assignment = simulated_annealing_swaps(
+        if args.parallel_days:
+            assignment = solve_days_parallel(
+                instance,
+                partial(_solve_day_sa, iters_per_temp=day_budget(args.sa_iters, len(instance.get("Days", []))),
+                        t_inicial=args.tinit, t_final=args.tfinal, alpha=args.alpha, deadline=deadline,
+                        relocate_prob=args.relocate_prob),
+                seed=args.seed, initial=assignment, workers=args.workers
+            )
+        else:
+            assignment = simulated_annealing_swaps(
+                instance,
+                assignment,
+                iters_per_temp=args.sa_iters,
+                t_inicial=args.tinit,
+                t_final=args.tfinal,
+                alpha=args.alpha,
+                seed=args.seed,
+                deadline=deadline,
+                relocate_prob=args.relocate_prob
+            )
+        after = score_solution_lex(instance, assignment)
+        print("[SA] Puntaje antes (C1, C2, C3):", before)
+        print("[SA] Puntaje después (C1, C2, C3):", after)
+    elif method == "pt":
+        before = score_solution_lex(instance, assignment)
+        assignment, pt_stats = parallel_tempering(
             instance,
             assignment,
-            iters_per_temp=args.sa_iters,
-            t_inicial=args.tinit,
-            t_final=args.tfinal,
-            alpha=args.alpha,
-            seed=args.seed
+            replicas=args.replicas,
+            t_min=args.tfinal,
+            t_max=args.tinit,
+            rounds=args.pt_rounds,
+            exchange_every=args.exchange_every,
+            seed=args.seed,
+            deadline=deadline,
+            workers=args.workers
         )
         after = score_solution_lex(instance, assignment)
-        print("[SA] Puntaje antes (C1, C2, C3):", before)
-        print("[SA] Puntaje después (C1, C2, C3):", after)
+        for line in format_exchange_stats(pt_stats):
+            print("[PT]", line)
+        print("[PT] Puntaje antes (C1, C2, C3):", before)
+        print("[PT] Puntaje después (C1, C2, C3):", after)
+    elif method == "staged":
+        before = score_solution_lex(instance, assignment)
+        assignment = staged_optimize(instance, assignment, seed=args.seed, rounds=args.staged_rounds, iters=args.iters,
+                                     deadline=deadline)
+        after = score_solution_lex(instance, assignment)
+        print("[Por etapas] Puntaje antes (C1, C2, C3):", before)
+        print("[Por etapas] Puntaje después (C1, C2, C3):", after)
     else:
         print("[Constructivo] Puntaje (C1, C2, C3):", score_solution_lex(instance, assignment))
 
@@ -9,9 +9,16 @@ import copy
 import os
 import csv
 import sys
-from collections import defaultdict, Counter
 from typing import Dict, List, Tuple, Optional
 
+sys.path.append(os.path.dirname(__file__))
+from compact_assignment import Assignment
+from constructive import c1_optimal_rows, constructive_rows
+from deadline import Clock, deadline_after
+from lex_objective import lex_objective
+from problem_index import compile_instance
+from sa_vectorized import HAS_NUMPY, multi_chain_sa
+
 # --- Utilidades y funciones auxiliares (idénticas a entrega1.py) ---
 def build_desk_to_zone(desks_z: Dict[str, List[str]]) -> Dict[str, str]:
     d2z = {}
@@ -31,94 +38,21 @@ def employees_present_today(day: str, days_e: Dict[str, List[str]], employees: L
         return employees[:]
     return [e for e in employees if day in days_e.get(e, [])]
 
-def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3) -> Dict[str, Dict[str, Optional[str]]]:
-    rng = random.Random(seed)
-    employees = instance["Employees"]
-    desks = instance["Desks"]
-    days = instance.get("Days", [])
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    days_e = instance.get("Days_E", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-
-    assignment: Dict[str, Dict[str, Optional[str]]] = {day: {} for day in days}
-
-    for day in days:
-        present = employees_present_today(day, days_e, employees)
-        if randomize:
-            rng.shuffle(present)
-        used_desks = set()
-        group_zone_count = defaultdict(Counter)
-
-        for e in present:
-            g = employee_group(e, employees_g)
-            target_zone = group_zone_count[g].most_common(1)[0][0] if (g and group_zone_count[g]) else None
-
-            pref_list = desks_e.get(e, [])
-            pref_avail = [d for d in pref_list if d not in used_desks]
-            pref_avail_target = [d for d in pref_avail if d2z.get(d) == target_zone] if target_zone else pref_avail[:]
-
-            chosen = None
-            if pref_avail_target:
-                chosen = rng.choice(pref_avail_target[:min(top_k_pref, len(pref_avail_target))]) if randomize else pref_avail_target[0]
-            elif pref_avail:
-                chosen = rng.choice(pref_avail[:min(top_k_pref, len(pref_avail))]) if randomize else pref_avail[0]
-            else:
-                free_desks = [d for d in desks if d not in used_desks]
-                free_target = [d for d in free_desks if d2z.get(d) == target_zone] if target_zone else free_desks[:]
-                pool = free_target if free_target else free_desks
-                chosen = rng.choice(pool) if (randomize and pool) else (pool[0] if pool else None)
-
-            assignment[day][e] = chosen
-            if chosen:
-                used_desks.add(chosen)
-                if g:
-                    z = d2z.get(chosen)
-                    if z:
-                        group_zone_count[g][z] += 1
-
-        for e in employees:
-            assignment[day].setdefault(e, None)
-
-    return assignment
+def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3,
+                            c1_optimal: bool = False) -> Dict[str, Dict[str, Optional[str]]]:
+    """Con `c1_optimal=True` el constructivo se completa a C1 máximo por día (Hopcroft–Karp)."""
+    index = compile_instance(instance)
+    build = c1_optimal_rows if c1_optimal else constructive_rows
+    return index.decode(build(index, seed=seed, randomize=randomize, top_k_pref=top_k_pref))
 
 def score_solution_lex(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, int, int]:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    index = compile_instance(instance)
+    return index.score(index.encode(assignment))
 
-    c1_pref_hits, c2_group_cohesion, c3_balance = 0, 0, 0
-
-    for day in days:
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1_pref_hits += 1
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2_group_cohesion += z_count.most_common(1)[0][1]
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3_balance += -(mx - mn)
-    return (c1_pref_hits, c2_group_cohesion, c3_balance)
+def make_lex_evaluator(instance: dict):
+    """Evaluador escalar para SA: respeta el orden lexicográfico aunque C2 o |C3| pasen de 99."""
+    objective = lex_objective(instance)
+    return lambda s: objective.scalar(score_solution_lex(instance, s))
 
 
 # ---------- Validación, reporte y exportación ----------
@@ -142,43 +76,12 @@ def _groups_meeting_day(instance: dict, assignment: Dict[str, Dict[str, Optional
 
 
 def _isolated_employees(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, Dict[str, int]]:
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = _day_order(instance)
-    total = 0
+    # Un empleado se considera aislado si nadie más de su grupo está en su zona ese día
+    index = compile_instance(instance)
     per_day: Dict[str, int] = {}
-    emp2g: Dict[str, Optional[str]] = {}
-    for g, members in employees_g.items():
-        for e in members:
-            emp2g[e] = g
-    for day in days:
-        m = assignment.get(day, {})
-        group_zone = defaultdict(Counter)
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if z:
-                group_zone[g][z] += 1
-        isolated = 0
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if not z:
-                continue
-            if group_zone[g][z] <= 1:
-                isolated += 1
-        per_day[day] = isolated
-        total += isolated
-    return total, per_day
+    for day in _day_order(instance):
+        per_day[day] = index.isolated_day(index.encode_day(assignment.get(day, {})))
+    return sum(per_day.values()), per_day
 
 
 def validate_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[bool, List[str]]:
@@ -214,44 +117,14 @@ def validate_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional
 
 
 def report_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> None:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    index = compile_instance(instance)
 
     total_c1 = total_c2 = total_c3 = 0
     print("Reporte por día:")
-    for day in days:
-        c1 = 0
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1 += 1
-        c2 = 0
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2 += z_count.most_common(1)[0][1]
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        c3 = 0
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3 = -(mx - mn)
-        assigned = sum(1 for e in employees if assignment[day].get(e) is not None)
+    for day in index.days:
+        row = index.encode_day(assignment[day])
+        c1, c2, c3 = index.score_day(row)
+        assigned = sum(1 for d in row if d >= 0)
         print(f"- {day}: asignados={assigned} | C1={c1} C2={c2} C3={c3}")
         total_c1 += c1
         total_c2 += c2
@@ -298,8 +171,9 @@ def export_csv_template(instance: dict, assignment: Dict[str, Dict[str, Optional
 def generar_vecino_swap(assignment, instance):
     days = instance.get("Days", [])
     employees = instance.get("Employees", [])
-    # Usar random global, no crear nueva instancia cada vez
-    new = {d: m.copy() for d, m in assignment.items()}
+    # Usar random global, no crear nueva instancia cada vez.
+    # El vecino comparte con `assignment` los días que no cambian: sólo se copia el día del swap.
+    new = dict(assignment)
     if not days:
         return new
     day = random.choice(days)
@@ -307,7 +181,8 @@ def generar_vecino_swap(assignment, instance):
     if len(assigned_today) < 2:
         return new
     a, b = random.sample(assigned_today, 2)
-    new[day][a], new[day][b] = new[day][b], new[day][a]
+    new[day] = seats = assignment[day].copy()
+    seats[a], seats[b] = seats[b], seats[a]
     return new
 
 def generar_vecino_swap_simple(assignment):
@@ -317,34 +192,49 @@ def generar_vecino_swap_simple(assignment):
         return copy.deepcopy(assignment)
     day = random.choice(days)
     employees = list(assignment[day].keys())
-    new = {d: m.copy() for d, m in assignment.items()}
+    new = dict(assignment)
     if len(employees) < 2:
         return new
     a, b = random.sample(employees, 2)
-    new[day][a], new[day][b] = new[day][b], new[day][a]
+    new[day] = seats = assignment[day].copy()
+    seats[a], seats[b] = seats[b], seats[a]
     return new
 
 
+def _copiar_solucion(solucion):
+    """Copia barata: `snapshot` para `Assignment`, copia por día para el dict clásico."""
+    if isinstance(solucion, Assignment):
+        return solucion.snapshot()
+    if isinstance(solucion, dict):
+        return {d: m.copy() for d, m in solucion.items()}
+    return copy.deepcopy(solucion)
+
+
 def simulated_annealing(solucion_inicial, evaluar, generar_vecino,
-                        T_inicial=200.0, T_final=1.0, alpha=0.95, iter_por_temp=100):
-    S = copy.deepcopy(solucion_inicial)
-    mejor = copy.deepcopy(S)
+                        T_inicial=200.0, T_final=1.0, alpha=0.95, iter_por_temp=100, deadline=None):
+    # deadline: instante de time.monotonic(); al vencer se devuelve la mejor solución
+    clock = Clock(deadline, every=16)
+    S = _copiar_solucion(solucion_inicial)
+    mejor = _copiar_solucion(S)
     valor_S = evaluar(S)
     valor_mejor = valor_S
     T = T_inicial
 
-    while T > T_final:
+    while T > T_final and not clock.timed_out:
         for _ in range(iter_por_temp):
+            if clock.expired():
+                break
             vecino = generar_vecino(S)
             valor_vecino = evaluar(vecino)
             delta = valor_vecino - valor_S
 
             if delta > 0 or random.random() < math.exp(delta / T):
-                S = copy.deepcopy(vecino)
+                # El vecino ya es un objeto nuevo: no hace falta copiarlo al aceptarlo
+                S = vecino
                 valor_S = valor_vecino
 
                 if valor_S > valor_mejor:
-                    mejor = copy.deepcopy(S)
+                    mejor = _copiar_solucion(S)
                     valor_mejor = valor_S
 
         T *= alpha
@@ -362,10 +252,16 @@ if __name__ == "__main__":
                         help="Carpeta de salida (se creará si no existe)")
     parser.add_argument("--seed", type=int, default=42, help="Semilla para aleatorización")
     parser.add_argument("--top-k", type=int, default=3, help="Top-k preferencias a muestrear")
+    parser.add_argument("--c1-matching", action="store_true",
+                        help="Completa el constructivo a C1 óptimo por día con emparejamiento bipartito (Hopcroft–Karp)")
     parser.add_argument("--iters", type=int, default=1000, help="Iteraciones por temperatura")
     parser.add_argument("--tinit", type=float, default=200.0, help="Temperatura inicial")
     parser.add_argument("--tfinal", type=float, default=1.0, help="Temperatura final")
     parser.add_argument("--alpha", type=float, default=0.95, help="Factor de enfriamiento")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Límite de tiempo en segundos; al vencer se usa la mejor solución encontrada")
+    parser.add_argument("--chains", type=int, default=1,
+                        help="Cadenas de SA en paralelo (NumPy); con más de 1 cada cadena parte de un constructivo distinto y se guarda la mejor")
     parser.add_argument("--stdout", action="store_true",
                         help="Imprime la solución por stdout en lugar de escribir archivo")
     parser.add_argument("--report", action="store_true", help="Imprime un reporte por día y totales")
@@ -398,24 +294,37 @@ if __name__ == "__main__":
     with open(instance_file, "r", encoding="utf-8") as f:
         instance = json.load(f)
 
+    if args.chains > 1 and not HAS_NUMPY:
+        print("ERROR: --chains necesita NumPy (pip install numpy)")
+        sys.exit(1)
+
+    deadline = deadline_after(args.time_limit)
+
     # Construcción inicial
     assignment = constructive_assignment(
-        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k
+        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k, c1_optimal=args.c1_matching
     )
 
     # Mejora con recocido simulado
     # Cambia la función de evaluación para priorizar C1, luego C2, luego C3
-    def _score(s):
-        c1, c2, c3 = score_solution_lex(instance, s)
-        return c1 * 10000 + c2 * 100 + c3
+    _score = make_lex_evaluator(instance)
 
     before = score_solution_lex(instance, assignment)
-    assignment = simulated_annealing(
-        assignment,
-        evaluar=_score,
-        generar_vecino=lambda s: generar_vecino_swap(s, instance),
-        T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha, iter_por_temp=args.iters
-    )
+    if args.chains > 1:
+        assignment = multi_chain_sa(
+            instance, chains=args.chains, seed=args.seed, top_k_pref=args.top_k, c1_optimal=args.c1_matching,
+            T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha, iter_por_temp=args.iters,
+            deadline=deadline
+        )
+        print(f"[SA] {args.chains} cadenas; se guarda la mejor")
+    else:
+        assignment = simulated_annealing(
+            assignment,
+            evaluar=_score,
+            generar_vecino=lambda s: generar_vecino_swap(s, instance),
+            T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha, iter_por_temp=args.iters,
+            deadline=deadline
+        )
     after = score_solution_lex(instance, assignment)
     print("Puntaje antes (C1, C2, C3):", before)
     print("Puntaje después (C1, C2, C3):", after)
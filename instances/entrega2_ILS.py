@@ -9,9 +9,24 @@ import random
 import math
 import copy
 import csv
-from collections import defaultdict, Counter
+from collections import Counter, deque
+from functools import partial
 from typing import Dict, List, Tuple, Optional
 
+sys.path.append(os.path.dirname(__file__))
+from alns import alns
+from compact_assignment import Assignment
+from constructive import c1_optimal_rows, constructive_rows
+from deadline import Clock, deadline_after
+from fitness_cache import FitnessCache
+from day_parallel import day_budget, solve_days_parallel
+from incremental_eval import IncrementalEvaluator
+from lex_objective import lex_objective
+from problem_index import compile_instance
+from consolidate import try_consolidation
+from cyclic_exchange import cyclic_exchange_descent
+from relocate import FreeDesks, pick_relocation
+
 # ---------- Utilidades ----------
 def build_desk_to_zone(desks_z: Dict[str, List[str]]) -> Dict[str, str]:
     d2z = {}
@@ -49,141 +64,37 @@ def _groups_meeting_day(instance: dict, assignment: Dict[str, Dict[str, Optional
     return result
 
 def _isolated_employees(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, Dict[str, int]]:
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = _day_order(instance)
-    total = 0
+    # Un empleado se considera aislado si nadie más de su grupo está en su zona ese día
+    index = compile_instance(instance)
     per_day: Dict[str, int] = {}
-    # mapa empleado->grupo
-    emp2g: Dict[str, Optional[str]] = {}
-    for g, members in employees_g.items():
-        for e in members:
-            emp2g[e] = g
-    for day in days:
-        m = assignment.get(day, {})
-        group_zone = defaultdict(Counter)
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if z:
-                group_zone[g][z] += 1
-        isolated = 0
-        for e, d in m.items():
-            if d is None:
-                continue
-            g = emp2g.get(e)
-            if not g:
-                continue
-            z = d2z.get(d)
-            if not z:
-                continue
-            if group_zone[g][z] <= 1:
-                isolated += 1
-        per_day[day] = isolated
-        total += isolated
-    return total, per_day
+    for day in _day_order(instance):
+        per_day[day] = index.isolated_day(index.encode_day(assignment.get(day, {})))
+    return sum(per_day.values()), per_day
 
 # ---------- 1) Método constructivo + aleatorización ----------
-def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3) -> Dict[str, Dict[str, Optional[str]]]:
-    rng = random.Random(seed)
-    employees = instance["Employees"]
-    desks = instance["Desks"]
-    days = instance.get("Days", [])
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    days_e = instance.get("Days_E", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-
-    assignment: Dict[str, Dict[str, Optional[str]]] = {day: {} for day in days}
-
-    for day in days:
-        present = employees_present_today(day, days_e, employees)
-        if randomize:
-            rng.shuffle(present)
-        used_desks = set()
-        group_zone_count = defaultdict(Counter)
-
-        for e in present:
-            g = employee_group(e, employees_g)
-            target_zone = group_zone_count[g].most_common(1)[0][0] if (g and group_zone_count[g]) else None
-
-            pref_list = desks_e.get(e, [])
-            pref_avail = [d for d in pref_list if d not in used_desks]
-            pref_avail_target = [d for d in pref_avail if d2z.get(d) == target_zone] if target_zone else pref_avail[:]
-
-            chosen = None
-            if pref_avail_target:
-                chosen = rng.choice(pref_avail_target[:min(top_k_pref, len(pref_avail_target))]) if randomize else pref_avail_target[0]
-            elif pref_avail:
-                chosen = rng.choice(pref_avail[:min(top_k_pref, len(pref_avail))]) if randomize else pref_avail[0]
-            else:
-                free_desks = [d for d in desks if d not in used_desks]
-                free_target = [d for d in free_desks if d2z.get(d) == target_zone] if target_zone else free_desks[:]
-                pool = free_target if free_target else free_desks
-                chosen = rng.choice(pool) if (randomize and pool) else (pool[0] if pool else None)
-
-            assignment[day][e] = chosen
-            if chosen:
-                used_desks.add(chosen)
-                if g:
-                    z = d2z.get(chosen)
-                    if z:
-                        group_zone_count[g][z] += 1
-
-        for e in employees:
-            assignment[day].setdefault(e, None)
-
-    return assignment
+def constructive_assignment(instance: dict, seed: int = 42, randomize: bool = True, top_k_pref: int = 3,
+                            c1_optimal: bool = False) -> Dict[str, Dict[str, Optional[str]]]:
+    """Con `c1_optimal=True` el constructivo se completa a C1 máximo por día (Hopcroft–Karp)."""
+    index = compile_instance(instance)
+    build = c1_optimal_rows if c1_optimal else constructive_rows
+    return index.decode(build(index, seed=seed, randomize=randomize, top_k_pref=top_k_pref))
 
 # ---------- 2) Puntaje lexicográfico ----------
 def score_solution_lex(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[int, int, int]:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
-
-    c1_pref_hits, c2_group_cohesion, c3_balance = 0, 0, 0
+    index = compile_instance(instance)
+    return index.score(index.encode(assignment))
 
-    for day in days:
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1_pref_hits += 1
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2_group_cohesion += z_count.most_common(1)[0][1]
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3_balance += -(mx - mn)
-    return (c1_pref_hits, c2_group_cohesion, c3_balance)
+def make_lex_evaluator(instance: dict):
+    """Evaluador escalar para SA: respeta el orden lexicográfico aunque C2 o |C3| pasen de 99."""
+    objective = lex_objective(instance)
+    return lambda s: objective.scalar(score_solution_lex(instance, s))
 
 # ---------- Recocido Simulado ----------
 def generar_vecino_swap(assignment, instance):
     days = instance.get("Days", [])
     employees = instance.get("Employees", [])
-    new = {d: m.copy() for d, m in assignment.items()}
+    # El vecino comparte con `assignment` los días que no cambian: sólo se copia el día del swap
+    new = dict(assignment)
     if not days:
         return new
     day = random.choice(days)
@@ -191,29 +102,43 @@ def generar_vecino_swap(assignment, instance):
     if len(assigned_today) < 2:
         return new
     a, b = random.sample(assigned_today, 2)
-    new[day][a], new[day][b] = new[day][b], new[day][a]
+    new[day] = seats = assignment[day].copy()
+    seats[a], seats[b] = seats[b], seats[a]
     return new
 
+def _copiar_solucion(solucion):
+    """Copia barata: `snapshot` para `Assignment`, copia por día para el dict clásico."""
+    if isinstance(solucion, Assignment):
+        return solucion.snapshot()
+    if isinstance(solucion, dict):
+        return {d: m.copy() for d, m in solucion.items()}
+    return copy.deepcopy(solucion)
+
 def simulated_annealing(solucion_inicial, evaluar, generar_vecino,
-                        T_inicial=200.0, T_final=1.0, alpha=0.95, iter_por_temp=100):
-    S = copy.deepcopy(solucion_inicial)
-    mejor = copy.deepcopy(S)
+                        T_inicial=200.0, T_final=1.0, alpha=0.95, iter_por_temp=100, deadline=None):
+    # deadline: instante de time.monotonic(); al vencer se devuelve la mejor solución
+    clock = Clock(deadline, every=16)
+    S = _copiar_solucion(solucion_inicial)
+    mejor = _copiar_solucion(S)
     valor_S = evaluar(S)
     valor_mejor = valor_S
     T = T_inicial
 
-    while T > T_final:
+    while T > T_final and not clock.timed_out:
         for _ in range(iter_por_temp):
+            if clock.expired():
+                break
             vecino = generar_vecino(S)
             valor_vecino = evaluar(vecino)
             delta = valor_vecino - valor_S
 
             if delta > 0 or random.random() < math.exp(delta / T):
-                S = copy.deepcopy(vecino)
+                # El vecino ya es un objeto nuevo: no hace falta copiarlo al aceptarlo
+                S = vecino
                 valor_S = valor_vecino
 
                 if valor_S > valor_mejor:
-                    mejor = copy.deepcopy(S)
+                    mejor = _copiar_solucion(S)
                     valor_mejor = valor_S
 
         T *= alpha
@@ -222,34 +147,108 @@ def simulated_annealing(solucion_inicial, evaluar, generar_vecino,
 
 # ---------- ILS: Iterated Local Search ----------
 def local_search_swaps_hillclimb(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]],
-                                 evaluar, iters: int = 500, seed: Optional[int] = None) -> Dict[str, Dict[str, Optional[str]]]:
+                                 evaluar=None, iters: int = 500, seed: Optional[int] = None,
+                                 stats: Optional[Counter] = None,
+                                 deadline: Optional[float] = None,
+                                 relocate_prob: float = 0.0,
+                                 consolidate_prob: float = 0.0,
+                                 cycle_k: int = 0) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Hill climbing por swaps dentro de un día. Con `evaluar=None` se compara
+    el puntaje lexicográfico evaluado de forma incremental y perezosa (sin
+    copiar ni re-puntuar toda la semana por cada vecino); `stats` (Counter)
+    acumula los swaps evaluados y los cálculos de C2/C3 omitidos. Con
+    `deadline` (instante de `time.monotonic()`) se detiene al vencer. Con
+    `relocate_prob` > 0 (sólo en el modo incremental), esa fracción de los
+    vecinos mueve a un empleado a un escritorio libre; con `consolidate_prob`
+    > 0, esa fracción intenta reunir un grupo en una zona (consolidate.py).
+    Con `cycle_k` >= 2, al terminar los swaps se desciende con intercambios
+    cíclicos de hasta `cycle_k` empleados (cyclic_exchange.py). Si recibe un
+    `Assignment` (modo incremental), lo mejora en sitio y lo devuelve.
+    """
     if seed is not None:
         random.seed(seed)
+    clock = Clock(deadline) if evaluar is None else Clock(deadline, every=16)
+    if evaluar is None:
+        compact = isinstance(assignment, Assignment)
+        S = assignment if compact else Assignment.from_dict(compile_instance(instance), assignment)
+        index = S.index
+        evaluator = IncrementalEvaluator(S)
+        day_ids = list(range(index.n_days))
+        assigned = [S.assigned(day) for day in day_ids]
+        free = FreeDesks(S) if relocate_prob or consolidate_prob else None
+        for _ in range(iters):
+            if not day_ids or clock.expired():
+                break
+            if consolidate_prob and random.random() < consolidate_prob:
+                try_consolidation(evaluator, free, random, day_ids)
+                continue
+            if relocate_prob and random.random() < relocate_prob:
+                move = pick_relocation(S, free, random, assigned, day_ids)
+                if move is not None and evaluator.relocate_delta(*move) > (0, 0, 0):
+                    day, e, d = move
+                    old = S.desk(day, e)
+                    evaluator.apply_relocate(day, e, d)
+                    evaluator.commit()
+                    free.move(day, old, d)
+                continue
+            day = random.choice(day_ids)
+            assigned_today = assigned[day]
+            if len(assigned_today) < 2:
+                continue
+            a, b = random.sample(assigned_today, 2)
+            if evaluator.swap_improves(day, a, b):  # mejora lexicográfica exacta
+                evaluator.apply_swap(day, a, b)
+                evaluator.commit()
+        if cycle_k >= 2 and day_ids and not clock.timed_out:
+            cyclic_exchange_descent(evaluator, day_ids, cycle_k, clock, evaluator.counters)
+        if stats is not None:
+            stats.update(evaluator.counters)
+        return S if compact else S.to_dict()
+
     S = {d: m.copy() for d, m in assignment.items()}
-    val_S = evaluar(S)
     days = instance.get("Days", [])
     employees = instance.get("Employees", [])
-
+    val_S = evaluar(S)
     for _ in range(iters):
-        if not days:
+        if not days or clock.expired():
             break
         day = random.choice(days)
         assigned_today = [e for e in employees if S[day].get(e) is not None]
         if len(assigned_today) < 2:
             continue
         a, b = random.sample(assigned_today, 2)
-        vecino = {d: m.copy() for d, m in S.items()}
-        vecino[day][a], vecino[day][b] = vecino[day][b], vecino[day][a]
-        val_v = evaluar(vecino)
+        # Swap en sitio; se deshace si no mejora (sin copiar la semana)
+        seats = S[day]
+        seats[a], seats[b] = seats[b], seats[a]
+        val_v = evaluar(S)
         if val_v > val_S:
-            S = vecino
             val_S = val_v
+        else:
+            seats[a], seats[b] = seats[b], seats[a]
     return S
 
 def perturbation_k_swaps(assignment: Dict[str, Dict[str, Optional[str]]],
                          instance: dict, k: int = 3, seed: Optional[int] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    `k` swaps al azar sobre una copia. Con un `Assignment` devuelve otro
+    `Assignment` (su hash Zobrist se actualiza por swap) y consume el
+    generador igual que con el dict, así que elige los mismos swaps.
+    """
     if seed is not None:
         random.seed(seed)
+    if isinstance(assignment, Assignment):
+        S = assignment.snapshot()
+        day_ids = list(range(S.index.n_days))
+        for _ in range(k if day_ids else 0):
+            day = random.choice(day_ids)
+            assigned_today = S.assigned(day)
+            if len(assigned_today) < 2:
+                continue
+            a, b = random.sample(assigned_today, 2)
+            S.swap(day, a, b)
+        S.commit()
+        return S
     S = {d: m.copy() for d, m in assignment.items()}
     days = instance.get("Days", [])
     employees = instance.get("Employees", [])
@@ -264,6 +263,26 @@ def perturbation_k_swaps(assignment: Dict[str, Dict[str, Optional[str]]],
         S[day][a], S[day][b] = S[day][b], S[day][a]
     return S
 
+def perturbation_consolidate(assignment: Dict[str, Dict[str, Optional[str]]],
+                             instance: dict, k: int = 3, seed: Optional[int] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Perturbación por `k` movimientos compuestos "reunir el grupo g en la zona
+    z el día d" elegidos al azar y aplicados sin importar su delta (misma
+    firma que `perturbation_k_swaps`, también con `Assignment`).
+    """
+    if seed is not None:
+        random.seed(seed)
+    compact = isinstance(assignment, Assignment)
+    S = assignment.snapshot() if compact else Assignment.from_dict(compile_instance(instance), assignment)
+    day_ids = list(range(S.index.n_days))
+    if day_ids:
+        evaluator = IncrementalEvaluator(S)
+        free = FreeDesks(S)
+        for _ in range(k):
+            try_consolidation(evaluator, free, random, day_ids, accept=lambda delta: True)
+        evaluator.commit()
+    return S if compact else S.to_dict()
+
 def iterated_local_search(instance: dict,
                           initial: Dict[str, Dict[str, Optional[str]]],
                           evaluar,
@@ -272,24 +291,149 @@ def iterated_local_search(instance: dict,
                           max_iters: int = 20,
                           ls_iters: int = 500,
                           perturb_k: int = 3,
-                          seed: Optional[int] = None) -> Dict[str, Dict[str, Optional[str]]]:
+                          seed: Optional[int] = None,
+                          stats: Optional[Counter] = None,
+                          deadline: Optional[float] = None,
+                          fitness_cache: Optional[FitnessCache] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    ILS: búsqueda local, luego `max_iters` rondas de perturbación + búsqueda
+    local. Con `fitness_cache` (sólo en el modo incremental, `evaluar=None`)
+    la solución viaja como `Assignment` por la perturbación y la búsqueda
+    local, así que su hash Zobrist se mantiene en O(1) por movimiento; el
+    puntaje de cada óptimo local se busca en la caché por ese hash y sólo
+    se calcula completo si no está. El resultado es el mismo que sin caché.
+    """
     if seed is not None:
         random.seed(seed)
-    S = local_search_func(instance, initial, evaluar, iters=ls_iters, seed=seed)
-    best = copy.deepcopy(S)
+    # `stats` y `deadline` sólo se pasan a la búsqueda local si se pidieron
+    # (las búsquedas locales personalizadas no los reciben)
+    ls_kwargs = {"stats": stats} if stats is not None else {}
+    if deadline is not None:
+        ls_kwargs["deadline"] = deadline
+    clock = Clock(deadline, every=1)
+    # evaluar=None: se comparan las tuplas (C1, C2, C3) directamente (orden
+    # lexicográfico exacto); la búsqueda local lo evalúa incrementalmente
+    ls_evaluar = evaluar
+    clone = copy.deepcopy
+    if fitness_cache is not None:
+        if evaluar is not None:
+            raise ValueError("fitness_cache necesita el modo incremental (evaluar=None)")
+        initial = Assignment.from_dict(compile_instance(instance), initial)
+        # El hash se calcula aquí una vez; las copias lo heredan y cada movimiento lo actualiza
+        initial.zobrist()
+        evaluar = fitness_cache.score
+        clone = Assignment.snapshot
+    elif evaluar is None:
+        evaluar = lambda s: score_solution_lex(instance, s)
+    S = local_search_func(instance, initial, ls_evaluar, iters=ls_iters, seed=seed, **ls_kwargs)
+    best = clone(S)
     best_val = evaluar(best)
 
     for _ in range(max_iters):
+        if clock.expired():
+            break
         S_p = perturb_func(S, instance, k=perturb_k, seed=None)
-        S_p = local_search_func(instance, S_p, evaluar, iters=ls_iters, seed=None)
+        S_p = local_search_func(instance, S_p, ls_evaluar, iters=ls_iters, seed=None, **ls_kwargs)
         val_p = evaluar(S_p)
         if val_p > best_val:
-            best = copy.deepcopy(S_p)
+            best = clone(S_p)
             best_val = val_p
             S = S_p
         else:
             S = S_p
-    return best
+    return best.to_dict() if fitness_cache is not None else best
+
+# ---------- Búsqueda tabú ----------
+def _add_scores(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+def tabu_search(instance: dict,
+                initial: Dict[str, Dict[str, Optional[str]]],
+                iters: int = 500,
+                candidates: int = 50,
+                tenure: int = 10,
+                seed: Optional[int] = None,
+                stats: Optional[Counter] = None,
+                deadline: Optional[float] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Búsqueda tabú por swaps dentro de un día. En cada iteración se muestrean
+    `candidates` swaps (lista de candidatos), se evalúan de forma incremental
+    y se aplica el mejor admisible aunque empeore. Al aplicar un swap, cada
+    empleado queda vetado `tenure` iteraciones para volver al escritorio que
+    dejó ese día (atributo (día, empleado, escritorio)); un movimiento tabú se
+    permite si supera la mejor solución lexicográfica (aspiración). `stats`
+    (Counter) acumula los swaps evaluados, los vetados y las aspiraciones.
+    """
+    rng = random.Random(seed)
+    index = compile_instance(instance)
+    S = Assignment.from_dict(index, initial)
+    evaluator = IncrementalEvaluator(S)
+    current = evaluator.score
+    best = S.snapshot()
+    best_score = current
+    day_ids = list(range(index.n_days))
+    assigned = [S.assigned(day) for day in day_ids]
+    movable = [day for day in day_ids if len(assigned[day]) >= 2]
+    # (día, empleado, escritorio) -> última iteración en que sigue vetado; la
+    # cola guarda (vencimiento, atributo) en orden para descartar los vencidos
+    tabu: Dict[Tuple[int, int, int], int] = {}
+    expiry: deque = deque()
+    counters = stats if stats is not None else Counter()
+    counters.update(evaluated=0, tabu_rejected=0, aspiration=0)
+    clock = Clock(deadline, every=4)
+
+    for it in range(iters):
+        if not movable or clock.expired():
+            break
+        while expiry and expiry[0][0] < it:
+            until, attr = expiry.popleft()
+            if tabu.get(attr) == until:
+                del tabu[attr]
+        chosen, chosen_delta = None, None
+        for _ in range(candidates):
+            day = rng.choice(movable)
+            a, b = rng.sample(assigned[day], 2)
+            da, db = S.desk(day, a), S.desk(day, b)
+            delta = evaluator.swap_delta(day, a, b)
+            counters["evaluated"] += 1
+            if tabu.get((day, a, db), -1) >= it or tabu.get((day, b, da), -1) >= it:
+                if not _add_scores(current, delta) > best_score:
+                    counters["tabu_rejected"] += 1
+                    continue
+                counters["aspiration"] += 1
+            if chosen_delta is None or delta > chosen_delta:
+                chosen, chosen_delta = (day, a, b, da, db), delta
+        if chosen is None:
+            continue
+        day, a, b, da, db = chosen
+        evaluator.apply_swap(day, a, b)
+        evaluator.commit()
+        for attr in ((day, a, da), (day, b, db)):
+            tabu[attr] = it + tenure
+            expiry.append((it + tenure, attr))
+        current = _add_scores(current, chosen_delta)
+        if current > best_score:
+            best = S.snapshot()
+            best_score = current
+    return best.to_dict()
+
+# Subproblemas de un día para --parallel-days (nivel de módulo: se envían a otros procesos)
+def _solve_day_ils(instance: dict, assignment, seed: int, **ils_params):
+    return iterated_local_search(
+        instance, assignment, evaluar=None,
+        local_search_func=local_search_swaps_hillclimb,
+        perturb_func=perturbation_k_swaps,
+        seed=seed, **ils_params
+    )
+
+def _solve_day_sa(instance: dict, assignment, seed: int, **sa_params):
+    random.seed(seed)
+    return simulated_annealing(
+        assignment,
+        evaluar=make_lex_evaluator(instance),
+        generar_vecino=lambda s: generar_vecino_swap(s, instance),
+        **sa_params
+    )
 
 # ---------- Validación y reporte ----------
 def validate_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> Tuple[bool, List[str]]:
@@ -324,44 +468,14 @@ def validate_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional
     return (len(errors) == 0, errors)
 
 def report_assignment(instance: dict, assignment: Dict[str, Dict[str, Optional[str]]]) -> None:
-    desks_e = instance.get("Desks_E", {})
-    employees_g = instance.get("Employees_G", {})
-    desks_z = instance.get("Desks_Z", {})
-    d2z = build_desk_to_zone(desks_z)
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
+    index = compile_instance(instance)
 
     total_c1 = total_c2 = total_c3 = 0
     print("Reporte por día:")
-    for day in days:
-        c1 = 0
-        for e in employees:
-            d = assignment[day].get(e)
-            if d and d in desks_e.get(e, []):
-                c1 += 1
-        c2 = 0
-        for g, members in employees_g.items():
-            z_count = Counter()
-            for e in members:
-                d = assignment[day].get(e)
-                if d:
-                    z = d2z.get(d)
-                    if z:
-                        z_count[z] += 1
-            if z_count:
-                c2 += z_count.most_common(1)[0][1]
-        z_occ = Counter()
-        for e in employees:
-            d = assignment[day].get(e)
-            if d:
-                z = d2z.get(d)
-                if z:
-                    z_occ[z] += 1
-        c3 = 0
-        if z_occ:
-            mx, mn = max(z_occ.values()), min(z_occ.values())
-            c3 = -(mx - mn)
-        assigned = sum(1 for e in employees if assignment[day].get(e) is not None)
+    for day in index.days:
+        row = index.encode_day(assignment[day])
+        c1, c2, c3 = index.score_day(row)
+        assigned = sum(1 for d in row if d >= 0)
         print(f"- {day}: asignados={assigned} | C1={c1} C2={c2} C3={c3}")
         total_c1 += c1
         total_c2 += c2
@@ -416,10 +530,14 @@ if __name__ == "__main__":
                         help="Carpeta de salida (se creará si no existe)")
     parser.add_argument("--seed", type=int, default=42, help="Semilla para aleatorización")
     parser.add_argument("--top-k", type=int, default=3, help="Top-k preferencias a muestrear")
+    parser.add_argument("--c1-matching", action="store_true",
+                        help="Completa el constructivo a C1 óptimo por día con emparejamiento bipartito (Hopcroft–Karp)")
     parser.add_argument("--iters", type=int, default=1000, help="Iteraciones por temperatura (annealing)")
     parser.add_argument("--tinit", type=float, default=200.0, help="Temperatura inicial (annealing)")
     parser.add_argument("--tfinal", type=float, default=1.0, help="Temperatura final (annealing)")
     parser.add_argument("--alpha", type=float, default=0.95, help="Factor de enfriamiento (annealing)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Límite de tiempo en segundos; al vencer se usa la mejor solución encontrada")
     parser.add_argument("--stdout", action="store_true",
                         help="Imprime la solución por stdout en lugar de escribir archivo")
     parser.add_argument("--report", action="store_true", help="Imprime un reporte por día y totales")
@@ -428,11 +546,37 @@ if __name__ == "__main__":
     parser.add_argument("--ils-iters", type=int, default=20, help="Iteraciones superiores de ILS")
     parser.add_argument("--ls-iters", type=int, default=500, help="Iteraciones de búsqueda local en cada ILS")
     parser.add_argument("--perturb-k", type=int, default=3, help="Número de swaps en la perturbación ILS")
+    parser.add_argument("--tabu", action="store_true", help="Usar búsqueda tabú en vez de recocido simulado")
+    parser.add_argument("--alns", action="store_true",
+                        help="Usar ALNS (destruir y reparar con flujo de costo mínimo) en vez de recocido simulado")
+    parser.add_argument("--alns-iters", type=int, default=1000, help="Iteraciones de destruir y reparar de ALNS")
+    parser.add_argument("--tabu-iters", type=int, default=500, help="Iteraciones de la búsqueda tabú")
+    parser.add_argument("--tabu-candidates", type=int, default=50,
+                        help="Swaps muestreados por iteración tabú (lista de candidatos)")
+    parser.add_argument("--tabu-tenure", type=int, default=10,
+                        help="Iteraciones que un empleado no puede volver al escritorio que dejó ese día")
+    parser.add_argument("--relocate-prob", type=float, default=0.0,
+                        help="Fracción de vecinos de la búsqueda local de ILS que mueven a un empleado a un escritorio libre")
+    parser.add_argument("--consolidate-prob", type=float, default=0.0,
+                        help="Fracción de vecinos de la búsqueda local de ILS que intentan reunir un grupo en una zona")
+    parser.add_argument("--cycle-k", type=int, default=0,
+                        help="Largo máximo de los intercambios cíclicos al final de cada búsqueda local de ILS (0 = desactivado)")
+    parser.add_argument("--perturb", choices=["swaps", "consolidate"], default="swaps",
+                        help="Perturbación de ILS: k swaps al azar o k movimientos de reunión de grupo en zona")
+    parser.add_argument("--fitness-cache", type=int, default=0,
+                        help="Tamaño de la caché LRU de puntajes de ILS por hash Zobrist (0 = desactivada); imprime aciertos y fallos")
+    parser.add_argument("--parallel-days", action="store_true",
+                        help="Resuelve cada día por separado en un pool de procesos (las iteraciones se reparten entre los días)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para --parallel-days (por defecto uno por día)")
     parser.add_argument("--export-csv", action="store_true",
                         help="Exporta CSVs tipo plantilla (EmployeeAssignment, Groups_Meeting_day, Summary)")
     parser.add_argument("--export-dir", default=None,
                         help="Carpeta para exportación CSV (por defecto usa --outdir/csv_export)")
     args = parser.parse_args()
+    if args.tabu and (args.ils or args.parallel_days):
+        parser.error("--tabu no se combina con --ils ni con --parallel-days")
+    if args.alns and (args.ils or args.tabu or args.parallel_days):
+        parser.error("--alns no se combina con --ils, --tabu ni --parallel-days")
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -456,39 +600,89 @@ if __name__ == "__main__":
     with open(instance_file, "r", encoding="utf-8") as f:
         instance = json.load(f)
 
+    deadline = deadline_after(args.time_limit)
+
     # Construcción inicial
     assignment = constructive_assignment(
-        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k
+        instance, seed=args.seed, randomize=True, top_k_pref=args.top_k, c1_optimal=args.c1_matching
     )
 
     # Función de evaluación lexicográfica priorizada
-    def _score(s):
-        c1, c2, c3 = score_solution_lex(instance, s)
-        return c1 * 10000 + c2 * 100 + c3
+    _score = make_lex_evaluator(instance)
 
     before = score_solution_lex(instance, assignment)
 
     # Fijar semilla global
     random.seed(args.seed)
 
-    if args.ils:
+    n_days = len(instance.get("Days", []))
+    if args.parallel_days and args.ils:
+        assignment = solve_days_parallel(
+            instance,
+            partial(_solve_day_ils, max_iters=args.ils_iters,
+                    ls_iters=day_budget(args.ls_iters, n_days),
+                    perturb_k=day_budget(args.perturb_k, n_days), deadline=deadline),
+            seed=args.seed, initial=assignment, workers=args.workers
+        )
+    elif args.parallel_days:
+        assignment = solve_days_parallel(
+            instance,
+            partial(_solve_day_sa, T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha,
+                    iter_por_temp=day_budget(args.iters, n_days), deadline=deadline),
+            seed=args.seed, initial=assignment, workers=args.workers
+        )
+    elif args.alns:
+        alns_stats = {}
+        assignment = alns(instance, assignment, iters=args.alns_iters, seed=args.seed, deadline=deadline,
+                          stats=alns_stats)
+        for name, st in alns_stats.items():
+            if isinstance(st, dict):
+                print("[ALNS] {}: usos={uses}, nuevos mejores={best}, mejoras={improved}, laterales={lateral}, "
+                      "peores aceptados={worse}, sin cambio={unchanged}, rechazados={rejected}, peso={weight}".format(name, **st))
+    elif args.tabu:
+        tabu_stats = Counter()
+        assignment = tabu_search(
+            instance,
+            assignment,
+            iters=args.tabu_iters,
+            candidates=args.tabu_candidates,
+            tenure=args.tabu_tenure,
+            seed=args.seed,
+            stats=tabu_stats,
+            deadline=deadline
+        )
+        print("[Tabú] Swaps evaluados: {evaluated}, vetados: {tabu_rejected}, aspiraciones: {aspiration}".format(**tabu_stats))
+    elif args.ils:
+        ls_stats = Counter()
+        cache = FitnessCache(args.fitness_cache) if args.fitness_cache > 0 else None
         assignment = iterated_local_search(
             instance,
             assignment,
-            evaluar=_score,
-            local_search_func=local_search_swaps_hillclimb,
-            perturb_func=perturbation_k_swaps,
+            evaluar=None,  # objetivo lexicográfico con evaluación incremental
+            local_search_func=partial(local_search_swaps_hillclimb, relocate_prob=args.relocate_prob,
+                                      consolidate_prob=args.consolidate_prob, cycle_k=args.cycle_k),
+            perturb_func=perturbation_consolidate if args.perturb == "consolidate" else perturbation_k_swaps,
             max_iters=args.ils_iters,
             ls_iters=args.ls_iters,
             perturb_k=args.perturb_k,
-            seed=args.seed
+            seed=args.seed,
+            stats=ls_stats,
+            deadline=deadline,
+            fitness_cache=cache
         )
+        print("[ILS] Swaps evaluados: {}, cálculos de C2 omitidos: {}, de C3 omitidos: {}".format(
+            ls_stats["evaluated"], ls_stats["skipped_c2"], ls_stats["skipped_c3"]))
+        if args.cycle_k >= 2:
+            print("[ILS] Ciclos evaluados: {}, aplicados: {}".format(ls_stats["cycles_checked"], ls_stats["cycles_applied"]))
+        if cache is not None:
+            print("[ILS] Caché de puntajes: {hits} aciertos, {misses} fallos ({hit_rate:.0%})".format(**cache.stats()))
     else:
         assignment = simulated_annealing(
             assignment,
             evaluar=_score,
             generar_vecino=lambda s: generar_vecino_swap(s, instance),
-            T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha, iter_por_temp=args.iters
+            T_inicial=args.tinit, T_final=args.tfinal, alpha=args.alpha, iter_por_temp=args.iters,
+            deadline=deadline
         )
 
     after = score_solution_lex(instance, assignment)
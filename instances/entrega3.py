@@ -1,7 +1,9 @@
 import json
 import os
 import random
-from typing import Dict, List, Tuple
+from collections import Counter
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
 import sys
 sys.path.append(os.path.dirname(__file__))
@@ -12,10 +14,13 @@ from entrega2_ILS import (
     export_csv_template,
     validate_assignment,
 )
-
-
-def _copy_assignment(assignment: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
-    return {day: seats.copy() for day, seats in assignment.items()}
+from compact_assignment import Assignment
+from day_parallel import solve_days_parallel
+from deadline import Clock, deadline_after
+from incremental_eval import swap_delta
+from problem_index import compile_instance
+from relocate import random_relocation, relocate_delta
+from worker_pool import instance_pool, worker_instance
 
 
 def _tournament_index(scores: List[Tuple[int, int, int]], rng: random.Random, k: int = 3) -> int:
@@ -27,36 +32,65 @@ def _tournament_index(scores: List[Tuple[int, int, int]], rng: random.Random, k:
     return best_idx if best_idx is not None else 0
 
 
-def _crossover(parent1: Dict[str, Dict[str, str]],
-               parent2: Dict[str, Dict[str, str]],
-               rng: random.Random) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]]]:
-    days = list(parent1.keys())
-    if len(days) < 2:
-        return _copy_assignment(parent1), _copy_assignment(parent2)
-    cut = rng.randint(1, len(days) - 1)
-    child1: Dict[str, Dict[str, str]] = {}
-    child2: Dict[str, Dict[str, str]] = {}
-    for i, day in enumerate(days):
-        if i < cut:
-            child1[day] = parent1[day].copy()
-            child2[day] = parent2[day].copy()
-        else:
-            child1[day] = parent2[day].copy()
-            child2[day] = parent1[day].copy()
-    return child1, child2
-
-
-def _mutate(instance: dict, assignment: Dict[str, Dict[str, str]], rng: random.Random) -> None:
-    days = instance.get("Days", [])
-    employees = instance.get("Employees", [])
-    if not days or len(employees) < 2:
-        return
-    day = rng.choice(days)
-    assigned_today = [e for e in employees if assignment[day].get(e) is not None]
+def _crossover(parent1: Assignment, parent2: Assignment,
+               rng: random.Random) -> Tuple[Assignment, Assignment, int]:
+    """
+    Cruce de un punto por días: los hijos se arman con dos rebanadas del array
+    de cada padre. Devuelve también el día de corte (los días anteriores vienen
+    del primer padre).
+    """
+    n_days = parent1.index.n_days
+    if n_days < 2:
+        return parent1.snapshot(), parent2.snapshot(), n_days
+    cut_day = rng.randint(1, n_days - 1)
+    cut = cut_day * parent1.n_employees
+    seats1, seats2 = parent1.seats, parent2.seats
+    child1 = Assignment(parent1.index, seats1[:cut] + seats2[cut:])
+    child2 = Assignment(parent1.index, seats2[:cut] + seats1[cut:])
+    return child1, child2, cut_day
+
+
+def _mutate(assignment: Assignment, rng: random.Random,
+            relocate_prob: float = 0.0) -> Tuple[Optional[int], Tuple[int, int, int]]:
+    """
+    Aplica un swap aleatorio en sitio (o, con probabilidad `relocate_prob`,
+    mueve a un empleado a un escritorio libre) y devuelve (día, (ΔC1, ΔC2,
+    ΔC3)); día None si no hubo movimiento.
+    """
+    if relocate_prob and rng.random() < relocate_prob:
+        move = random_relocation(assignment, rng)
+        if move is None:
+            return None, (0, 0, 0)
+        day, e, d = move
+        delta = relocate_delta(assignment, day, e, d)
+        assignment.relocate(day, e, d)
+        assignment.commit()
+        return day, delta
+    n_days = assignment.index.n_days
+    if not n_days or assignment.n_employees < 2:
+        return None, (0, 0, 0)
+    day = rng.choice(range(n_days))
+    assigned_today = assignment.assigned(day)
     if len(assigned_today) < 2:
-        return
+        return None, (0, 0, 0)
     a, b = rng.sample(assigned_today, 2)
-    assignment[day][a], assignment[day][b] = assignment[day][b], assignment[day][a]
+    delta = swap_delta(assignment, day, a, b)
+    assignment.swap(day, a, b)
+    assignment.commit()
+    return day, delta
+
+
+def _add_delta(score: Tuple[int, int, int], delta: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    return (score[0] + delta[0], score[1] + delta[1], score[2] + delta[2])
+
+
+def _total(day_scores: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
+    c1 = c2 = c3 = 0
+    for a, b, c in day_scores:
+        c1 += a
+        c2 += b
+        c3 += c
+    return (c1, c2, c3)
 
 
 def _population_stats(scores: List[Tuple[int, int, int]]) -> Dict[str, Tuple[float, float, float]]:
@@ -73,6 +107,66 @@ def _population_stats(scores: List[Tuple[int, int, int]]) -> Dict[str, Tuple[flo
             "min": min_score}
 
 
+def _initial_population(instance: dict, index, pop_size: int, rng: random.Random,
+                        top_k_pref: int, c1_optimal: bool) -> List[Assignment]:
+    return [
+        Assignment.from_dict(index, constructive_assignment(instance, seed=rng.randint(0, 10**9), randomize=True,
+                                                            top_k_pref=top_k_pref, c1_optimal=c1_optimal))
+        for _ in range(pop_size)
+    ]
+
+
+def _score_all(population: List[Assignment]) -> List[List[Tuple[int, int, int]]]:
+    return [ind.day_scores() for ind in population]
+
+
+def _next_generation(population: List[Assignment], day_scores: List[List[Tuple[int, int, int]]],
+                     scores: List[Tuple[int, int, int]], pop_size: int, cxpb: float, mutpb: float,
+                     rng: random.Random, relocate_prob: float = 0.0, stats: Optional[Counter] = None):
+    """
+    Una generación: torneo, cruce por días y mutación por swap. Devuelve
+    (población, puntajes por día, puntajes). Ningún hijo se reevalúa completo:
+    como el cruce copia días enteros, sus puntajes por día son los de sus
+    padres, y la mutación sólo corrige su día con el delta del swap. `stats`
+    (Counter) cuenta los hijos creados y los deltas de mutación calculados.
+    """
+    new_population: List[Assignment] = []
+    new_days: List[List[Tuple[int, int, int]]] = []
+    new_scores: List[Tuple[int, int, int]] = []
+
+    while len(new_population) < pop_size:
+        i1 = _tournament_index(scores, rng)
+        i2 = _tournament_index(scores, rng)
+        parent1 = population[i1]
+        parent2 = population[i2]
+
+        crossed = rng.random() < cxpb
+        if crossed:
+            child1, child2, cut = _crossover(parent1, parent2, rng)
+            days1 = day_scores[i1][:cut] + day_scores[i2][cut:]
+            days2 = day_scores[i2][:cut] + day_scores[i1][cut:]
+        else:
+            child1, child2 = parent1.snapshot(), parent2.snapshot()
+            days1, days2 = day_scores[i1][:], day_scores[i2][:]
+
+        for child, days in ((child1, days1), (child2, days2)):
+            if rng.random() < mutpb:
+                day, delta = _mutate(child, rng, relocate_prob)
+                if day is not None:
+                    days[day] = _add_delta(days[day], delta)
+                    if stats is not None:
+                        stats["delta_evals"] += 1
+        for child, days in ((child1, days1), (child2, days2)):
+            if len(new_population) < pop_size:
+                new_population.append(child)
+                new_days.append(days)
+                new_scores.append(_total(days))
+                if stats is not None:
+                    stats["children"] += 1
+
+    return new_population, new_days, new_scores
+
+
 def run_ga(instance: dict,
            ngen: int = 30,
            pop_size: int = 20,
@@ -80,61 +174,205 @@ def run_ga(instance: dict,
            mutpb: float = 0.2,
            seed: int = 42,
            top_k_pref: int = 3,
-           verbose: bool = False):
+           verbose: bool = False,
+           c1_optimal: bool = False,
+           deadline: Optional[float] = None,
+           relocate_prob: float = 0.0,
+           stats: Optional[Counter] = None):
+    """
+    GA generacional. Con `deadline` (instante de `time.monotonic()`) deja de
+    crear generaciones al vencer y devuelve el mejor individuo encontrado.
+    Sólo la población inicial se evalúa completa: cada hijo hereda los
+    puntajes por día de sus padres. `relocate_prob` es la fracción de
+    mutaciones que reubican a un empleado en un escritorio libre en lugar de
+    hacer un swap. `stats` (Counter) acumula el trabajo real: individuos
+    evaluados completos (full_evals), deltas de mutación (delta_evals) e
+    hijos creados (children).
+    """
     rng = random.Random(seed)
-    population = [
-        constructive_assignment(instance, seed=rng.randint(0, 10**9), randomize=True, top_k_pref=top_k_pref)
-        for _ in range(pop_size)
-    ]
-    scores = [score_solution_lex(instance, ind) for ind in population]
+    clock = Clock(deadline, every=1)
+    index = compile_instance(instance)
+    population = _initial_population(instance, index, pop_size, rng, top_k_pref, c1_optimal)
+    # Única evaluación completa del GA: se hace en este proceso. Un pool para
+    # evaluar hijos por lotes no tendría qué evaluar (los hijos heredan sus
+    # puntajes por día) y enviar esta población costaría más que puntuarla.
+    day_scores = _score_all(population)
+    scores = [_total(days) for days in day_scores]
+    if stats is not None:
+        stats["full_evals"] += len(population)
 
     best_idx = max(range(len(population)), key=lambda i: scores[i])
-    best = _copy_assignment(population[best_idx])
+    best = population[best_idx].snapshot()
     best_score = scores[best_idx]
     history = []
 
     for gen in range(ngen):
-        new_population: List[Dict[str, Dict[str, str]]] = []
-        new_scores: List[Tuple[int, int, int]] = []
-
-        while len(new_population) < pop_size:
-            i1 = _tournament_index(scores, rng)
-            i2 = _tournament_index(scores, rng)
-            parent1 = population[i1]
-            parent2 = population[i2]
-
-            child1, child2 = _copy_assignment(parent1), _copy_assignment(parent2)
-            if rng.random() < cxpb:
-                child1, child2 = _crossover(parent1, parent2, rng)
-
-            if rng.random() < mutpb:
-                _mutate(instance, child1, rng)
-            if rng.random() < mutpb:
-                _mutate(instance, child2, rng)
-
-            score1 = score_solution_lex(instance, child1)
-            score2 = score_solution_lex(instance, child2)
-            new_population.append(child1)
-            new_scores.append(score1)
-            if len(new_population) < pop_size:
-                new_population.append(child2)
-                new_scores.append(score2)
-
-        population = new_population
-        scores = new_scores
+        if clock.expired():
+            break
+        population, day_scores, scores = _next_generation(population, day_scores, scores, pop_size, cxpb, mutpb,
+                                                          rng, relocate_prob, stats)
         gen_best_idx = max(range(len(population)), key=lambda i: scores[i])
         gen_best = population[gen_best_idx]
         gen_best_score = scores[gen_best_idx]
         if gen_best_score > best_score:
-            best = _copy_assignment(gen_best)
+            best = gen_best.snapshot()
             best_score = gen_best_score
 
-        stats = _population_stats(scores)
-        history.append({"gen": gen + 1, **stats})
+        gen_stats = _population_stats(scores)
+        history.append({"gen": gen + 1, **gen_stats})
         if verbose:
-            print(f"Gen {gen+1}: avg={stats['avg']} max={stats['max']} min={stats['min']}")
-
-    return best, history
+            print(f"Gen {gen+1}: avg={gen_stats['avg']} max={gen_stats['max']} min={gen_stats['min']}")
+
+    return best.to_dict(), history
+
+
+def _solve_day_ga(instance: dict, assignment, seed: int, **ga_params):
+    """Subproblema de un día para --parallel-days (el GA arma su propia población)."""
+    best, _ = run_ga(instance, seed=seed, **ga_params)
+    return best
+
+
+# ---------- Modelo de islas ----------
+# Cada isla es una población independiente con su propio generador; cada
+# `migration_every` generaciones las islas se envían sus mejores individuos.
+# Las islas corren en un pool de procesos persistente y el estado que viaja
+# entre épocas es compacto: arrays de asientos, puntajes por día y el estado del RNG.
+
+def _evolve_island(state: dict, generations: int, pop_size: int, cxpb: float, mutpb: float,
+                   top_k_pref: int, c1_optimal: bool, deadline: Optional[float], relocate_prob: float = 0.0) -> dict:
+    """
+    Evoluciona una isla `generations` generaciones. Con `state["seats"]` en
+    None arma la población inicial con el RNG de la isla. Devuelve el nuevo
+    estado con el mejor individuo de la época y los puntajes por generación.
+    """
+    instance = worker_instance()
+    index = compile_instance(instance)
+    rng = random.Random()
+    rng.setstate(state["rng"])
+    if state["seats"] is None:
+        population = _initial_population(instance, index, pop_size, rng, top_k_pref, c1_optimal)
+        day_scores = _score_all(population)
+        scores = [_total(days) for days in day_scores]
+    else:
+        population = [Assignment(index, seats) for seats in state["seats"]]
+        day_scores, scores = state["day_scores"], state["scores"]
+    best_idx = max(range(len(population)), key=lambda i: scores[i])
+    best_seats, best_score = population[best_idx].seats, scores[best_idx]
+
+    clock = Clock(deadline, every=1)
+    gen_scores = []
+    for _ in range(generations):
+        if clock.expired():
+            break
+        population, day_scores, scores = _next_generation(population, day_scores, scores, pop_size, cxpb, mutpb,
+                                                          rng, relocate_prob)
+        gen_scores.append(scores)
+        gen_best_idx = max(range(len(population)), key=lambda i: scores[i])
+        if scores[gen_best_idx] > best_score:
+            best_seats, best_score = population[gen_best_idx].seats, scores[gen_best_idx]
+    return {"seats": [ind.seats for ind in population], "day_scores": day_scores, "scores": scores,
+            "rng": rng.getstate(),
+            "best_seats": best_seats, "best_score": best_score, "gen_scores": gen_scores,
+            "timed_out": clock.timed_out}
+
+
+def _migrate(states: List[dict], size: int, topology: str, rng: random.Random) -> None:
+    """
+    Migración sincrónica: cada isla copia sus `size` mejores individuos a su
+    destino (la siguiente en el anillo o una al azar), donde reemplazan a
+    los peores. Los emigrantes se eligen antes de reemplazar a nadie.
+    """
+    k = len(states)
+    emigrants = []
+    for st in states:
+        order = sorted(range(len(st["scores"])), key=lambda i: st["scores"][i], reverse=True)[:size]
+        emigrants.append([(st["seats"][i][:], st["day_scores"][i][:], st["scores"][i]) for i in order])
+    for src in range(k):
+        if topology == "random":
+            dst = rng.randrange(k - 1)
+            dst += dst >= src
+        else:
+            dst = (src + 1) % k
+        scores = states[dst]["scores"]
+        worst = sorted(range(len(scores)), key=lambda i: scores[i])[:len(emigrants[src])]
+        for i, (seats, days, score) in zip(worst, emigrants[src]):
+            states[dst]["seats"][i] = seats
+            states[dst]["day_scores"][i] = days
+            scores[i] = score
+
+
+def run_island_ga(instance: dict,
+                  islands: int = 4,
+                  migration_every: int = 5,
+                  migration_size: int = 1,
+                  topology: str = "ring",
+                  ngen: int = 30,
+                  pop_size: int = 20,
+                  cxpb: float = 0.7,
+                  mutpb: float = 0.2,
+                  seed: int = 42,
+                  top_k_pref: int = 3,
+                  verbose: bool = False,
+                  c1_optimal: bool = False,
+                  deadline: Optional[float] = None,
+                  workers: Optional[int] = None,
+                  relocate_prob: float = 0.0):
+    """
+    GA de islas: `islands` poblaciones de `pop_size` evolucionan `ngen`
+    generaciones cada una en procesos distintos y cada `migration_every`
+    generaciones migran `migration_size` individuos (`topology` "ring" o
+    "random"). Cada isla usa su propio RNG derivado de `seed`, así que el
+    resultado no depende de `workers` (con `workers=1` todo corre en este
+    proceso). Devuelve (mejor solución, historial por generación de todas
+    las islas juntas), como `run_ga`.
+    """
+    if topology not in ("ring", "random"):
+        raise ValueError(f"Topología desconocida: {topology}")
+    islands = max(1, islands)
+    migration_every = max(1, migration_every)
+    master = random.Random(seed)
+    states = [{"seats": None, "scores": None, "rng": random.Random(master.randint(0, 10**9)).getstate()}
+              for _ in range(islands)]
+    index = compile_instance(instance)
+    evolve = partial(_evolve_island, pop_size=pop_size, cxpb=cxpb, mutpb=mutpb, top_k_pref=top_k_pref,
+                     c1_optimal=c1_optimal, deadline=deadline, relocate_prob=relocate_prob)
+
+    workers = min(workers or os.cpu_count() or 1, islands)
+    pool = instance_pool(instance, workers)
+
+    best_seats, best_score = None, None
+    history = []
+    done = 0
+    try:
+        while done < ngen:
+            generations = min(migration_every, ngen - done)
+            # Sólo viaja lo necesario para continuar la isla
+            sent = [{"seats": st["seats"], "day_scores": st.get("day_scores"), "scores": st["scores"], "rng": st["rng"]}
+                    for st in states]
+            if pool is not None:
+                states = list(pool.map(evolve, sent, [generations] * islands))
+            else:
+                states = [evolve(st, generations) for st in sent]
+            for st in states:
+                if best_score is None or st["best_score"] > best_score:
+                    best_seats, best_score = st["best_seats"], st["best_score"]
+            for g in range(max(len(st["gen_scores"]) for st in states)):
+                stats = _population_stats([sc for st in states if g < len(st["gen_scores"])
+                                           for sc in st["gen_scores"][g]])
+                history.append({"gen": done + g + 1, **stats})
+                if verbose:
+                    print(f"Gen {done + g + 1}: avg={stats['avg']} max={stats['max']} min={stats['min']}")
+            done += generations
+            if any(st["timed_out"] for st in states):
+                break
+            if islands > 1 and done < ngen:
+                _migrate(states, migration_size, topology, master)
+                if verbose:
+                    print(f"Migración ({topology}): {migration_size} individuo(s) por isla")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return Assignment(index, best_seats).to_dict(), history
 
 
 def main():
@@ -147,25 +385,75 @@ def main():
     parser.add_argument("--mutpb", type=float, default=0.2, help="Probabilidad de mutación")
     parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria")
     parser.add_argument("--top-k", type=int, default=3, help="Top-k de preferencias para el constructivo")
+    parser.add_argument("--c1-matching", action="store_true",
+                        help="Población inicial con C1 óptimo por día (emparejamiento bipartito)")
     parser.add_argument("--validate", action="store_true", help="Valida la solución antes de exportar")
     parser.add_argument("--outdir", default="results_ga", help="Carpeta de salida para resultados y CSVs")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Límite de tiempo en segundos; al vencer se usa el mejor individuo encontrado")
+    parser.add_argument("--parallel-days", action="store_true",
+                        help="Evoluciona una población por día en un pool de procesos y une los mejores")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para --parallel-days (por defecto uno por día) o --islands (por defecto uno por isla, hasta los núcleos)")
+    parser.add_argument("--islands", type=int, default=1,
+                        help="Modelo de islas: número de poblaciones de --pop-size que evolucionan en procesos distintos (1 = GA clásico)")
+    parser.add_argument("--migration-every", type=int, default=5, help="Generaciones entre migraciones de las islas")
+    parser.add_argument("--migration-size", type=int, default=1, help="Individuos que cada isla envía en cada migración")
+    parser.add_argument("--topology", choices=["ring", "random"], default="ring",
+                        help="Destino de los migrantes: la siguiente isla del anillo o una al azar")
+    parser.add_argument("--relocate-prob", type=float, default=0.0,
+                        help="Fracción de mutaciones que mueven a un empleado a un escritorio libre en vez de hacer un swap")
     args = parser.parse_args()
+    if args.parallel_days and args.islands > 1:
+        parser.error("--parallel-days y --islands no se pueden combinar")
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     instance_file = os.path.join(BASE_DIR, args.infile)
     with open(instance_file, "r", encoding="utf-8") as f:
         instance = json.load(f)
 
-    best, history = run_ga(
-        instance,
-        ngen=args.ngen,
-        pop_size=args.pop_size,
-        cxpb=args.cxpb,
-        mutpb=args.mutpb,
-        seed=args.seed,
-        top_k_pref=args.top_k,
-        verbose=True
-    )
+    deadline = deadline_after(args.time_limit)
+    if args.parallel_days:
+        best = solve_days_parallel(
+            instance,
+            partial(_solve_day_ga, ngen=args.ngen, pop_size=args.pop_size, cxpb=args.cxpb,
+                    mutpb=args.mutpb, top_k_pref=args.top_k, c1_optimal=args.c1_matching,
+                    deadline=deadline, relocate_prob=args.relocate_prob),
+            seed=args.seed, workers=args.workers
+        )
+    elif args.islands > 1:
+        best, history = run_island_ga(
+            instance,
+            islands=args.islands,
+            migration_every=args.migration_every,
+            migration_size=args.migration_size,
+            topology=args.topology,
+            ngen=args.ngen,
+            pop_size=args.pop_size,
+            cxpb=args.cxpb,
+            mutpb=args.mutpb,
+            seed=args.seed,
+            top_k_pref=args.top_k,
+            verbose=True,
+            c1_optimal=args.c1_matching,
+            deadline=deadline,
+            workers=args.workers,
+            relocate_prob=args.relocate_prob
+        )
+    else:
+        best, history = run_ga(
+            instance,
+            ngen=args.ngen,
+            pop_size=args.pop_size,
+            cxpb=args.cxpb,
+            mutpb=args.mutpb,
+            seed=args.seed,
+            top_k_pref=args.top_k,
+            verbose=True,
+            c1_optimal=args.c1_matching,
+            deadline=deadline,
+            relocate_prob=args.relocate_prob
+        )
 
     if args.validate:
         ok, errs = validate_assignment(instance, best)
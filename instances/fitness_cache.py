@@ -0,0 +1,85 @@
+# Memoización de puntajes con hash Zobrist de la asignación
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# El hash de una asignación es el XOR de una llave de 64 bits por cada
+# (celda día×empleado, escritorio). Un swap cambia dos celdas, así que el hash
+# se actualiza con cuatro XOR sin recorrer la semana. Las llaves no se guardan
+# en tablas (con instancias grandes serían millones): se generan al vuelo con
+# la mezcla de splitmix64, que es determinista y bien distribuida.
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from problem_index import Score
+
+MASK = (1 << 64) - 1
+
+
+def zobrist_key(cell: int, desk: int) -> int:
+    """Llave pseudoaleatoria de (celda, escritorio); `desk` puede ser NO_DESK (-1)."""
+    z = (((cell << 20) | (desk + 1)) + 0x9E3779B97F4A7C15) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+def zobrist_hash(seats) -> int:
+    """Hash completo de un array de asientos (O(días × empleados); se calcula una vez)."""
+    h = 0
+    for cell, desk in enumerate(seats):
+        h ^= zobrist_key(cell, desk)
+    return h
+
+
+def zobrist_swap(h: int, cell_a: int, cell_b: int, desk_a: int, desk_b: int) -> int:
+    """Hash tras intercambiar los escritorios de dos celdas (desk_a estaba en cell_a)."""
+    return (h ^ zobrist_key(cell_a, desk_a) ^ zobrist_key(cell_b, desk_b)
+            ^ zobrist_key(cell_a, desk_b) ^ zobrist_key(cell_b, desk_a))
+
+
+class FitnessCache:
+    """
+    Caché LRU acotada hash -> (C1, C2, C3). `hits` y `misses` cuentan las
+    consultas; cada acierto es una evaluación completa ahorrada.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_entries")
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = max(1, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Score]" = OrderedDict()
+
+    def get(self, key: int) -> Optional[Score]:
+        score = self._entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key: int, score: Score) -> None:
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def score(self, assignment) -> Score:
+        """Puntaje de un `Assignment` usando la caché (su hash se mantiene en O(1) por swap)."""
+        key = assignment.zobrist()
+        score = self.get(key)
+        if score is None:
+            score = assignment.score()
+            self.put(key, score)
+        return score
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,291 @@
+# Evaluación incremental del puntaje lexicográfico (C1, C2, C3)
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Todos los movimientos de los solvers (swaps de dos empleados en un mismo día)
+# cambian a lo sumo dos aciertos de preferencia y los contadores zona de dos
+# grupos, así que no hace falta recorrer toda la semana para puntuarlos. Una
+# reubicación (un empleado pasa a un escritorio libre) además cambia la
+# ocupación de dos zonas: su ΔC3 sólo recorre la ocupación por zona del día.
+
+from collections import Counter
+from typing import List
+
+from compact_assignment import Assignment
+from problem_index import Score
+
+
+class IncrementalEvaluator:
+    """
+    Mantiene el puntaje (C1, C2, C3) de una `Assignment` y calcula en O(1) la
+    variación de intercambiar los escritorios de dos empleados en un día.
+
+    Por día guarda los aciertos de preferencia (C1), los contadores grupo×zona
+    junto con un histograma de esos contadores para conocer el máximo de cada
+    grupo sin recorrer zonas (C2) y la ocupación por zona (C3).
+
+    `apply_swap` modifica la asignación en sitio (el swap queda registrado en
+    ella); `undo` revierte el último swap aplicado y `commit` lo da por aceptado.
+    """
+
+    def __init__(self, assignment: Assignment):
+        self.assignment = assignment
+        self.index = index = assignment.index
+        n_days = index.n_days
+        self.c1: List[int] = [0] * n_days
+        self.c2: List[int] = [0] * n_days
+        self.c3: List[int] = [0] * n_days
+        # día -> grupo -> miembros sentados por zona
+        self.group_zone: List[List[List[int]]] = []
+        # día -> grupo -> Counter(tamaño -> nº de zonas con ese tamaño)
+        self.group_hist: List[List[Counter]] = []
+        # día -> grupo -> mayor agregado en una zona
+        self.group_max: List[List[int]] = []
+        # día -> ocupación por zona
+        self.zone_occ: List[List[int]] = []
+        # Contadores de `swap_improves` (evaluaciones y criterios omitidos)
+        self.counters: Counter = Counter()
+        for day in range(n_days):
+            self._build_day(day)
+
+    def _build_day(self, day: int) -> None:
+        index = self.index
+        n_zones = len(index.zones)
+        group_zone = [[0] * n_zones for _ in index.groups]
+        zone_occ = [0] * n_zones
+        c1 = 0
+        for e, d in enumerate(self.assignment.day_row(day)):
+            if d < 0:
+                continue
+            if d in index.prefs[e]:
+                c1 += 1
+            z = index.desk_zone[d]
+            if z < 0:
+                continue
+            zone_occ[z] += 1
+            g = index.emp_group[e]
+            if g >= 0:
+                group_zone[g][z] += 1
+
+        group_hist = [Counter(n for n in counts if n) for counts in group_zone]
+        group_max = [max(counts, default=0) for counts in group_zone]
+        occupied = [n for n in zone_occ if n]
+
+        self.c1[day] = c1
+        self.c2[day] = sum(group_max)
+        self.c3[day] = -(max(occupied) - min(occupied)) if occupied else 0
+        self.group_zone.append(group_zone)
+        self.group_hist.append(group_hist)
+        self.group_max.append(group_max)
+        self.zone_occ.append(zone_occ)
+
+    @property
+    def score(self) -> Score:
+        return (sum(self.c1), sum(self.c2), sum(self.c3))
+
+    def day_score(self, day: int) -> Score:
+        return (self.c1[day], self.c2[day], self.c3[day])
+
+    # ---------- Deltas ----------
+    def _group_move_delta(self, day: int, g: int, z_from: int, z_to: int) -> int:
+        """Variación del máximo del grupo g al mover un miembro de z_from a z_to."""
+        counts = self.group_zone[day][g]
+        mx = self.group_max[day][g]
+        new_mx = mx
+        if z_from >= 0 and counts[z_from] == mx and self.group_hist[day][g][mx] == 1:
+            new_mx = mx - 1
+        if z_to >= 0 and counts[z_to] + 1 > new_mx:
+            new_mx = counts[z_to] + 1
+        return new_mx - mx
+
+    def _swap_dc1(self, day: int, a: int, b: int) -> int:
+        index = self.index
+        da, db = self.assignment.desk(day, a), self.assignment.desk(day, b)
+        pa, pb = index.prefs[a], index.prefs[b]
+        return (db in pa) + (da in pb) - (da in pa) - (db in pb)
+
+    def _swap_dc2(self, day: int, a: int, b: int) -> int:
+        index = self.index
+        da, db = self.assignment.desk(day, a), self.assignment.desk(day, b)
+        za = index.desk_zone[da] if da >= 0 else -1
+        zb = index.desk_zone[db] if db >= 0 else -1
+        dc2 = 0
+        if za != zb:
+            ga, gb = index.emp_group[a], index.emp_group[b]
+            if ga != gb:
+                if ga >= 0:
+                    dc2 += self._group_move_delta(day, ga, za, zb)
+                if gb >= 0:
+                    dc2 += self._group_move_delta(day, gb, zb, za)
+        return dc2
+
+    def swap_delta(self, day: int, a: int, b: int) -> Score:
+        """(ΔC1, ΔC2, ΔC3) de intercambiar los escritorios de a y b en `day`."""
+        # Un swap conserva el conjunto de escritorios ocupados: la ocupación
+        # por zona (y por tanto C3) no cambia.
+        return (self._swap_dc1(day, a, b), self._swap_dc2(day, a, b), 0)
+
+    def _relocate_dc3(self, day: int, z_from: int, z_to: int) -> int:
+        if z_from == z_to:
+            return 0
+        occ = self.zone_occ[day]
+        hi, lo = 0, None
+        for z, n in enumerate(occ):
+            if z == z_from:
+                n -= 1
+            elif z == z_to:
+                n += 1
+            if n:
+                hi = n if n > hi else hi
+                lo = n if lo is None or n < lo else lo
+        return (-(hi - lo) if lo is not None else 0) - self.c3[day]
+
+    def relocate_delta(self, day: int, e: int, d: int) -> Score:
+        """(ΔC1, ΔC2, ΔC3) de mover al empleado e al escritorio libre d en `day`."""
+        index = self.index
+        old = self.assignment.desk(day, e)
+        pe = index.prefs[e]
+        dc1 = (d in pe) - (old in pe)
+        z_from = index.desk_zone[old] if old >= 0 else -1
+        z_to = index.desk_zone[d]
+        dc2 = 0
+        g = index.emp_group[e]
+        if z_from != z_to and g >= 0:
+            dc2 = self._group_move_delta(day, g, z_from, z_to)
+        return (dc1, dc2, self._relocate_dc3(day, z_from, z_to))
+
+    def swap_improves(self, day: int, a: int, b: int) -> bool:
+        """
+        ¿El swap mejora estrictamente (C1, C2, C3)? Calcula los criterios en
+        orden lexicográfico y se detiene en cuanto uno decide: si ΔC1 ≠ 0 no
+        calcula ΔC2 ni ΔC3, y si ΔC2 ≠ 0 no calcula ΔC3. Las omisiones se
+        cuentan en `counters` (evaluated, skipped_c2, skipped_c3).
+        """
+        counters = self.counters
+        counters["evaluated"] += 1
+        dc1 = self._swap_dc1(day, a, b)
+        if dc1:
+            counters["skipped_c2"] += 1
+            counters["skipped_c3"] += 1
+            return dc1 > 0
+        dc2 = self._swap_dc2(day, a, b)
+        if dc2:
+            counters["skipped_c3"] += 1
+            return dc2 > 0
+        # ΔC3 de un swap es siempre 0: no hay mejora estricta
+        return False
+
+    # ---------- Aplicar / deshacer ----------
+    def _group_move(self, day: int, g: int, z_from: int, z_to: int) -> None:
+        counts = self.group_zone[day][g]
+        hist = self.group_hist[day][g]
+        old_mx = mx = self.group_max[day][g]
+        if z_from >= 0:
+            c = counts[z_from]
+            hist[c] -= 1
+            if c == mx and hist[c] == 0:
+                mx -= 1
+            counts[z_from] = c - 1
+            if c > 1:
+                hist[c - 1] += 1
+        if z_to >= 0:
+            c = counts[z_to] + 1
+            counts[z_to] = c
+            if c > 1:
+                hist[c - 1] -= 1
+            hist[c] += 1
+            if c > mx:
+                mx = c
+        self.c2[day] += mx - old_mx
+        self.group_max[day][g] = mx
+
+    def _update_swap(self, day: int, a: int, b: int) -> None:
+        index = self.index
+        da, db = self.assignment.desk(day, a), self.assignment.desk(day, b)
+        pa, pb = index.prefs[a], index.prefs[b]
+        self.c1[day] += (db in pa) + (da in pb) - (da in pa) - (db in pb)
+        za = index.desk_zone[da] if da >= 0 else -1
+        zb = index.desk_zone[db] if db >= 0 else -1
+        if za != zb:
+            ga, gb = index.emp_group[a], index.emp_group[b]
+            if ga != gb:
+                if ga >= 0:
+                    self._group_move(day, ga, za, zb)
+                if gb >= 0:
+                    self._group_move(day, gb, zb, za)
+
+    def _update_relocate(self, day: int, e: int, d_from: int, d_to: int) -> None:
+        index = self.index
+        pe = index.prefs[e]
+        self.c1[day] += (d_to in pe) - (d_from in pe)
+        z_from = index.desk_zone[d_from] if d_from >= 0 else -1
+        z_to = index.desk_zone[d_to] if d_to >= 0 else -1
+        if z_from == z_to:
+            return
+        self.c3[day] += self._relocate_dc3(day, z_from, z_to)
+        occ = self.zone_occ[day]
+        if z_from >= 0:
+            occ[z_from] -= 1
+        if z_to >= 0:
+            occ[z_to] += 1
+        g = index.emp_group[e]
+        if g >= 0:
+            self._group_move(day, g, z_from, z_to)
+
+    def apply_swap(self, day: int, a: int, b: int) -> None:
+        self._update_swap(day, a, b)
+        self.assignment.swap(day, a, b)
+
+    def apply_relocate(self, day: int, e: int, d: int) -> None:
+        self._update_relocate(day, e, self.assignment.desk(day, e), d)
+        self.assignment.relocate(day, e, d)
+
+    def undo(self) -> None:
+        """Revierte el último movimiento aplicado (un swap es su propio inverso)."""
+        move = self.assignment.last_move()
+        if len(move) == 4:
+            day, e, old, new = move
+            self._update_relocate(day, e, new, old)
+        else:
+            day, a, b = move
+            self._update_swap(day, a, b)
+        self.assignment.undo()
+
+    def commit(self) -> None:
+        self.assignment.commit()
+
+
+def swap_delta(assignment: Assignment, day: int, a: int, b: int) -> Score:
+    """
+    Variante sin estado de `IncrementalEvaluator.swap_delta`: sólo recuenta los
+    grupos de a y b en ese día. Útil cuando no compensa mantener contadores
+    (p. ej. mutación de un hijo en el GA).
+    """
+    index = assignment.index
+    da, db = assignment.desk(day, a), assignment.desk(day, b)
+    pa, pb = index.prefs[a], index.prefs[b]
+    dc1 = (db in pa) + (da in pb) - (da in pa) - (db in pb)
+
+    za = index.desk_zone[da] if da >= 0 else -1
+    zb = index.desk_zone[db] if db >= 0 else -1
+    dc2 = 0
+    if za != zb:
+        ga, gb = index.emp_group[a], index.emp_group[b]
+        if ga != gb:
+            for g in (ga, gb):
+                if g < 0:
+                    continue
+                before, after = Counter(), Counter()
+                for e in index.group_members[g]:
+                    d = assignment.desk(day, e)
+                    z = index.desk_zone[d] if d >= 0 else -1
+                    if z >= 0:
+                        before[z] += 1
+                    if e == a:
+                        z = zb
+                    elif e == b:
+                        z = za
+                    if z >= 0:
+                        after[z] += 1
+                dc2 += max(after.values(), default=0) - max(before.values(), default=0)
+    return (dc1, dc2, 0)
@@ -0,0 +1,62 @@
+# Objetivo lexicográfico escalar con pesos derivados de la instancia
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# `c1*10000 + c2*100 + c3` sólo respeta el orden lexicográfico si C2 < 100 y
+# |C3| < 100; con 100 empleados C2 ya pasa de 100 (grupos × días). Aquí los
+# pesos se calculan a partir de cotas de la instancia para que una unidad de
+# un criterio siempre pese más que todo el rango de los siguientes.
+
+from typing import Tuple
+
+from problem_index import ProblemIndex, Score, compile_instance
+
+# Pesos mínimos: en las instancias pequeñas coinciden con los históricos, así
+# que las temperaturas de SA (calibradas para ellos) conservan su sentido.
+MIN_W2 = 100
+MIN_W1 = 10000
+
+
+def score_bounds(index: ProblemIndex) -> Tuple[int, int]:
+    """
+    Cotas (máx C2, máx |C3|) de la semana:
+    - C2 de un día no supera el número de presentes con grupo que caben en escritorios.
+    - |C3| de un día no supera la capacidad de la zona más grande menos uno.
+    """
+    n_desks = index.n_listed_desks
+    biggest_zone = max((len(ds) for ds in index.zone_desks), default=0)
+    max_c2 = 0
+    max_c3 = 0
+    for present in index.present_list:
+        grouped = sum(1 for e in present if index.emp_group[e] >= 0)
+        max_c2 += min(grouped, n_desks)
+        max_c3 += max(biggest_zone - 1, 0)
+    return max_c2, max_c3
+
+
+class LexObjective:
+    """
+    Escalar `c1*w1 + c2*w2 + c3` que preserva el orden lexicográfico:
+    w2 > máx |C3| y w1 > máx C2·w2 + máx |C3|. Es lineal, así que también
+    convierte deltas (ΔC1, ΔC2, ΔC3) para la aceptación de Metropolis.
+    """
+
+    __slots__ = ("w1", "w2", "w3")
+
+    def __init__(self, index: ProblemIndex):
+        max_c2, max_c3 = score_bounds(index)
+        self.w3 = 1
+        self.w2 = max(MIN_W2, max_c3 + 1)
+        self.w1 = max(MIN_W1, max_c2 * self.w2 + max_c3 + 1)
+
+    def scalar(self, score: Score) -> int:
+        c1, c2, c3 = score
+        return c1 * self.w1 + c2 * self.w2 + c3 * self.w3
+
+    # Un delta se convierte igual que un puntaje
+    delta = scalar
+
+
+def lex_objective(instance: dict) -> LexObjective:
+    """Objetivo escalar de la instancia (usa el `ProblemIndex` cacheado)."""
+    return LexObjective(compile_instance(instance))
@@ -0,0 +1,88 @@
+# Emparejamiento bipartito máximo (Hopcroft–Karp)
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# En un día, C1 es exactamente el tamaño de un emparejamiento entre los
+# empleados presentes y sus escritorios preferidos (cada escritorio a lo sumo
+# una persona), así que su máximo se obtiene con un emparejamiento máximo.
+
+from collections import deque
+from typing import List, Optional
+
+UNMATCHED = -1
+
+
+def hopcroft_karp(adj: List[List[int]], n_right: int,
+                  match_left: Optional[List[int]] = None) -> List[int]:
+    """
+    Emparejamiento máximo en O(E·√V).
+
+    - adj[u]: vértices derechos (escritorios) adyacentes al izquierdo u.
+    - match_left: emparejamiento inicial opcional (se respeta y sólo se
+      aumenta); debe ser consistente con `adj` y sin escritorios repetidos.
+
+    Devuelve match_left[u] = escritorio de u o UNMATCHED.
+    """
+    n_left = len(adj)
+    match_l = list(match_left) if match_left is not None else [UNMATCHED] * n_left
+    match_r = [UNMATCHED] * n_right
+    for u, v in enumerate(match_l):
+        if v != UNMATCHED:
+            match_r[v] = u
+
+    inf = n_left + 1
+    dist = [0] * n_left
+
+    def bfs() -> bool:
+        queue = deque()
+        for u in range(n_left):
+            if match_l[u] == UNMATCHED:
+                dist[u] = 0
+                queue.append(u)
+            else:
+                dist[u] = inf
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adj[u]:
+                w = match_r[v]
+                if w == UNMATCHED:
+                    found = True
+                elif dist[w] == inf:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return found
+
+    def dfs(root: int) -> bool:
+        # DFS iterativo por capas: stack de (u, posición en adj[u])
+        stack = [[root, 0]]
+        path: List[int] = []
+        while stack:
+            frame = stack[-1]
+            u, i = frame
+            if i == len(adj[u]):
+                dist[u] = inf  # sin camino aumentante desde u en esta fase
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            frame[1] = i + 1
+            v = adj[u][i]
+            w = match_r[v]
+            if w == UNMATCHED:
+                # Camino aumentante: invertir las aristas de la pila
+                path.append(v)
+                for (x, _), y in zip(stack, path):
+                    match_l[x] = y
+                    match_r[y] = x
+                return True
+            if dist[w] == dist[u] + 1:
+                path.append(v)
+                stack.append([w, 0])
+        return False
+
+    while bfs():
+        for u in range(n_left):
+            if match_l[u] == UNMATCHED:
+                dfs(u)
+    return match_l
@@ -0,0 +1,96 @@
+# Flujo de costo mínimo (caminos más cortos sucesivos con potenciales)
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import heapq
+from typing import List, Tuple
+
+
+class MinCostFlow:
+    """
+    Red con capacidades y costos enteros. Admite costos negativos siempre que
+    no haya ciclos negativos: los potenciales iniciales se calculan con
+    Bellman-Ford y luego cada aumento usa Dijkstra con costos reducidos.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        # Arista: [destino, capacidad restante, costo, índice de la reversa]
+        self.graph: List[List[list]] = [[] for _ in range(n)]
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> Tuple[int, int]:
+        """Agrega u->v y devuelve (u, posición) para consultar su flujo después."""
+        self.graph[u].append([v, cap, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow_on(self, edge: Tuple[int, int]) -> int:
+        u, i = edge
+        v, _, _, rev = self.graph[u][i]
+        return self.graph[v][rev][1]
+
+    def _initial_potentials(self, s: int) -> List[int]:
+        inf = float("inf")
+        dist = [inf] * self.n
+        dist[s] = 0
+        for _ in range(self.n - 1):
+            changed = False
+            for u in range(self.n):
+                du = dist[u]
+                if du == inf:
+                    continue
+                for v, cap, cost, _ in self.graph[u]:
+                    if cap > 0 and du + cost < dist[v]:
+                        dist[v] = du + cost
+                        changed = True
+            if not changed:
+                break
+        return [d if d != inf else 0 for d in dist]
+
+    def solve(self, s: int, t: int, max_flow: int) -> Tuple[int, int]:
+        """Envía hasta `max_flow` unidades de s a t con costo mínimo; devuelve (flujo, costo)."""
+        graph = self.graph
+        potential = self._initial_potentials(s)
+        flow = cost = 0
+        inf = float("inf")
+        while flow < max_flow:
+            dist = [inf] * self.n
+            prev: List[Tuple[int, int]] = [(-1, -1)] * self.n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                pu = potential[u]
+                for i, (v, cap, c, _) in enumerate(graph[u]):
+                    if cap <= 0:
+                        continue
+                    nd = d + c + pu - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+            if dist[t] == inf:
+                break
+            for v in range(self.n):
+                if dist[v] != inf:
+                    potential[v] += dist[v]
+
+            # Cuello de botella del camino
+            push = max_flow - flow
+            v = t
+            while v != s:
+                u, i = prev[v]
+                push = min(push, graph[u][i][1])
+                v = u
+            v = t
+            while v != s:
+                u, i = prev[v]
+                edge = graph[u][i]
+                edge[1] -= push
+                graph[v][edge[3]][1] += push
+                cost += push * edge[2]
+                v = u
+            flow += push
+        return flow, cost
@@ -0,0 +1,171 @@
+# Parallel tempering (intercambio de réplicas) sobre el vecindario de swaps
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# El recocido depende mucho de `--tinit/--tfinal/--alpha` y lo compensábamos
+# corriendo muchas semillas. Aquí N réplicas corren Metropolis con el mismo
+# vecindario que `simulated_annealing_swaps`, cada una a una temperatura fija
+# de una escalera geométrica. Cada `exchange_every` movimientos se proponen
+# intercambios entre temperaturas vecinas: las soluciones buenas bajan a las
+# réplicas frías y las frías, si se estancan, suben a calentarse. Las
+# réplicas corren en un pool de procesos (o en este proceso con workers=1);
+# entre rondas sólo viajan los asientos, la temperatura y el estado del RNG.
+
+import math
+import os
+import random
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from compact_assignment import Assignment
+from deadline import Clock
+from incremental_eval import IncrementalEvaluator
+from lex_objective import LexObjective
+from problem_index import compile_instance
+from worker_pool import instance_pool, worker_instance
+
+def temperature_ladder(t_min: float, t_max: float, replicas: int) -> List[float]:
+    """Temperaturas geométricas de t_min (réplica 0, la más fría) a t_max."""
+    if replicas <= 1:
+        return [t_min]
+    ratio = (t_max / t_min) ** (1.0 / (replicas - 1))
+    return [t_min * ratio ** k for k in range(replicas)]
+
+
+def _run_replica(state: dict, steps: int, deadline: Optional[float]) -> dict:
+    """
+    `steps` movimientos de Metropolis a la temperatura fija `state["T"]`.
+    Devuelve el estado siguiente con su valor y la mejor solución vista.
+    """
+    index = compile_instance(worker_instance())
+    objective = LexObjective(index)
+    rng = random.Random()
+    rng.setstate(state["rng"])
+    current = Assignment(index, state["seats"])
+    evaluator = IncrementalEvaluator(current)
+    value = objective.scalar(evaluator.score)
+    best_seats, best_value = state["best_seats"], state["best_value"]
+    if best_value is None or value > best_value:
+        best_seats, best_value = current.seats[:], value
+    T = state["T"]
+    days = list(range(index.n_days))
+    assigned = [current.assigned(day) for day in days]
+    # Una ronda tiene pocos movimientos: con el `every` por defecto el reloj
+    # no se leería nunca dentro de ella
+    clock = Clock(deadline, every=min(32, steps))
+    accepted = 0
+    for _ in range(steps if days else 0):
+        if clock.expired():
+            break
+        day = rng.choice(days)
+        assigned_today = assigned[day]
+        if len(assigned_today) < 2:
+            continue
+        a, b = rng.sample(assigned_today, 2)
+        delta = objective.delta(evaluator.swap_delta(day, a, b))
+        if delta > 0 or rng.random() < math.exp(delta / T):
+            evaluator.apply_swap(day, a, b)
+            evaluator.commit()
+            value += delta
+            accepted += 1
+            if value > best_value:
+                best_seats, best_value = current.seats[:], value
+    return {"seats": current.seats, "value": value, "T": T, "rng": rng.getstate(),
+            "best_seats": best_seats, "best_value": best_value, "accepted": accepted,
+            "timed_out": clock.timed_out}
+
+
+def _exchange(states: List[dict], order: List[int], temps: List[float], parity: int,
+              rng: random.Random, attempts: List[int], accepted: List[int]) -> None:
+    """
+    Propone intercambios entre las temperaturas k y k+1 (k de la misma
+    paridad que `parity`, alternando en cada ronda). `order[k]` es la réplica
+    que está a la temperatura k; intercambiar es cruzar temperaturas, no
+    copiar soluciones. Se acepta con min(1, exp((v_j - v_i)(1/T_i - 1/T_j))).
+    """
+    for k in range(parity, len(order) - 1, 2):
+        i, j = order[k], order[k + 1]
+        attempts[k] += 1
+        x = (states[j]["value"] - states[i]["value"]) * (1.0 / temps[k] - 1.0 / temps[k + 1])
+        if x >= 0 or rng.random() < math.exp(x):
+            order[k], order[k + 1] = j, i
+            states[i]["T"], states[j]["T"] = temps[k + 1], temps[k]
+            accepted[k] += 1
+
+
+def parallel_tempering(instance: dict,
+                       assignment: Dict[str, Dict[str, Optional[str]]],
+                       replicas: int = 8,
+                       t_min: float = 1.0,
+                       t_max: float = 200.0,
+                       rounds: int = 100,
+                       exchange_every: int = 200,
+                       seed: int = 123,
+                       deadline: Optional[float] = None,
+                       workers: Optional[int] = None) -> Tuple[Dict[str, Dict[str, Optional[str]]], dict]:
+    """
+    Parallel tempering desde `assignment`: `replicas` cadenas de Metropolis a
+    temperaturas geométricas fijas entre `t_min` y `t_max`; en cada una de
+    las `rounds` rondas cada réplica hace `exchange_every` movimientos y luego
+    se proponen intercambios entre temperaturas vecinas. Cada réplica usa su
+    propio RNG derivado de `seed`, así que el resultado no depende de
+    `workers` (con `workers=1` todo corre en este proceso).
+    Devuelve (mejor solución, estadísticas de intercambio por par de temperaturas).
+    """
+    replicas = max(1, replicas)
+    rounds = max(1, rounds)
+    temps = temperature_ladder(t_min, t_max, replicas)
+    master = random.Random(seed)
+    index = compile_instance(instance)
+    seats = Assignment.from_dict(index, assignment).seats
+    states = [{"seats": seats[:], "T": T, "rng": random.Random(master.randint(0, 10**9)).getstate(),
+               "best_seats": None, "best_value": None, "value": None} for T in temps]
+    order = list(range(replicas))
+    attempts = [0] * (replicas - 1)
+    accepted = [0] * (replicas - 1)
+    moves_accepted = [0] * replicas
+    run = partial(_run_replica, steps=exchange_every, deadline=deadline)
+    done = 0
+
+    workers = min(workers or os.cpu_count() or 1, replicas)
+    pool = instance_pool(instance, workers)
+    try:
+        for r in range(rounds):
+            # Con el plazo vencido no se lanzan más rondas (la primera siempre corre)
+            if r and deadline is not None and time.monotonic() >= deadline:
+                break
+            sent = [{k: st[k] for k in ("seats", "T", "rng", "best_seats", "best_value")} for st in states]
+            states = list(pool.map(run, sent)) if pool is not None else [run(st) for st in sent]
+            for k, i in enumerate(order):
+                moves_accepted[k] += states[i]["accepted"]
+            done += 1
+            if any(st["timed_out"] for st in states):
+                break
+            if replicas > 1:
+                _exchange(states, order, temps, r % 2, master, attempts, accepted)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    winner = max(range(replicas), key=lambda i: states[i]["best_value"])
+    stats = {
+        "temperatures": temps,
+        "exchange_attempts": attempts,
+        "exchange_accepted": accepted,
+        "exchange_rate": [a / n if n else 0.0 for a, n in zip(accepted, attempts)],
+        "rounds": done,
+        "move_accepted": moves_accepted,
+        "move_rate": [m / (done * exchange_every) if done and exchange_every else 0.0 for m in moves_accepted],
+    }
+    return Assignment(index, states[winner]["best_seats"]).to_dict(), stats
+
+
+def format_exchange_stats(stats: dict) -> List[str]:
+    """Líneas legibles: aceptación de movimientos por temperatura e intercambios por par vecino."""
+    temps = stats["temperatures"]
+    lines = [f"T {t:.3g}: {rate:.0%} de movimientos aceptados" for t, rate in zip(temps, stats["move_rate"])]
+    for k, rate in enumerate(stats["exchange_rate"]):
+        lines.append(f"T {temps[k]:.3g} <-> {temps[k + 1]:.3g}: {stats['exchange_accepted'][k]}/"
+                     f"{stats['exchange_attempts'][k]} intercambios ({rate:.0%})")
+    return lines
@@ -0,0 +1,193 @@
+# Forma compilada (índices enteros) de una instancia JSON
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Las funciones de las entregas reciben el `instance` tal cual se lee del JSON y
+# antes reconstruían en cada llamada el mapa escritorio->zona, buscaban el grupo
+# de un empleado recorriendo todos los grupos y comprobaban preferencias con
+# `d in lista`. Aquí se hace todo eso una sola vez y se trabaja con enteros.
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+NO_DESK = -1
+
+Score = Tuple[int, int, int]
+
+
+class ProblemIndex:
+    """
+    Instancia compilada a enteros.
+
+    - employees / desks / zones / groups / days: nombres en el orden del JSON;
+      el id de cada elemento es su posición (`emp_id`, `desk_id`, ...).
+    - desk_zone[d]: zona del escritorio d (-1 si no pertenece a ninguna).
+    - emp_group[e]: grupo del empleado e (-1 si no tiene); como en
+      `employee_group`, si aparece en varios grupos cuenta el primero.
+    - pref_list[e] (orden original), prefs[e] (frozenset) y pref_mask[e]
+      (bitset) con los escritorios preferidos del empleado.
+    - present[day][e]: asistencia según `Days_E` (todos presentes si falta).
+    """
+
+    def __init__(self, instance: dict):
+        self.days: List[str] = list(instance.get("Days", []))
+        self.employees: List[str] = list(instance.get("Employees", []))
+        self.desks: List[str] = list(instance.get("Desks", []))
+        # Escritorios de la instancia en su orden (el constructivo los recorre así)
+        self.n_listed_desks = len(self.desks)
+        desks_z = instance.get("Desks_Z", {})
+        desks_e = instance.get("Desks_E", {})
+        # Escritorios mencionados en zonas/preferencias pero no en `Desks`
+        known = set(self.desks)
+        for ds in list(desks_z.values()) + list(desks_e.values()):
+            for d in ds:
+                if d not in known:
+                    known.add(d)
+                    self.desks.append(d)
+
+        self.zones: List[str] = list(instance.get("Zones", []))
+        for z in desks_z:
+            if z not in self.zones:
+                self.zones.append(z)
+        employees_g = instance.get("Employees_G", {})
+        self.groups: List[str] = list(employees_g.keys())
+
+        self.day_id: Dict[str, int] = {d: i for i, d in enumerate(self.days)}
+        self.emp_id: Dict[str, int] = {e: i for i, e in enumerate(self.employees)}
+        self.desk_id: Dict[str, int] = {d: i for i, d in enumerate(self.desks)}
+        self.zone_id: Dict[str, int] = {z: i for i, z in enumerate(self.zones)}
+        self.group_id: Dict[str, int] = {g: i for i, g in enumerate(self.groups)}
+
+        self.desk_zone: List[int] = [-1] * len(self.desks)
+        for z, ds in desks_z.items():
+            for d in ds:
+                self.desk_zone[self.desk_id[d]] = self.zone_id[z]
+        self.zone_desks: List[List[int]] = [[] for _ in self.zones]
+        for d, z in enumerate(self.desk_zone):
+            if z >= 0:
+                self.zone_desks[z].append(d)
+
+        self.emp_group: List[int] = [-1] * len(self.employees)
+        self.group_members: List[List[int]] = [[] for _ in self.groups]
+        for g, members in employees_g.items():
+            gi = self.group_id[g]
+            for e in members:
+                ei = self.emp_id.get(e)
+                if ei is None:
+                    continue
+                self.group_members[gi].append(ei)
+                if self.emp_group[ei] < 0:
+                    self.emp_group[ei] = gi
+
+        self.pref_list: List[List[int]] = [
+            [self.desk_id[d] for d in desks_e.get(e, [])] for e in self.employees
+        ]
+        self.prefs: List[frozenset] = [frozenset(p) for p in self.pref_list]
+        self.pref_mask: List[int] = [sum(1 << d for d in p) for p in self.prefs]
+
+        days_e = instance.get("Days_E", {})
+        if not days_e:
+            self.present = [[True] * len(self.employees) for _ in self.days]
+        else:
+            att = [set(days_e.get(e, [])) for e in self.employees]
+            self.present = [[day in att[e] for e in range(len(self.employees))] for day in self.days]
+        self.present_list: List[List[int]] = [
+            [e for e, p in enumerate(row) if p] for row in self.present
+        ]
+
+    @property
+    def n_days(self) -> int:
+        return len(self.days)
+
+    @property
+    def n_employees(self) -> int:
+        return len(self.employees)
+
+    # ---------- Conversión dict <-> enteros ----------
+    def encode_day(self, seats: Dict[str, Optional[str]]) -> List[int]:
+        row = [NO_DESK] * len(self.employees)
+        for e, d in seats.items():
+            ei = self.emp_id.get(e)
+            if ei is None or d is None:
+                continue
+            di = self.desk_id.get(d)
+            if di is None:
+                raise ValueError(f"Escritorio desconocido en la asignación: {d}")
+            row[ei] = di
+        return row
+
+    def encode(self, assignment: Dict[str, Dict[str, Optional[str]]]) -> List[List[int]]:
+        """Asignación `día -> empleado -> escritorio` a filas días×empleados (-1 = sin escritorio)."""
+        return [self.encode_day(assignment[day]) for day in self.days]
+
+    def decode_day(self, row: List[int]) -> Dict[str, Optional[str]]:
+        desks = self.desks
+        return {e: (desks[d] if d >= 0 else None) for e, d in zip(self.employees, row)}
+
+    def decode(self, rows: List[List[int]]) -> Dict[str, Dict[str, Optional[str]]]:
+        return {day: self.decode_day(row) for day, row in zip(self.days, rows)}
+
+    # ---------- Puntaje sobre enteros ----------
+    def score_day(self, row: List[int]) -> Score:
+        desk_zone, emp_group, prefs = self.desk_zone, self.emp_group, self.prefs
+        c1 = 0
+        zone_occ = [0] * len(self.zones)
+        group_zone = [[0] * len(self.zones) for _ in self.groups]
+        for e, d in enumerate(row):
+            if d < 0:
+                continue
+            if d in prefs[e]:
+                c1 += 1
+            z = desk_zone[d]
+            if z < 0:
+                continue
+            zone_occ[z] += 1
+            g = emp_group[e]
+            if g >= 0:
+                group_zone[g][z] += 1
+        c2 = sum(max(counts, default=0) for counts in group_zone)
+        occupied = [n for n in zone_occ if n]
+        c3 = -(max(occupied) - min(occupied)) if occupied else 0
+        return (c1, c2, c3)
+
+    def score(self, rows: List[List[int]]) -> Score:
+        c1 = c2 = c3 = 0
+        for row in rows:
+            a, b, c = self.score_day(row)
+            c1 += a
+            c2 += b
+            c3 += c
+        return (c1, c2, c3)
+
+    def isolated_day(self, row: List[int]) -> int:
+        """Empleados sin otro miembro de su grupo en su zona ese día."""
+        counts: Counter = Counter()
+        seated = []
+        for e, d in enumerate(row):
+            if d < 0:
+                continue
+            g, z = self.emp_group[e], self.desk_zone[d]
+            if g < 0 or z < 0:
+                continue
+            counts[(g, z)] += 1
+            seated.append((g, z))
+        return sum(1 for key in seated if counts[key] <= 1)
+
+
+_CACHE: Dict[int, Tuple[dict, ProblemIndex]] = {}
+_CACHE_SIZE = 16
+
+
+def compile_instance(instance: dict) -> ProblemIndex:
+    """
+    Devuelve el `ProblemIndex` de la instancia, compilándolo sólo la primera
+    vez. La caché guarda también la instancia para que su `id` no se reutilice.
+    """
+    hit = _CACHE.get(id(instance))
+    if hit is not None and hit[0] is instance:
+        return hit[1]
+    index = ProblemIndex(instance)
+    if len(_CACHE) >= _CACHE_SIZE:
+        _CACHE.pop(next(iter(_CACHE)))
+    _CACHE[id(instance)] = (instance, index)
+    return index
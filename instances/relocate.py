@@ -0,0 +1,138 @@
+# Vecindario de reubicación: un empleado pasa a un escritorio libre
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Los movimientos de SA, ILS y GA sólo intercambian escritorios entre dos
+# empleados ya sentados, así que nunca se usa un escritorio que quedó libre
+# (con asistencia parcial sobran muchos). Aquí se mantienen, por día y por
+# zona, los escritorios libres de la instancia; elegir uno al azar, tomarlo o
+# liberarlo cuesta O(1). El delta de la reubicación está en
+# `IncrementalEvaluator.relocate_delta` (o en `relocate_delta` de este
+# módulo para quien no mantiene contadores, como la mutación del GA).
+
+import random
+from typing import List, Optional, Tuple
+
+from compact_assignment import Assignment
+from problem_index import Score
+
+
+class FreeDesks:
+    """
+    Escritorios libres de cada día agrupados por zona (la zona -1 agrupa los
+    escritorios sin zona). Cada grupo es una lista con un índice de
+    posiciones, así que agregar, quitar y muestrear son O(1). Sólo cuentan
+    los escritorios listados en `Desks` (los únicos válidos en una solución).
+    """
+
+    __slots__ = ("_zone_of", "_free", "_pos", "_count")
+
+    def __init__(self, assignment: Assignment):
+        index = assignment.index
+        n_zones = len(index.zones)
+        # Columna 0 = sin zona; la zona z va en la columna z + 1
+        self._zone_of = [index.desk_zone[d] + 1 for d in range(index.n_listed_desks)]
+        self._free: List[List[List[int]]] = []
+        self._pos: List[dict] = []
+        self._count: List[int] = []
+        for day in range(index.n_days):
+            used = set(assignment.day_row(day))
+            by_zone: List[List[int]] = [[] for _ in range(n_zones + 1)]
+            pos = {}
+            for d in range(index.n_listed_desks):
+                if d not in used:
+                    bucket = by_zone[self._zone_of[d]]
+                    pos[d] = len(bucket)
+                    bucket.append(d)
+            self._free.append(by_zone)
+            self._pos.append(pos)
+            self._count.append(len(pos))
+
+    def count(self, day: int) -> int:
+        return self._count[day]
+
+    def in_zone(self, day: int, zone: int) -> List[int]:
+        """Escritorios libres de `zone` ese día (vista: no modificar)."""
+        return self._free[day][zone + 1]
+
+    def sample(self, day: int, rng: random.Random, zone: Optional[int] = None) -> Optional[int]:
+        """Escritorio libre al azar (uniforme en el día, o dentro de `zone`); None si no hay."""
+        if zone is not None:
+            bucket = self._free[day][zone + 1]
+            return bucket[rng.randrange(len(bucket))] if bucket else None
+        n = self._count[day]
+        if not n:
+            return None
+        k = rng.randrange(n)
+        for bucket in self._free[day]:
+            if k < len(bucket):
+                return bucket[k]
+            k -= len(bucket)
+        return None
+
+    def take(self, day: int, d: int) -> None:
+        """Marca d como ocupado (quita de su lista moviendo el último a su lugar)."""
+        bucket = self._free[day][self._zone_of[d]]
+        pos = self._pos[day]
+        i = pos.pop(d)
+        last = bucket.pop()
+        if last != d:
+            bucket[i] = last
+            pos[last] = i
+        self._count[day] -= 1
+
+    def release(self, day: int, d: int) -> None:
+        """Marca d como libre (no hace nada si no es un escritorio listado)."""
+        if d < 0 or d >= len(self._zone_of):
+            return
+        bucket = self._free[day][self._zone_of[d]]
+        self._pos[day][d] = len(bucket)
+        bucket.append(d)
+        self._count[day] += 1
+
+    def move(self, day: int, d_from: int, d_to: int) -> None:
+        """Actualiza los libres tras reubicar a alguien de d_from a d_to."""
+        self.take(day, d_to)
+        self.release(day, d_from)
+
+
+def pick_relocation(assignment: Assignment, free: FreeDesks, rng: random.Random,
+                    assigned: List[List[int]], days: List[int]) -> Optional[Tuple[int, int, int]]:
+    """(día, empleado, escritorio libre) al azar entre los días con alguien sentado y un libre; None si no hay."""
+    day = rng.choice(days)
+    if not assigned[day] or not free.count(day):
+        return None
+    e = rng.choice(assigned[day])
+    return day, e, free.sample(day, rng)
+
+
+def relocate_delta(assignment: Assignment, day: int, e: int, d: int) -> Score:
+    """
+    Variante sin estado de `IncrementalEvaluator.relocate_delta`: re-puntúa
+    sólo el día del movimiento (O(empleados)). Útil cuando no compensa
+    mantener contadores (p. ej. mutación de un hijo en el GA).
+    """
+    index = assignment.index
+    row = assignment.day_row(day)
+    c1, c2, c3 = index.score_day(row)
+    row[e] = d
+    n1, n2, n3 = index.score_day(row)
+    return (n1 - c1, n2 - c2, n3 - c3)
+
+
+def random_relocation(assignment: Assignment, rng: random.Random) -> Optional[Tuple[int, int, int]]:
+    """
+    (día, empleado, escritorio libre) al azar calculado desde la fila del día,
+    sin `FreeDesks` (para quien hace un movimiento aislado); None si no hay.
+    """
+    index = assignment.index
+    if not index.n_days:
+        return None
+    day = rng.randrange(index.n_days)
+    row = assignment.day_row(day)
+    seated = [e for e, d in enumerate(row) if d >= 0]
+    used = set(row)
+    free = [d for d in range(index.n_listed_desks) if d not in used]
+    if not seated or not free:
+        return None
+    return day, rng.choice(seated), rng.choice(free)
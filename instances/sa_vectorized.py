@@ -0,0 +1,177 @@
+# Recocido simulado de muchas cadenas en paralelo con NumPy
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# `simulated_annealing` de entrega2 avanza una sola cadena y en Python cada
+# vecino cuesta lo mismo que un swap sobre dicts. Aquí el estado de C cadenas
+# independientes es un array entero (cadenas × días × empleados) y cada paso
+# propone un swap por cadena a la vez: los deltas salen de gathers sobre los
+# arrays escritorio->zona, empleado->grupo y la matriz de preferencias, y la
+# aceptación de Metropolis es una actualización enmascarada. Como un swap no
+# cambia la ocupación de las zonas, C3 no se mueve y basta con ΔC1 y ΔC2.
+# Al final se devuelve la mejor cadena: un solo proceso hace C reinicios.
+#
+# NumPy es opcional: sin él el módulo se importa igual (HAS_NUMPY = False) y
+# `multi_chain_sa` lanza ImportError con un mensaje claro.
+
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from constructive import c1_optimal_rows, constructive_rows
+from deadline import Clock
+from lex_objective import LexObjective
+from problem_index import compile_instance
+
+HAS_NUMPY = np is not None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("El recocido multi-cadena necesita NumPy (pip install numpy)")
+
+
+class ChainState:
+    """
+    Estado vectorizado de todas las cadenas.
+
+    - seats[c, d, e]: escritorio del empleado e el día d en la cadena c (-1 = ninguno).
+    - assigned[c, d, :n_assigned[c, d]]: empleados con escritorio (los swaps no cambian este conjunto).
+    - counts[c, d, g, z]: miembros del grupo g en la zona z; la fila G y la
+      columna Z son "sin grupo" / "sin zona" y no cuentan para C2.
+    - group_max[c, d, g]: mayor cluster del grupo g ese día (su suma es C2).
+    """
+
+    def __init__(self, index, rows_per_chain: List[List[List[int]]]):
+        n_groups, n_zones = len(index.groups), len(index.zones)
+        self.n_groups, self.n_zones = n_groups, n_zones
+        self.desk_zone = np.array([z if z >= 0 else n_zones for z in index.desk_zone] or [0], dtype=np.int64)
+        self.emp_group = np.array([g if g >= 0 else n_groups for g in index.emp_group], dtype=np.int64)
+        prefs = np.zeros((index.n_employees, max(len(index.desks), 1)), dtype=np.int64)
+        for e, p in enumerate(index.pref_list):
+            prefs[e, p] = 1
+        self.prefs = prefs
+
+        self.seats = np.array(rows_per_chain, dtype=np.int64)
+        chains, days, employees = self.seats.shape
+        self.assigned = np.zeros((chains, days, employees), dtype=np.int64)
+        self.n_assigned = np.zeros((chains, days), dtype=np.int64)
+        self.counts = np.zeros((chains, days, n_groups + 1, n_zones + 1), dtype=np.int64)
+        for c in range(chains):
+            for d in range(days):
+                emps = np.nonzero(self.seats[c, d] >= 0)[0]
+                self.assigned[c, d, :len(emps)] = emps
+                self.n_assigned[c, d] = len(emps)
+                np.add.at(self.counts[c, d], (self.emp_group[emps], self.desk_zone[self.seats[c, d, emps]]), 1)
+        self.group_max = self.counts[..., :n_zones].max(axis=-1) if n_zones else np.zeros(
+            (chains, days, n_groups + 1), dtype=np.int64)
+
+    def _moved_max(self, ci, day, g, z_from, z_to):
+        """Nuevo cluster máximo del grupo g si un miembro pasa de z_from a z_to."""
+        row = self.counts[ci, day, g].copy()
+        row[ci, z_from] -= 1
+        row[ci, z_to] += 1
+        return row[:, :self.n_zones].max(axis=1)
+
+    def propose(self, rng):
+        """Un swap (día, a, b) por cadena con su (ΔC1, ΔC2); `valid` marca las cadenas con swap posible."""
+        chains, days, _ = self.seats.shape
+        ci = np.arange(chains)
+        day = rng.integers(0, days, size=chains)
+        n = self.n_assigned[ci, day]
+        valid = n >= 2
+        i = (rng.random(chains) * n).astype(np.int64)
+        j = (rng.random(chains) * np.maximum(n - 1, 0)).astype(np.int64)
+        j += j >= i
+        a = self.assigned[ci, day, i]
+        b = self.assigned[ci, day, np.minimum(j, self.assigned.shape[2] - 1)]
+        da, db = self.seats[ci, day, a], self.seats[ci, day, b]
+        # Índices seguros para las cadenas sin swap (su delta se descarta)
+        da, db = np.where(valid, da, 0), np.where(valid, db, 0)
+
+        prefs = self.prefs
+        dc1 = prefs[a, db] + prefs[b, da] - prefs[a, da] - prefs[b, db]
+
+        za, zb = self.desk_zone[da], self.desk_zone[db]
+        ga, gb = self.emp_group[a], self.emp_group[b]
+        moves = valid & (za != zb) & (ga != gb)
+        if self.n_zones:
+            max_a = self._moved_max(ci, day, ga, za, zb)
+            max_b = self._moved_max(ci, day, gb, zb, za)
+            gain_a = np.where(ga < self.n_groups, max_a - self.group_max[ci, day, ga], 0)
+            gain_b = np.where(gb < self.n_groups, max_b - self.group_max[ci, day, gb], 0)
+            dc2 = np.where(moves, gain_a + gain_b, 0)
+        else:
+            max_a = max_b = np.zeros(chains, dtype=np.int64)
+            dc2 = np.zeros(chains, dtype=np.int64)
+        dc1 = np.where(valid, dc1, 0)
+        return {"day": day, "a": a, "b": b, "da": da, "db": db, "za": za, "zb": zb, "ga": ga, "gb": gb,
+                "moves": moves, "max_a": max_a, "max_b": max_b, "valid": valid, "dc1": dc1, "dc2": dc2}
+
+    def apply(self, move, accept) -> None:
+        """Aplica los swaps de las cadenas con `accept` (cada cadena toca sólo su propio estado)."""
+        c = np.nonzero(accept)[0]
+        day, a, b, da, db = (move[k][c] for k in ("day", "a", "b", "da", "db"))
+        self.seats[c, day, a] = db
+        self.seats[c, day, b] = da
+        m = c[move["moves"][c]]
+        if len(m):
+            day, za, zb, ga, gb = (move[k][m] for k in ("day", "za", "zb", "ga", "gb"))
+            self.counts[m, day, ga, za] -= 1
+            self.counts[m, day, ga, zb] += 1
+            self.counts[m, day, gb, zb] -= 1
+            self.counts[m, day, gb, za] += 1
+            self.group_max[m, day, ga] = move["max_a"][m]
+            self.group_max[m, day, gb] = move["max_b"][m]
+
+
+def multi_chain_sa(instance: dict, initial: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+                   chains: int = 32, T_inicial: float = 200.0, T_final: float = 1.0, alpha: float = 0.95,
+                   iter_por_temp: int = 100, seed: int = 42, top_k_pref: int = 3, c1_optimal: bool = False,
+                   deadline: Optional[float] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Recocido simulado con `chains` cadenas en lockstep (mismo esquema de
+    temperaturas que `simulated_annealing`; cada paso es un swap por cadena).
+    Sin `initial`, la cadena c parte del constructivo con semilla `seed + c`.
+    Devuelve la mejor solución de todas las cadenas.
+    """
+    _require_numpy()
+    index = compile_instance(instance)
+    objective = LexObjective(index)
+    if initial is not None:
+        start = [index.encode(initial)] * chains
+    else:
+        build = c1_optimal_rows if c1_optimal else constructive_rows
+        start = [build(index, seed=seed + c, randomize=True, top_k_pref=top_k_pref) for c in range(chains)]
+    if not index.days or index.n_employees < 2:
+        return index.decode(start[0])
+
+    state = ChainState(index, start)
+    rng = np.random.default_rng(seed)
+    current = np.array([objective.scalar(index.score(rows)) for rows in start], dtype=np.int64)
+    best = current.copy()
+    best_seats = state.seats.copy()
+
+    clock = Clock(deadline, every=16)
+    T = T_inicial
+    while T > T_final and not clock.timed_out:
+        for _ in range(iter_por_temp):
+            if clock.expired():
+                break
+            move = state.propose(rng)
+            delta = move["dc1"] * objective.w1 + move["dc2"] * objective.w2
+            # exp de deltas no positivos: sin overflow para las mejoras
+            accept = move["valid"] & ((delta > 0) | (rng.random(len(delta)) < np.exp(np.minimum(delta, 0) / T)))
+            state.apply(move, accept)
+            current += np.where(accept, delta, 0)
+            improved = current > best
+            if improved.any():
+                best[improved] = current[improved]
+                best_seats[improved] = state.seats[improved]
+        T *= alpha
+
+    winner = int(np.argmax(best))
+    return index.decode(best_seats[winner].tolist())
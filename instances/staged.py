@@ -0,0 +1,185 @@
+# Optimización lexicográfica por etapas (C1, luego C2, luego C3)
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# En lugar de buscar las tres metas a la vez con `c1*10000 + c2*100 + c3`:
+#   1. C1 se fija en su óptimo por día (emparejamiento máximo, ver matching.py).
+#   2. Cada día se reasigna completo con un flujo de costo mínimo cuyos costos
+#      son lexicográficos: acierto de preferencia >> sentarse en la zona
+#      objetivo del grupo >> costo convexo de ocupación por zona (equilibra C3).
+#      La zona objetivo de cada grupo es donde más se sienta; se repite
+#      mientras el día mejore y luego se prueban cambios de zona objetivo.
+#   3. Hill climbing por swaps que sólo acepta mejoras lexicográficas (nunca
+#      pierde C1, que ya es máximo).
+
+import random
+import time
+from typing import Dict, List, Optional
+
+from compact_assignment import Assignment
+from constructive import c1_optimal_day, c1_optimal_rows
+from deadline import Clock
+from incremental_eval import IncrementalEvaluator
+from min_cost_flow import MinCostFlow
+from problem_index import NO_DESK, ProblemIndex, compile_instance
+
+
+def group_targets(index: ProblemIndex, row: List[int]) -> List[int]:
+    """Zona donde más miembros tiene cada grupo en la fila (-1 si ninguno)."""
+    counts = [[0] * len(index.zones) for _ in index.groups]
+    for e, d in enumerate(row):
+        if d < 0:
+            continue
+        g, z = index.emp_group[e], index.desk_zone[d]
+        if g >= 0 and z >= 0:
+            counts[g][z] += 1
+    return [max(range(len(c)), key=c.__getitem__) if any(c) else -1 for c in counts]
+
+
+def flow_day(index: ProblemIndex, day: int, targets: List[int]) -> List[int]:
+    """
+    Reasigna un día completo con flujo de costo mínimo.
+
+    Red: fuente -> empleado -> (escritorio preferido | concentrador de zona)
+    -> escritorio -> ocupación de zona -> sumidero. Los escritorios de una
+    zona son intercambiables para quien no los prefiere, así que esos arcos
+    pasan por un concentrador por zona en lugar de uno por escritorio.
+    """
+    desk_zone, emp_group, prefs = index.desk_zone, index.emp_group, index.prefs
+    present = index.present_list[day]
+    n_p = len(present)
+    n_desks, n_zones = len(index.desks), len(index.zones)
+    listed = range(index.n_listed_desks)
+
+    # Pesos lexicográficos: cada nivel supera la suma máxima del siguiente
+    w3 = 1
+    w2 = n_p * n_p + 1
+    w1 = w2 * (n_p + 1)
+
+    # Nodos: s, t, empleados, escritorios, concentradores (zonas + "sin zona"), ocupación por zona
+    s, t = 0, 1
+    emp0 = 2
+    desk0 = emp0 + n_p
+    hub0 = desk0 + n_desks
+    occ0 = hub0 + n_zones + 1
+    no_zone_hub = hub0 + n_zones
+    net = MinCostFlow(occ0 + n_zones)
+
+    pref_arcs = []
+    hub_arcs = []
+    for k, e in enumerate(present):
+        net.add_edge(s, emp0 + k, 1, 0)
+        g = emp_group[e]
+        tz = targets[g] if g >= 0 else -1
+        for d in sorted(prefs[e]):
+            bonus = w1 + (w2 if tz >= 0 and desk_zone[d] == tz else 0)
+            pref_arcs.append((k, d, net.add_edge(emp0 + k, desk0 + d, 1, -bonus)))
+        for z in range(n_zones):
+            hub_arcs.append((k, z, net.add_edge(emp0 + k, hub0 + z, 1, -w2 if z == tz else 0)))
+        hub_arcs.append((k, -1, net.add_edge(emp0 + k, no_zone_hub, 1, 0)))
+
+    hub_desk_arcs = []
+    for d in listed:
+        z = desk_zone[d]
+        hub = hub0 + z if z >= 0 else no_zone_hub
+        hub_desk_arcs.append((z, d, net.add_edge(hub, desk0 + d, 1, 0)))
+    for d in range(n_desks):
+        z = desk_zone[d]
+        if z >= 0:
+            net.add_edge(desk0 + d, occ0 + z, 1, 0)
+        else:
+            net.add_edge(desk0 + d, t, 1, 0)
+    # Costo convexo de ocupación: la k-ésima persona en una zona cuesta 2k-1 (suma de cuadrados)
+    for z in range(n_zones):
+        for k in range(1, len(index.zone_desks[z]) + 1):
+            net.add_edge(occ0 + z, t, 1, w3 * (2 * k - 1))
+
+    net.solve(s, t, n_p)
+
+    row = [NO_DESK] * index.n_employees
+    for k, d, arc in pref_arcs:
+        if net.flow_on(arc):
+            row[present[k]] = d
+    # Quien entró por un concentrador toma cualquier escritorio que el concentrador abasteció
+    hub_desks: Dict[int, List[int]] = {}
+    for z, d, arc in hub_desk_arcs:
+        if net.flow_on(arc):
+            hub_desks.setdefault(z, []).append(d)
+    for k, z, arc in hub_arcs:
+        if net.flow_on(arc):
+            row[present[k]] = hub_desks[z].pop()
+    return row
+
+
+def staged_optimize(instance: dict,
+                    assignment: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+                    seed: int = 42,
+                    top_k_pref: int = 3,
+                    rounds: int = 10,
+                    iters: int = 1000,
+                    deadline: Optional[float] = None,
+                    day_budget: Optional[float] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Optimizador por etapas. Sin `assignment` parte del constructivo con C1
+    óptimo; con `assignment`, primero la completa a C1 máximo por día.
+    `rounds` es el número de perturbaciones de zonas objetivo por día e
+    `iters` el de swaps de la etapa final. Con `deadline` se omiten los
+    flujos y swaps restantes al vencer (C1 ya es óptimo desde el inicio).
+    `day_budget` (segundos) limita además los flujos de cada día, para que
+    con muchas `rounds` un día no se lleve todo el plazo.
+    """
+    index = compile_instance(instance)
+    if assignment is None:
+        rows = c1_optimal_rows(index, seed=seed, randomize=True, top_k_pref=top_k_pref)
+    else:
+        rows = [c1_optimal_day(index, day, row) for day, row in enumerate(index.encode(assignment))]
+
+    # Etapas 1-2: flujo por día con las zonas objetivo actuales mientras mejore;
+    # después `rounds` intentos moviendo la zona objetivo de un grupo al azar
+    rng = random.Random(seed)
+    n_zones = len(index.zones)
+    for day, row in enumerate(rows):
+        day_deadline = deadline
+        if day_budget is not None:
+            day_end = time.monotonic() + day_budget
+            day_deadline = day_end if deadline is None else min(deadline, day_end)
+        # Cada flujo es caro: se consulta el reloj en cada uno
+        flow_clock = Clock(day_deadline, every=1)
+        best = index.score_day(row)
+        while not flow_clock.expired():
+            cand = flow_day(index, day, group_targets(index, row))
+            score = index.score_day(cand)
+            if score <= best:
+                break
+            row, best = cand, score
+        for _ in range(rounds):
+            if not index.groups or not n_zones or flow_clock.expired():
+                break
+            targets = group_targets(index, row)
+            targets[rng.randrange(len(targets))] = rng.randrange(n_zones)
+            cand = flow_day(index, day, targets)
+            score = index.score_day(cand)
+            if score > best:
+                row, best = cand, score
+        rows[day] = row
+
+    # Etapa 3: swaps que sólo se aceptan si mejoran (C1, C2, C3)
+    S = Assignment(index)
+    for day, row in enumerate(rows):
+        for e, d in enumerate(row):
+            S.set_desk(day, e, d)
+    evaluator = IncrementalEvaluator(S)
+    days = list(range(index.n_days))
+    assigned = [S.assigned(day) for day in days]
+    clock = Clock(deadline)
+    for _ in range(iters):
+        if not days or clock.expired():
+            break
+        day = rng.choice(days)
+        if len(assigned[day]) < 2:
+            continue
+        a, b = rng.sample(assigned[day], 2)
+        if evaluator.swap_improves(day, a, b):
+            evaluator.apply_swap(day, a, b)
+            evaluator.commit()
+    return S.to_dict()
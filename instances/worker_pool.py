@@ -0,0 +1,34 @@
+# Pool de procesos que recibe la instancia una sola vez
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Las islas del GA y las réplicas de parallel tempering corren muchas épocas
+# en un pool persistente. La instancia viaja una sola vez a cada proceso (en
+# el inicializador) y entre épocas sólo viajan asientos y estados del RNG.
+# Con un solo worker todo corre en este proceso con el mismo código.
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_worker_instance: Optional[dict] = None
+
+
+def init_worker(instance: dict) -> None:
+    global _worker_instance
+    _worker_instance = instance
+
+
+def worker_instance() -> dict:
+    """Instancia enviada a este proceso por `init_worker`."""
+    return _worker_instance
+
+
+def instance_pool(instance: dict, workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de `workers` procesos inicializados con `instance`. Con workers <= 1
+    no crea pool: inicializa este proceso y devuelve None.
+    """
+    if workers > 1:
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(instance,))
+    init_worker(instance)
+    return None
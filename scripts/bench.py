@@ -0,0 +1,367 @@
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from importlib.machinery import SourceFileLoader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "instances"))
+
+# Métricas que se comparan contra la línea base y en qué sentido
+HIGHER_IS_BETTER = ("ops_per_sec", "moves_per_sec", "evals_per_sec")
+LOWER_IS_BETTER = ("runtime_sec", "peak_mem_bytes", "time_to_target_sec")
+
+# Escalera de límites de tiempo (s) para medir el tiempo hasta la calidad objetivo
+TTT_LADDER = (0.05, 0.1, 0.2, 0.4, 0.8, 1.6)
+
+
+def load_module_from(path: str, name: str):
+    path = os.path.normpath(path)
+    if not os.path.isabs(path):
+        path = os.path.join(ROOT, path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return SourceFileLoader(name, path).load_module()
+
+
+def synthetic_instance(n_employees: int, seed: int = 0, n_days: int = 5, n_prefs: int = 8) -> dict:
+    """
+    Instancia sintética con la forma de instance1..10: ~0.45 escritorios por
+    empleado, zonas de ~20 escritorios, grupos de ~6 y asistencia de 2 a 4 días.
+    """
+    rng = random.Random(seed)
+    days = ["L", "Ma", "Mi", "J", "V"][:n_days]
+    employees = [f"E{i}" for i in range(n_employees)]
+    n_desks = max(2, int(n_employees * 0.45))
+    desks = [f"D{i}" for i in range(n_desks)]
+    n_zones = max(1, n_desks // 20)
+    zones = [f"Z{i}" for i in range(n_zones)]
+    desks_z = {z: desks[i::n_zones] for i, z in enumerate(zones)}
+    n_groups = max(1, n_employees // 6)
+    groups = [f"G{i}" for i in range(n_groups)]
+    employees_g = {g: employees[i::n_groups] for i, g in enumerate(groups)}
+    desks_e = {}
+    for i, e in enumerate(employees):
+        # Preferencias concentradas en la zona "natural" del grupo
+        home = desks_z[zones[(i % n_groups) % n_zones]]
+        prefs = rng.sample(home, min(n_prefs // 2, len(home)))
+        prefs += [d for d in rng.sample(desks, min(n_prefs, n_desks)) if d not in prefs][:n_prefs - len(prefs)]
+        desks_e[e] = prefs
+    days_e = {e: sorted(rng.sample(days, rng.randint(min(2, n_days), min(4, n_days))), key=days.index)
+              for e in employees}
+    return {"Employees": employees, "Desks": desks, "Days": days, "Groups": groups, "Zones": zones,
+            "Desks_Z": desks_z, "Desks_E": desks_e, "Employees_G": employees_g, "Days_E": days_e}
+
+
+def throughput(fn, min_time: float, repeats: int = 3) -> float:
+    """
+    Llamadas por segundo de `fn`: cada muestra la repite hasta acumular
+    `min_time` segundos y se reporta la mejor de `repeats` muestras (la menos
+    afectada por ruido del sistema).
+    """
+    best = 0.0
+    for _ in range(repeats):
+        reps = 0
+        t0 = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            fn()
+            reps += 1
+            elapsed = time.perf_counter() - t0
+        best = max(best, reps / elapsed)
+    return best
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# ---------- Micro-benchmarks ----------
+def micro_benchmarks(mods, instance, min_time, repeats):
+    from compact_assignment import Assignment
+    from incremental_eval import IncrementalEvaluator
+    from problem_index import compile_instance
+
+    ent1, ils = mods["ent1"], mods["ils"]
+    index = compile_instance(instance)
+    base = ent1.constructive_assignment(instance, seed=0)
+    rng = random.Random(0)
+    results = {}
+
+    rate = throughput(lambda: ent1.score_solution_lex(instance, base), min_time, repeats)
+    results["score_solution_lex"] = {"ops_per_sec": rate}
+
+    rate = throughput(lambda: ent1.constructive_assignment(instance, seed=rng.randrange(10**6)), min_time, repeats)
+    results["constructive_assignment"] = {"ops_per_sec": rate}
+
+    random.seed(0)
+    rate = throughput(lambda: ils.generar_vecino_swap(base, instance), min_time, repeats)
+    results["generar_vecino_swap"] = {"ops_per_sec": rate}
+
+    S = Assignment.from_dict(index, base)
+    evaluator = IncrementalEvaluator(S)
+    assigned = [S.assigned(day) for day in range(index.n_days)]
+    moves = [(day, *rng.sample(assigned[day], 2)) for day in range(index.n_days) for _ in range(200)
+             if len(assigned[day]) >= 2]
+
+    def _deltas():
+        for day, a, b in moves:
+            evaluator.swap_delta(day, a, b)
+
+    def _apply_undo():
+        for day, a, b in moves:
+            evaluator.apply_swap(day, a, b)
+            evaluator.undo()
+
+    results["swap_delta"] = {"ops_per_sec": throughput(_deltas, min_time, repeats) * len(moves)}
+    results["apply_undo"] = {"moves_per_sec": throughput(_apply_undo, min_time, repeats) * len(moves)}
+    return results
+
+
+# ---------- Solvers (presupuestos fijos) ----------
+def _n_temps(t_inicial, t_final, alpha):
+    return max(0, math.ceil(math.log(t_final / t_inicial) / math.log(alpha)))
+
+
+def solver_specs(mods):
+    """
+    nombre -> (función(instance, seed, deadline, fixed) -> solución, métrica de
+    rendimiento, trabajo del presupuesto fijo, máximo de empleados a correr).
+    El trabajo es un número fijo o una función que lo lee de la última corrida.
+    Con `fixed=True` se usan los parámetros por defecto de cada CLI; con
+    `fixed=False` el bucle externo (swaps, iteraciones de ILS, generaciones,
+    rondas de staged) no tiene tope y manda el `deadline`. Los esquemas de
+    temperatura de SA siguen finitos: con iteraciones por temperatura sin
+    tope la temperatura nunca bajaría.
+    """
+    ent1, sa, ils, ga = mods["ent1"], mods["sa"], mods["ils"], mods["ga"]
+    big = 10**9
+
+    def ent1_local(inst, seed, deadline, fixed):
+        a = ent1.constructive_assignment(inst, seed=seed)
+        return ent1.local_search_swaps(inst, a, iters=20000 if fixed else big, seed=seed, deadline=deadline)
+
+    def ent1_sa(inst, seed, deadline, fixed):
+        a = ent1.constructive_assignment(inst, seed=seed)
+        return ent1.simulated_annealing_swaps(inst, a, iters_per_temp=200, seed=seed, deadline=deadline)
+
+    def generic_sa(inst, seed, deadline, fixed):
+        a = sa.constructive_assignment(inst, seed=seed)
+        random.seed(seed)
+        return sa.simulated_annealing(a, evaluar=sa.make_lex_evaluator(inst),
+                                      generar_vecino=lambda s: sa.generar_vecino_swap(s, inst),
+                                      iter_por_temp=20, deadline=deadline)
+
+    ils_iters, ils_ls_iters, ils_k = 20, 500, 3
+    ils_stats = Counter()
+
+    def ils_run(inst, seed, deadline, fixed):
+        ils_stats.clear()
+        a = ils.constructive_assignment(inst, seed=seed)
+        return ils.iterated_local_search(inst, a, evaluar=None,
+                                         local_search_func=ils.local_search_swaps_hillclimb,
+                                         perturb_func=ils.perturbation_k_swaps,
+                                         max_iters=ils_iters if fixed else big, ls_iters=ils_ls_iters,
+                                         perturb_k=ils_k, seed=seed, stats=ils_stats, deadline=deadline)
+
+    ga_stats = Counter()
+
+    def ga_run(inst, seed, deadline, fixed):
+        ga_stats.clear()
+        best, _ = ga.run_ga(inst, ngen=30 if fixed else big, pop_size=20, seed=seed, deadline=deadline,
+                            stats=ga_stats)
+        return best
+
+    def staged_run(inst, seed, deadline, fixed):
+        if fixed:
+            return ent1.staged_optimize(inst, seed=seed, rounds=2, iters=1000, deadline=deadline)
+        # Sin tope de rondas cada día recibe una parte igual del plazo y otra queda para los swaps
+        day_budget = None
+        if deadline is not None:
+            day_budget = max(0.0, deadline - time.monotonic()) / (len(inst.get("Days", [])) + 1)
+        return ent1.staged_optimize(inst, seed=seed, rounds=big, iters=big, deadline=deadline,
+                                    day_budget=day_budget)
+
+    temps = _n_temps(200.0, 1.0, 0.95)
+    return {
+        "ent1_local": (ent1_local, "moves_per_sec", 20000, None),
+        "ent1_sa": (ent1_sa, "moves_per_sec", 200 * temps, None),
+        "sa": (generic_sa, "moves_per_sec", 20 * temps, None),
+        # Swaps evaluados por la búsqueda local más los de cada perturbación
+        "ils": (ils_run, "moves_per_sec", lambda: ils_stats["evaluated"] + ils_iters * ils_k, None),
+        # Evaluaciones reales: población inicial completa más un delta por mutación
+        # (los hijos heredan los puntajes por día de sus padres)
+        "ga": (ga_run, "evals_per_sec", lambda: ga_stats["full_evals"] + ga_stats["delta_evals"], None),
+        # El flujo de costo mínimo es caro en Python: sólo instancias del curso
+        "staged": (staged_run, None, None, 100),
+    }
+
+
+def target_score(mods, instance):
+    """Calidad objetivo: (C1, C2) de la búsqueda local de referencia (constructivo + 2000 swaps)."""
+    ent1 = mods["ent1"]
+    ref = ent1.local_search_swaps(instance, ent1.constructive_assignment(instance, seed=0), iters=2000, seed=0)
+    return tuple(ent1.score_solution_lex(instance, ref)[:2])
+
+
+def time_to_target(run, score_fn, instance, target):
+    """Menor límite de `TTT_LADDER` con el que el solver alcanza (C1, C2) >= objetivo."""
+    from deadline import deadline_after
+
+    for limit in TTT_LADDER:
+        sol = run(instance, 0, deadline_after(limit), False)
+        if tuple(score_fn(instance, sol)[:2]) >= target:
+            return limit
+    return None
+
+
+def solver_benchmarks(mods, instance, repeats, with_memory, with_ttt):
+    score_fn = mods["ent1"].score_solution_lex
+    n_employees = len(instance.get("Employees", []))
+    target = target_score(mods, instance) if with_ttt else None
+    results = {}
+    for name, (run, rate, work, max_employees) in solver_specs(mods).items():
+        if max_employees is not None and n_employees > max_employees:
+            continue
+        # Semilla fija: todas las repeticiones producen la misma solución; se toma el menor tiempo
+        dt = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            sol = run(instance, 0, None, True)
+            dt = min(dt, time.perf_counter() - t0)
+        rec = {"runtime_sec": dt, "score": list(score_fn(instance, sol))}
+        if rate:
+            rec["work"] = work() if callable(work) else work
+            rec[rate] = rec["work"] / dt
+        if with_memory:
+            rec["peak_mem_bytes"] = peak_memory(lambda: run(instance, 0, None, True))
+        if with_ttt:
+            rec["target"] = list(target)
+            rec["time_to_target_sec"] = time_to_target(run, score_fn, instance, target)
+        results[name] = rec
+    return results
+
+
+# ---------- Comparación con la línea base ----------
+def compare(current, baseline, tolerance):
+    """Lista de regresiones (textos) de `current` frente a `baseline`."""
+    base = {(r["instance"], r["bench"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current["results"]:
+        b = base.get((r["instance"], r["bench"]))
+        if b is None:
+            continue
+        label = f'{r["instance"]}/{r["bench"]}'
+        if r.get("work") != b.get("work"):
+            # Presupuesto distinto (p. ej. cambiaron los parámetros por defecto): no es comparable
+            continue
+        for m in HIGHER_IS_BETTER:
+            if m in r and b.get(m) and r[m] < b[m] * (1 - tolerance):
+                regressions.append(f"{label}: {m} {r[m]:.1f} < base {b[m]:.1f}")
+        for m in LOWER_IS_BETTER:
+            if m not in r or b.get(m) is None:
+                continue
+            if r[m] is None:
+                regressions.append(f"{label}: {m} sin alcanzar (base {b[m]})")
+            elif r[m] > b[m] * (1 + tolerance):
+                regressions.append(f"{label}: {m} {r[m]:.4g} > base {b[m]:.4g}")
+        if "score" in r and "score" in b and tuple(r["score"]) < tuple(b["score"]):
+            regressions.append(f"{label}: puntaje {tuple(r['score'])} < base {tuple(b['score'])}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de evaluación, vecindarios, constructivo y solvers")
+    parser.add_argument("--instances-glob", default="instances/instance*.json", help="Glob para instancias")
+    parser.add_argument("--synthetic", default="300,1000",
+                        help="Tamaños (empleados) de instancias sintéticas separados por coma; vacío para omitir")
+    parser.add_argument("--quick", action="store_true",
+                        help="Sólo instance1, instance5, instance10 y la sintética más pequeña")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos por muestra de micro-benchmark")
+    parser.add_argument("--repeats", type=int, default=3, help="Muestras por benchmark (se reporta la mejor)")
+    parser.add_argument("--no-memory", action="store_true", help="No mide memoria pico (tracemalloc)")
+    parser.add_argument("--no-ttt", action="store_true", help="No mide tiempo hasta la calidad objetivo")
+    parser.add_argument("--out", default="results/bench.json", help="JSON de salida")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tolerancia relativa antes de marcar regresión")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Sale con código 1 si hay regresiones")
+    parser.add_argument("--algo-ent1", default="instances/entrega1.py", help="Ruta al módulo de Entrega 1")
+    parser.add_argument("--algo-sa", default="instances/entrega2.py", help="Ruta al módulo de SA")
+    parser.add_argument("--algo-ils", default="instances/entrega2_ILS.py", help="Ruta al módulo de ILS")
+    parser.add_argument("--algo-ga", default="instances/entrega3.py", help="Ruta al módulo de GA")
+    args = parser.parse_args()
+
+    mods = {key: load_module_from(path, f"{key}_mod")
+            for key, path in [("ent1", args.algo_ent1), ("sa", args.algo_sa), ("ils", args.algo_ils), ("ga", args.algo_ga)]}
+
+    inst_files = sorted(glob.glob(os.path.join(ROOT, args.instances_glob) if not os.path.isabs(args.instances_glob)
+                                  else args.instances_glob))
+    sizes = [int(x) for x in args.synthetic.split(",") if x.strip()]
+    if args.quick:
+        keep = {"instance1.json", "instance5.json", "instance10.json"}
+        inst_files = [p for p in inst_files if os.path.basename(p) in keep]
+        sizes = sizes[:1]
+
+    instances = []
+    for path in inst_files:
+        with open(path, "r", encoding="utf-8") as f:
+            instances.append((os.path.basename(path), json.load(f)))
+    for n in sizes:
+        instances.append((f"synthetic_{n}", synthetic_instance(n, seed=n)))
+
+    results = []
+    for name, instance in instances:
+        t0 = time.perf_counter()
+        for bench, rec in micro_benchmarks(mods, instance, args.min_time, args.repeats).items():
+            results.append({"instance": name, "bench": bench, **rec})
+        for bench, rec in solver_benchmarks(mods, instance, args.repeats, not args.no_memory, not args.no_ttt).items():
+            results.append({"instance": name, "bench": bench, **rec})
+        print(f"{name}: {time.perf_counter() - t0:.1f}s")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+            "min_time": args.min_time,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print("Wrote:", args.out)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Regresiones frente a {args.baseline}:")
+            for r in regressions:
+                print(" -", r)
+            if args.fail_on_regression:
+                return 1
+        else:
+            print(f"Sin regresiones frente a {args.baseline} (tolerancia {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
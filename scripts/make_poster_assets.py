@@ -1,3 +1,4 @@
+import argparse
 import csv
 import os
 from collections import defaultdict
@@ -162,12 +163,22 @@ def make_poster_md(by_inst, plot_paths, out_md):
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Tabla, gráficas y póster a partir del resumen de experimentos')
+    parser.add_argument('--db', default=None,
+                        help='Consulta el resumen en la base SQLite (run_experiments.py --db) en lugar de results/summary.csv')
+    parser.add_argument('--config-hash', default=None, help='Con --db, sólo las corridas de esta configuración')
+    args = parser.parse_args()
+
     base = os.path.dirname(os.path.dirname(__file__))
-    summary_csv = os.path.join(base, 'results', 'summary.csv')
-    if not os.path.exists(summary_csv):
-        print('No existe results/summary.csv. Corre scripts/summarize_results.py primero.')
-        return 1
-    rows = read_summary(summary_csv)
+    if args.db:
+        from summarize_results import summarize_db
+        rows = summarize_db(args.db, args.config_hash)
+    else:
+        summary_csv = os.path.join(base, 'results', 'summary.csv')
+        if not os.path.exists(summary_csv):
+            print('No existe results/summary.csv. Corre scripts/summarize_results.py primero.')
+            return 1
+        rows = read_summary(summary_csv)
     by_inst = pivot_summary(rows)
     plots_dir = os.path.join(base, 'results', 'plots')
     plots = make_plots(by_inst, plots_dir)
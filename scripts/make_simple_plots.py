@@ -1,3 +1,4 @@
+import argparse
 import csv
 import os
 from collections import defaultdict
@@ -56,11 +57,21 @@ def svg_bar_chart(data, title, ylabel, out_path, width=800, height=400):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Gráficas SVG a partir del resumen de experimentos")
+    parser.add_argument("--db", default=None,
+                        help="Consulta el resumen en la base SQLite (run_experiments.py --db) en lugar de results/summary.csv")
+    parser.add_argument("--config-hash", default=None, help="Con --db, sólo las corridas de esta configuración")
+    args = parser.parse_args()
+
     base = os.path.dirname(os.path.dirname(__file__))
-    summary_path = os.path.join(base, "results", "summary.csv")
-    if not os.path.exists(summary_path):
-        raise SystemExit("No existe results/summary.csv. Ejecuta scripts/summarize_results.py primero.")
-    rows = read_summary(summary_path)
+    if args.db:
+        from summarize_results import summarize_db
+        rows = summarize_db(args.db, args.config_hash)
+    else:
+        summary_path = os.path.join(base, "results", "summary.csv")
+        if not os.path.exists(summary_path):
+            raise SystemExit("No existe results/summary.csv. Ejecuta scripts/summarize_results.py primero.")
+        rows = read_summary(summary_path)
     os.makedirs(os.path.join(base, "results", "plots_svg"), exist_ok=True)
     avg_c1 = aggregate(rows, "avg_C1")
     avg_c2 = aggregate(rows, "avg_C2")
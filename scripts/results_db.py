@@ -0,0 +1,163 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Columnas de results/experiments.csv (el export mantiene este formato)
+CSV_HEADER = ["instance", "method", "seed", "iters", "top_k", "C1", "C2", "C3", "runtime_sec"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    instance TEXT NOT NULL,
+    method TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    iters INTEGER,
+    top_k INTEGER,
+    c1 INTEGER NOT NULL,
+    c2 INTEGER NOT NULL,
+    c3 INTEGER NOT NULL,
+    runtime_sec REAL,
+    config_hash TEXT,
+    cell_key TEXT UNIQUE,
+    created TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_cell ON runs (instance, method, seed);
+CREATE INDEX IF NOT EXISTS idx_runs_config ON runs (config_hash);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Abre (o crea) la base de resultados con su esquema e índices."""
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def insert_run(conn: sqlite3.Connection, row, config_hash=None, cell_key=None) -> None:
+    """
+    Inserta una fila en formato CSV. Con `cell_key` (la llave de caché de
+    run_experiments) una celda repetida reemplaza a la anterior en lugar de
+    duplicarse.
+    """
+    instance, method, seed, iters, top_k, c1, c2, c3, runtime_sec = row
+    conn.execute(
+        "INSERT OR REPLACE INTO runs (instance, method, seed, iters, top_k, c1, c2, c3, runtime_sec,"
+        " config_hash, cell_key, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (instance, method, int(seed), int(iters), int(top_k), int(c1), int(c2), int(c3), float(runtime_sec),
+         config_hash, cell_key, time.strftime("%Y-%m-%dT%H:%M:%S")),
+    )
+
+
+def _where(config_hash):
+    if not config_hash:
+        return "", ()
+    # Se acepta un prefijo del hash, como en git
+    return "WHERE config_hash LIKE ?", (config_hash + "%",)
+
+
+def summary_rows(conn: sqlite3.Connection, label_fn=None, config_hash=None) -> list:
+    """
+    Resumen por (instancia, método) con agregados SQL: corridas, promedios y
+    mejor corrida lexicográfica (C1, C2, C3); en empate gana la primera
+    insertada. `label_fn` agrupa variantes de nombre de método (se registra
+    como función SQL). Devuelve dicts con las columnas de results/summary.csv.
+    """
+    conn.create_function("method_label", 1, label_fn or (lambda m: m), deterministic=True)
+    where, params = _where(config_hash)
+    query = f"""
+        WITH labeled AS (
+            SELECT id, instance, method_label(method) AS method, seed, c1, c2, c3, runtime_sec
+            FROM runs {where}
+        ),
+        ranked AS (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY instance, method ORDER BY c1 DESC, c2 DESC, c3 DESC, id
+            ) AS rank_lex
+            FROM labeled
+        )
+        SELECT instance, method, COUNT(*), AVG(c1), AVG(c2), AVG(c3),
+               MAX(CASE WHEN rank_lex = 1 THEN c1 END),
+               MAX(CASE WHEN rank_lex = 1 THEN c2 END),
+               MAX(CASE WHEN rank_lex = 1 THEN c3 END),
+               AVG(runtime_sec),
+               MAX(CASE WHEN rank_lex = 1 THEN seed END)
+        FROM ranked
+        GROUP BY instance, method
+        ORDER BY instance, method
+    """
+    keys = ["instance", "method", "runs", "avg_C1", "avg_C2", "avg_C3", "best_C1", "best_C2", "best_C3",
+            "avg_runtime_sec", "best_seed"]
+    return [dict(zip(keys, r)) for r in conn.execute(query, params)]
+
+
+def csv_cell_key(row) -> str:
+    """
+    Llave estable de una fila de CSV sin config_hash: la celda (instancia,
+    método, semilla, iteraciones, top_k). Reimportar el mismo CSV (o una
+    versión corrida de nuevo) reemplaza sus filas en lugar de duplicarlas.
+    """
+    instance, method, seed, iters, top_k = row[:5]
+    cell = [instance, method, int(seed), int(iters), int(top_k)]
+    return "csv:" + hashlib.sha256(json.dumps(cell).encode()).hexdigest()
+
+
+def import_csv(conn: sqlite3.Connection, path: str) -> int:
+    """Carga un experiments.csv existente (sin config_hash); devuelve las filas leídas."""
+    n = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            values = [row[c] for c in CSV_HEADER]
+            insert_run(conn, values, cell_key=csv_cell_key(values))
+            n += 1
+    conn.commit()
+    return n
+
+
+def export_csv(conn: sqlite3.Connection, path: str, config_hash=None) -> int:
+    """Escribe las corridas en el formato de results/experiments.csv; devuelve las filas escritas."""
+    where, params = _where(config_hash)
+    rows = conn.execute(
+        f"SELECT instance, method, seed, iters, top_k, c1, c2, c3, runtime_sec FROM runs {where} ORDER BY id",
+        params,
+    ).fetchall()
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_HEADER)
+        w.writerows(rows)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa/exporta la base SQLite de resultados")
+    parser.add_argument("action", choices=["import", "export"],
+                        help="import: CSV -> base; export: base -> CSV (formato de experiments.csv)")
+    parser.add_argument("--db", default="results/experiments.sqlite", help="Base SQLite")
+    parser.add_argument("--csv", default="results/experiments.csv", help="CSV a importar o exportar")
+    parser.add_argument("--config-hash", default=None, help="Exporta sólo las corridas de esta configuración (prefijo)")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        if args.action == "import":
+            n = import_csv(conn, args.csv)
+            print(f"Importadas {n} filas de {args.csv} en {args.db}")
+        else:
+            n = export_csv(conn, args.csv, args.config_hash)
+            print(f"Exportadas {n} filas de {args.db} a {args.csv}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,30 @@
 import argparse
 import csv
 import glob
+import hashlib
+import inspect
 import json
+import multiprocessing
 import os
+import random
+import signal
 import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
 from importlib.machinery import SourceFileLoader
 
+from results_db import connect as connect_db, insert_run
 
-def load_module_from(path: str, name: str):
+
+def resolve_path(path: str) -> str:
     path = os.path.normpath(path)
     if not os.path.isabs(path):
         base = os.path.dirname(os.path.dirname(__file__))
         path = os.path.join(base, path)
+    return path
+
+
+def load_module_from(path: str, name: str):
+    path = resolve_path(path)
     if not os.path.exists(path):
         raise FileNotFoundError(path)
     return SourceFileLoader(name, path).load_module()
@@ -23,19 +36,27 @@ def parse_seeds(seeds_arg: str, num_seeds: int, start: int) -> list[int]:
     return list(range(start, start + num_seeds))
 
 
+def run_deadline(args):
+    """Instante (time.monotonic) en que vence --time-limit para una corrida; None sin límite."""
+    return time.monotonic() + args.time_limit if args.time_limit else None
+
+
 def lex_to_scalar(score):
     c1, c2, c3 = score
     return c1 * 10000 + c2 * 100 + c3
 
 
 def run_ent1_local(mod, instance, seed, args):
-    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k)
-    assignment = mod.local_search_swaps(instance, assignment, iters=args.local_iters, seed=seed)
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+    assignment = mod.local_search_swaps(instance, assignment, iters=args.local_iters, seed=seed,
+                                        deadline=run_deadline(args))
     return assignment, args.local_iters
 
 
 def run_ent1_sa(mod, instance, seed, args):
-    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k)
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
     assignment = mod.simulated_annealing_swaps(
         instance,
         assignment,
@@ -43,17 +64,52 @@ def run_ent1_sa(mod, instance, seed, args):
         t_inicial=args.sa_tinit,
         t_final=args.sa_tfinal,
         alpha=args.sa_alpha,
-        seed=seed
+        seed=seed,
+        deadline=run_deadline(args)
     )
     return assignment, args.ent1_sa_iters
 
 
-def run_sa(mod, instance, seed, args):
-    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k)
+def run_ent1_pt(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+    assignment, _ = mod.parallel_tempering(
+        instance,
+        assignment,
+        replicas=args.pt_replicas,
+        t_min=args.sa_tfinal,
+        t_max=args.sa_tinit,
+        rounds=args.pt_rounds,
+        exchange_every=args.pt_exchange_every,
+        seed=seed,
+        deadline=run_deadline(args),
+        workers=args.pt_workers
+    )
+    return assignment, args.pt_rounds
+
+
+def run_staged(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+    assignment = mod.staged_optimize(instance, assignment, seed=seed, rounds=args.staged_rounds, iters=args.local_iters,
+                                     deadline=run_deadline(args))
+    return assignment, args.staged_rounds
 
-    def _score(a):
-        return lex_to_scalar(mod.score_solution_lex(instance, a))
 
+def run_sa(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+
+    if hasattr(mod, "make_lex_evaluator"):
+        # Pesos según las cotas de la instancia (el escalar fijo falla con C2 > 99)
+        _score = mod.make_lex_evaluator(instance)
+    else:
+        def _score(a):
+            return lex_to_scalar(mod.score_solution_lex(instance, a))
+
+    # El SA genérico usa el `random` global: se siembra por tarea para que el
+    # resultado no dependa de qué corrió antes en el mismo proceso
+    random.seed(seed)
     assignment = mod.simulated_annealing(
         assignment,
         evaluar=_score,
@@ -61,33 +117,90 @@ def run_sa(mod, instance, seed, args):
         T_inicial=args.sa_tinit,
         T_final=args.sa_tfinal,
         alpha=args.sa_alpha,
-        iter_por_temp=args.sa_iters
+        iter_por_temp=args.sa_iters,
+        deadline=run_deadline(args)
     )
     return assignment, args.sa_iters
 
 
-def run_ils(mod, instance, seed, args):
-    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k)
+def run_sa_chains(mod, instance, seed, args):
+    # Las cadenas parten de constructivos con semillas seed, seed+1, ...
+    if not getattr(mod, "HAS_NUMPY", False):
+        raise RuntimeError("sa_chains necesita NumPy y un módulo SA con multi_chain_sa")
+    assignment = mod.multi_chain_sa(
+        instance,
+        chains=args.sa_chains,
+        T_inicial=args.sa_tinit,
+        T_final=args.sa_tfinal,
+        alpha=args.sa_alpha,
+        iter_por_temp=args.sa_iters,
+        seed=seed,
+        top_k_pref=args.top_k,
+        c1_optimal=args.c1_matching,
+        deadline=run_deadline(args)
+    )
+    return assignment, args.sa_iters
+
 
-    def _score(a):
-        c1, c2, c3 = mod.score_solution_lex(instance, a)
-        return c1 * 10000 + c2 * 100 + c3
+def run_ils(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
 
     assignment = mod.iterated_local_search(
         instance,
         assignment,
-        evaluar=_score,
+        evaluar=None,  # objetivo lexicográfico con evaluación incremental
         local_search_func=mod.local_search_swaps_hillclimb,
         perturb_func=mod.perturbation_k_swaps,
         max_iters=args.ils_iters,
         ls_iters=args.ls_iters,
         perturb_k=args.perturb_k,
-        seed=seed
+        seed=seed,
+        deadline=run_deadline(args)
     )
     return assignment, args.ils_iters
 
 
+def run_tabu(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+    assignment = mod.tabu_search(
+        instance,
+        assignment,
+        iters=args.tabu_iters,
+        candidates=args.tabu_candidates,
+        tenure=args.tabu_tenure,
+        seed=seed,
+        deadline=run_deadline(args)
+    )
+    return assignment, args.tabu_iters
+
+
+def run_alns(mod, instance, seed, args):
+    assignment = mod.constructive_assignment(instance, seed=seed, randomize=True, top_k_pref=args.top_k,
+                                             c1_optimal=args.c1_matching)
+    assignment = mod.alns(instance, assignment, iters=args.alns_iters, seed=seed, deadline=run_deadline(args))
+    return assignment, args.alns_iters
+
+
 def run_ga(mod, instance, seed, args):
+    if args.ga_islands > 1:
+        # Modelo de islas: --ga-pop es el tamaño de cada isla
+        assignment, _history = mod.run_island_ga(
+            instance,
+            islands=args.ga_islands,
+            migration_every=args.ga_migration_every,
+            migration_size=args.ga_migration_size,
+            ngen=args.ga_ngen,
+            pop_size=args.ga_pop,
+            cxpb=args.ga_cxpb,
+            mutpb=args.ga_mutpb,
+            seed=seed,
+            top_k_pref=args.top_k,
+            c1_optimal=args.c1_matching,
+            deadline=run_deadline(args)
+        )
+        return assignment, args.ga_ngen
     assignment, _history = mod.run_ga(
         instance,
         ngen=args.ga_ngen,
@@ -96,17 +209,38 @@ def run_ga(mod, instance, seed, args):
         mutpb=args.ga_mutpb,
         seed=seed,
         top_k_pref=args.top_k,
-        verbose=False
+        verbose=False,
+        c1_optimal=args.c1_matching,
+        deadline=run_deadline(args)
     )
     return assignment, args.ga_ngen
 
 
+# `params`: argumentos de la línea de comandos que usa cada runner (forman
+# parte de la llave de caché; cambiar uno sólo invalida los métodos que lo usan)
+COMMON_PARAMS = ("top_k", "c1_matching", "time_limit")
 METHOD_CONFIG = {
-    "ent1_local": {"label": "ENT1_LOCAL", "runner": run_ent1_local, "module": "ent1"},
-    "ent1_sa": {"label": "ENT1_SA", "runner": run_ent1_sa, "module": "ent1"},
-    "sa": {"label": "SA", "runner": run_sa, "module": "sa"},
-    "ils": {"label": "ILS", "runner": run_ils, "module": "ils"},
-    "ga": {"label": "GA", "runner": run_ga, "module": "ga"},
+    "ent1_local": {"label": "ENT1_LOCAL", "runner": run_ent1_local, "module": "ent1",
+                   "params": COMMON_PARAMS + ("local_iters",)},
+    "ent1_sa": {"label": "ENT1_SA", "runner": run_ent1_sa, "module": "ent1",
+                "params": COMMON_PARAMS + ("ent1_sa_iters", "sa_tinit", "sa_tfinal", "sa_alpha")},
+    "ent1_pt": {"label": "ENT1_PT", "runner": run_ent1_pt, "module": "ent1",
+                "params": COMMON_PARAMS + ("pt_replicas", "pt_rounds", "pt_exchange_every", "sa_tinit", "sa_tfinal")},
+    "staged": {"label": "STAGED", "runner": run_staged, "module": "ent1",
+               "params": COMMON_PARAMS + ("staged_rounds", "local_iters")},
+    "sa": {"label": "SA", "runner": run_sa, "module": "sa",
+           "params": COMMON_PARAMS + ("sa_iters", "sa_tinit", "sa_tfinal", "sa_alpha")},
+    "sa_chains": {"label": "SA_CHAINS", "runner": run_sa_chains, "module": "sa",
+                  "params": COMMON_PARAMS + ("sa_chains", "sa_iters", "sa_tinit", "sa_tfinal", "sa_alpha")},
+    "ils": {"label": "ILS", "runner": run_ils, "module": "ils",
+            "params": COMMON_PARAMS + ("ils_iters", "ls_iters", "perturb_k")},
+    "tabu": {"label": "TABU", "runner": run_tabu, "module": "ils",
+             "params": COMMON_PARAMS + ("tabu_iters", "tabu_candidates", "tabu_tenure")},
+    "alns": {"label": "ALNS", "runner": run_alns, "module": "ils",
+             "params": COMMON_PARAMS + ("alns_iters",)},
+    "ga": {"label": "GA", "runner": run_ga, "module": "ga",
+           "params": COMMON_PARAMS + ("ga_ngen", "ga_pop", "ga_cxpb", "ga_mutpb", "ga_islands", "ga_migration_every",
+                                     "ga_migration_size")},
 }
 
 ALIASES = {
@@ -117,6 +251,207 @@ ALIASES = {
 }
 
 
+# Caché por proceso: cada worker carga módulos e instancias una sola vez
+_MODULES = {}
+_INSTANCES = {}
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+
+def load_modules(args) -> dict:
+    paths = (("ent1", args.algo_ent1), ("sa", args.algo_sa), ("ils", args.algo_ils), ("ga", args.algo_ga))
+    if paths not in _MODULES:
+        modules = {}
+        for key, path in paths:
+            try:
+                modules[key] = load_module_from(path, f"{key}_mod")
+            except Exception as e:
+                print(f"Warning: no pude cargar el módulo {key} ({path}): {e}")
+                modules[key] = None
+        _MODULES[paths] = modules
+    return _MODULES[paths]
+
+
+def load_instance(inst_path: str) -> dict:
+    if inst_path not in _INSTANCES:
+        with open(inst_path, "r", encoding="utf-8") as jf:
+            _INSTANCES[inst_path] = json.load(jf)
+    return _INSTANCES[inst_path]
+
+
+def run_task(task):
+    """
+    Corre una celda (instancia, método, semilla) y devuelve (fila, error).
+    `runtime_sec` mide sólo la corrida dentro del proceso que la ejecuta. Con
+    --task-timeout la celda se interrumpe con SIGALRM (donde exista) y se
+    reporta como error sin detener el resto del lote.
+    """
+    inst_path, method_key, seed, args = task
+    config = METHOD_CONFIG[method_key]
+    mod = load_modules(args)[config["module"]]
+    base = os.path.basename(inst_path)
+    instance = load_instance(inst_path)
+    use_alarm = bool(args.task_timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, args.task_timeout)
+    t0 = time.perf_counter()
+    try:
+        assignment, iterations = config["runner"](mod, instance, seed, args)
+        c1, c2, c3 = mod.score_solution_lex(instance, assignment)
+        dt = time.perf_counter() - t0
+    except TaskTimeout:
+        return None, f"Timeout ({args.task_timeout}s) ejecutando {config['label']} en {base} (seed {seed})"
+    except Exception as e:
+        return None, f"Error ejecutando {config['label']} en {base} (seed {seed}): {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return [base, config["label"], seed, iterations, args.top_k, c1, c2, c3, round(dt, 6)], None
+
+
+# Holgura sobre --task-timeout con la que el proceso principal da por colgado a un worker
+TIMEOUT_MARGIN = 5.0
+
+
+def _task_error(task, what: str, detail: str = "") -> str:
+    inst_path, method_key, seed, _ = task
+    message = f"{what} ejecutando {METHOD_CONFIG[method_key]['label']} en {os.path.basename(inst_path)} (seed {seed})"
+    return f"{message}: {detail}" if detail else message
+
+
+def _kill_pool(pool: ProcessPoolExecutor, before: set) -> None:
+    """
+    Termina los workers (uno puede estar colgado en código C) y descarta las
+    tareas pendientes. Los workers son los procesos hijos que no existían
+    antes de crear el pool (`before`: sus pids).
+    """
+    for proc in multiprocessing.active_children():
+        if proc.pid not in before:
+            proc.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_tasks(tasks, jobs: int, task_timeout=None):
+    """
+    Genera (fila, error) en el orden de `tasks`. Con jobs > 1 las celdas corren
+    en un pool de procesos; los resultados se entregan en orden de envío, así
+    que el CSV queda igual que en la corrida secuencial. Con `task_timeout`,
+    además de SIGALRM dentro del worker, el proceso principal espera cada
+    resultado a lo sumo `task_timeout + TIMEOUT_MARGIN` segundos: si vence
+    (worker colgado o plataforma sin SIGALRM) la celda se reporta como
+    timeout, se terminan los workers y las celdas restantes siguen en un
+    pool nuevo (las ya terminadas no se recalculan).
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield run_task(task)
+        return
+    wait = task_timeout + TIMEOUT_MARGIN if task_timeout else None
+    done = {}
+    i = 0
+    while i < len(tasks):
+        before = {proc.pid for proc in multiprocessing.active_children()}
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        futures = {k: pool.submit(run_task, tasks[k]) for k in range(i, len(tasks)) if k not in done}
+        hung = False
+        try:
+            while i < len(tasks):
+                if i in done:
+                    yield done.pop(i)
+                    i += 1
+                    continue
+                try:
+                    result = futures[i].result(timeout=wait)
+                except FuturesTimeout:
+                    hung = True
+                    yield None, _task_error(tasks[i], f"Timeout ({task_timeout}s, worker sin responder)")
+                    i += 1
+                    break
+                except Exception as e:
+                    # El worker murió (p. ej. sin memoria): se pierde la celda, no el lote
+                    result = None, _task_error(tasks[i], "Error", repr(e))
+                yield result
+                i += 1
+        finally:
+            if hung:
+                for k, future in futures.items():
+                    if k >= i and future.done() and not future.cancelled() and future.exception() is None:
+                        done[k] = future.result()
+                _kill_pool(pool, before)
+            else:
+                pool.shutdown()
+
+
+# ---------- Caché de celdas direccionada por contenido ----------
+def _sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_fingerprint(module_path: str) -> str:
+    """
+    Huella del código de un solver: su archivo más todos los `.py` de su
+    carpeta (los módulos auxiliares de `instances/` que importa).
+    """
+    module_path = resolve_path(module_path)
+    h = hashlib.sha256()
+    for path in [module_path] + sorted(glob.glob(os.path.join(os.path.dirname(module_path), "*.py"))):
+        h.update(os.path.basename(path).encode())
+        h.update(_sha256_file(path).encode())
+    return h.hexdigest()
+
+
+def config_hash(code_hash: str, method_key: str, args) -> str:
+    """
+    Hash de una configuración: código del solver, runner (y las funciones
+    comunes que fijan el límite de tiempo, la escalarización y la corrida de
+    la celda), método e hiperparámetros que usa.
+    """
+    config = METHOD_CONFIG[method_key]
+    payload = {
+        "code": code_hash,
+        "runner": inspect.getsource(config["runner"]),
+        "helpers": [inspect.getsource(f) for f in (run_task, run_deadline, lex_to_scalar)],
+        "method": method_key,
+        "params": {p: getattr(args, p) for p in config["params"]},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def cell_key(instance_hash: str, config: str, seed: int) -> str:
+    """Llave de una celda: hash de la instancia, de la configuración y la semilla."""
+    return hashlib.sha256(f"{instance_hash}:{config}:{seed}".encode()).hexdigest()
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def cache_get(cache_dir: str, key: str):
+    try:
+        with open(_cache_path(cache_dir, key), "r", encoding="utf-8") as f:
+            return json.load(f)["row"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def cache_put(cache_dir: str, key: str, row) -> None:
+    # Escritura atómica: una corrida interrumpida no deja entradas a medias
+    path = _cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"row": row}, f)
+    os.replace(tmp, path)
+
+
 def normalize_methods(method_arg: str) -> list[str]:
     if not method_arg:
         return ["sa", "ils"]
@@ -136,21 +471,51 @@ def main():
     parser = argparse.ArgumentParser(description="Run batch experiments on all heuristics")
     parser.add_argument("--instances-glob", default="instances/instance*.json", help="Glob para instancias")
     parser.add_argument("--methods", default="ent1_local,ent1_sa,sa,ils,ga",
-                        help="Lista separada por comas de métodos (ent1_local, ent1_sa, sa, ils, ga)")
+                        help="Lista separada por comas de métodos (ent1_local, ent1_sa, ent1_pt, staged, sa, sa_chains, ils, tabu, alns, ga)")
     parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--c1-matching", action="store_true",
+                        help="Constructivo completado a C1 óptimo por día (Hopcroft–Karp) en todos los métodos")
     parser.add_argument("--local-iters", type=int, default=1000)
     parser.add_argument("--ent1-sa-iters", type=int, default=200)
+    parser.add_argument("--staged-rounds", type=int, default=10)
+    parser.add_argument("--pt-replicas", type=int, default=8,
+                        help="Réplicas del método ent1_pt (temperaturas geométricas entre --sa-tfinal y --sa-tinit)")
+    parser.add_argument("--pt-rounds", type=int, default=100)
+    parser.add_argument("--pt-exchange-every", type=int, default=200)
+    parser.add_argument("--pt-workers", type=int, default=1,
+                        help="Procesos para las réplicas de ent1_pt (no cambia el resultado; con --jobs conviene dejar 1)")
     parser.add_argument("--sa-iters", type=int, default=1000)
     parser.add_argument("--sa-tinit", type=float, default=200.0)
     parser.add_argument("--sa-tfinal", type=float, default=1.0)
     parser.add_argument("--sa-alpha", type=float, default=0.95)
+    parser.add_argument("--sa-chains", type=int, default=32,
+                        help="Cadenas del método sa_chains (recocido vectorizado con NumPy)")
     parser.add_argument("--ils-iters", type=int, default=20)
     parser.add_argument("--ls-iters", type=int, default=500)
     parser.add_argument("--perturb-k", type=int, default=3)
+    parser.add_argument("--tabu-iters", type=int, default=500)
+    parser.add_argument("--tabu-candidates", type=int, default=50)
+    parser.add_argument("--tabu-tenure", type=int, default=10)
+    parser.add_argument("--alns-iters", type=int, default=1000)
     parser.add_argument("--ga-ngen", type=int, default=30)
     parser.add_argument("--ga-pop", type=int, default=20)
     parser.add_argument("--ga-cxpb", type=float, default=0.7)
     parser.add_argument("--ga-mutpb", type=float, default=0.2)
+    parser.add_argument("--ga-islands", type=int, default=1,
+                        help="GA de islas (run_island_ga) con este número de poblaciones; 1 = GA clásico")
+    parser.add_argument("--ga-migration-every", type=int, default=5)
+    parser.add_argument("--ga-migration-size", type=int, default=1)
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Límite de tiempo en segundos por corrida (cada solver devuelve su mejor solución al vencer)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Procesos en paralelo; cada (instancia, método, semilla) es una tarea. Usar a lo sumo un job por núcleo para que runtime_sec no se infle por contención")
+    parser.add_argument("--task-timeout", type=float, default=None,
+                        help="Tiempo máximo en segundos por tarea; la tarea se descarta y el lote sigue (SIGALRM en el worker; con --jobs > 1 el proceso principal además termina a los workers colgados)")
+    parser.add_argument("--cache-dir", default="results/cache",
+                        help="Caché de celdas por hash de (instancia, código del solver, método, semilla, hiperparámetros); sólo se recalculan las celdas nuevas o invalidadas. No se usa con --time-limit")
+    parser.add_argument("--no-cache", action="store_true", help="Recalcula todas las celdas sin leer ni escribir la caché")
+    parser.add_argument("--db", default=None,
+                        help="Además del CSV, guarda cada corrida en esta base SQLite (p. ej. results/experiments.sqlite)")
     parser.add_argument("--seeds", default=None, help="Semillas separadas por coma")
     parser.add_argument("--num-seeds", type=int, default=5)
     parser.add_argument("--seed-start", type=int, default=1)
@@ -166,13 +531,7 @@ def main():
         print("No instances found for glob:", args.instances_glob)
         return 1
 
-    modules = {}
-    for key, path in [("ent1", args.algo_ent1), ("sa", args.algo_sa), ("ils", args.algo_ils), ("ga", args.algo_ga)]:
-        try:
-            modules[key] = load_module_from(path, f"{key}_mod")
-        except Exception as e:
-            print(f"Warning: no pude cargar el módulo {key} ({path}): {e}")
-            modules[key] = None
+    modules = load_modules(args)
 
     seeds = parse_seeds(args.seeds, args.num_seeds, args.seed_start)
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
@@ -180,33 +539,69 @@ def main():
     header = ["instance", "method", "seed", "iters", "top_k", "C1", "C2", "C3", "runtime_sec"]
     methods = normalize_methods(args.methods)
 
+    # Con --time-limit el resultado depende del reloj: una entrada de caché
+    # repetiría una muestra como si fuera determinista
+    use_cache = not args.no_cache and not args.time_limit
+    if args.time_limit and not args.no_cache:
+        print("--time-limit: resultados dependientes del tiempo, no se usa la caché de celdas")
+    module_paths = {"ent1": args.algo_ent1, "sa": args.algo_sa, "ils": args.algo_ils, "ga": args.algo_ga}
+    code_hashes = {}
+    configs = {}
+    tasks, keys, task_configs = [], [], []
+    for inst_path in inst_files:
+        base = os.path.basename(inst_path)
+        instance_hash = _sha256_file(inst_path)
+        for method_key in methods:
+            config = METHOD_CONFIG[method_key]
+            if modules.get(config["module"]) is None:
+                print(f"Skipping {base} {config['label']}: módulo no disponible")
+                continue
+            if method_key not in configs:
+                if config["module"] not in code_hashes:
+                    code_hashes[config["module"]] = code_fingerprint(module_paths[config["module"]])
+                configs[method_key] = config_hash(code_hashes[config["module"]], method_key, args)
+            for seed in seeds:
+                tasks.append((inst_path, method_key, seed, args))
+                keys.append(cell_key(instance_hash, configs[method_key], seed))
+                task_configs.append(configs[method_key])
+
+    cached = {}
+    if use_cache:
+        for key in keys:
+            row = cache_get(args.cache_dir, key)
+            if row is not None:
+                cached[key] = row
+    pending = [task for task, key in zip(tasks, keys) if key not in cached]
+    results = run_tasks(pending, args.jobs, args.task_timeout)
+    db = connect_db(args.db) if args.db else None
+
+    # Las filas de caché y las recién calculadas se intercalan en el orden de las tareas
     with open(args.out, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(header)
-
-        for inst_path in inst_files:
-            with open(inst_path, "r", encoding="utf-8") as jf:
-                instance = json.load(jf)
-
-            base = os.path.basename(inst_path)
-            for method_key in methods:
-                config = METHOD_CONFIG[method_key]
-                mod = modules.get(config["module"])
-                if mod is None:
-                    print(f"Skipping {base} {config['label']}: módulo no disponible")
-                    continue
-                for seed in seeds:
-                    t0 = time.perf_counter()
-                    try:
-                        assignment, iterations = config["runner"](mod, instance, seed, args)
-                        c1, c2, c3 = mod.score_solution_lex(instance, assignment)
-                    except Exception as e:
-                        print(f"Error ejecutando {config['label']} en {base} (seed {seed}): {e}")
-                        continue
-                    dt = time.perf_counter() - t0
-                    w.writerow([base, config["label"], seed, iterations, args.top_k, c1, c2, c3, round(dt, 6)])
-                    f.flush()
-
+        for key, config in zip(keys, task_configs):
+            if key in cached:
+                row, error = cached[key], None
+            else:
+                row, error = next(results)
+                if error is None and use_cache:
+                    cache_put(args.cache_dir, key, row)
+            if error is not None:
+                print(error)
+                continue
+            w.writerow(row)
+            f.flush()
+            if db is not None:
+                insert_run(db, row, config_hash=config, cell_key=key)
+                db.commit()
+    if db is not None:
+        db.close()
+        print("Wrote:", args.db)
+        for method_key, config in configs.items():
+            print(f"  config_hash {METHOD_CONFIG[method_key]['label']}: {config[:12]}")
+
+    if use_cache:
+        print(f"Celdas: {len(tasks)} ({len(tasks) - len(pending)} desde caché, {len(pending)} calculadas)")
     print("Wrote:", args.out)
     return 0
 
@@ -1,9 +1,10 @@
 import argparse
 import csv
 import os
-from collections import defaultdict
 import statistics
 
+from results_db import connect as connect_db, summary_rows
+
 
 def lex_better(a, b):
     # a, b are (C1, C2, C3)
@@ -20,6 +21,8 @@ def map_method_label(method: str) -> str:
         return method
     if "ga" == m:
         return "GA"
+    if m == "sa_chains":
+        return "SA_CHAINS"
     if "ils" in m:
         return "ILS"
     if "sa" in m or "sim" in m or "recoc" in m or "anneal" in m:
@@ -33,29 +36,207 @@ def map_method_label(method: str) -> str:
     return method
 
 
+class P2Quantile:
+    """
+    Cuantil aproximado en memoria constante con el algoritmo P² (Jain y
+    Chlamtac, 1985): cinco marcadores cuyas alturas se ajustan con
+    interpolación parabólica. Con 5 valores o menos el cuantil es exacto.
+    """
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.q = []  # alturas de los marcadores
+        self.n = [1, 2, 3, 4, 5]  # posiciones reales
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.step = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        q, n = self.q, self.n
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.step[i]
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    # La parábola se sale del intervalo: interpolación lineal
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def value(self) -> float:
+        if self.count == 0:
+            return float("nan")
+        if self.count <= 5:
+            pos = self.p * (self.count - 1)
+            lo = int(pos)
+            hi = min(lo + 1, self.count - 1)
+            return self.q[lo] + (pos - lo) * (self.q[hi] - self.q[lo])
+        return self.q[2]
+
+
+class RunningStats:
+    """Media y varianza de Welford, mínimo, máximo y suma exacta de una columna."""
+
+    __slots__ = ("n", "mean", "m2", "min", "max", "total")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.total = 0
+
+    def add(self, x) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None or x < self.min else self.min
+        self.max = x if self.max is None or x > self.max else self.max
+        self.total += x
+
+    def std(self) -> float:
+        return (self.m2 / (self.n - 1)) ** 0.5 if self.n > 1 else 0.0
+
+
+class GroupAccumulator:
+    """
+    Acumuladores en línea de un (instancia, método): estadísticas de C1, C2,
+    C3 y runtime, mejor corrida lexicográfica (gana la primera en empate) y
+    cuantiles de runtime. Su memoria no depende del número de corridas.
+    """
+
+    QUANTILES = (0.5, 0.9)
+
+    def __init__(self):
+        self.c = [RunningStats(), RunningStats(), RunningStats()]
+        self.runtime = RunningStats()
+        self.runtime_q = [P2Quantile(p) for p in self.QUANTILES]
+        self.best = None
+        self.best_seed = ""
+
+    def add(self, score, runtime: float, seed: str) -> None:
+        for stats, x in zip(self.c, score):
+            stats.add(x)
+        self.runtime.add(runtime)
+        for q in self.runtime_q:
+            q.add(runtime)
+        if self.best is None or score > self.best:
+            self.best = score
+            self.best_seed = seed
+
+    def summary(self, inst: str, method: str) -> dict:
+        # Los promedios salen de las sumas (no de la media de Welford) para
+        # reproducir exactamente el resumen histórico
+        n = self.runtime.n
+        return {
+            "instance": inst, "method": method, "runs": n,
+            "avg_C1": self.c[0].total / n, "avg_C2": self.c[1].total / n, "avg_C3": self.c[2].total / n,
+            "best_C1": self.best[0], "best_C2": self.best[1], "best_C3": self.best[2],
+            "avg_runtime_sec": self.runtime.total / n,
+            "best_seed": self.best_seed,
+        }
+
+    def stats(self, inst: str, method: str) -> dict:
+        row = {"instance": inst, "method": method, "runs": self.runtime.n}
+        for name, st in zip(("C1", "C2", "C3", "runtime_sec"), self.c + [self.runtime]):
+            row[f"mean_{name}"] = st.mean
+            row[f"std_{name}"] = st.std()
+            row[f"min_{name}"] = st.min
+            row[f"max_{name}"] = st.max
+        for p, q in zip(self.QUANTILES, self.runtime_q):
+            row[f"p{round(p * 100)}_runtime_sec"] = q.value()
+        return row
+
+
+def accumulate_csv(path: str) -> dict:
+    """
+    Lee experiments.csv fila por fila y devuelve {(instancia, método mapeado):
+    GroupAccumulator}; la memoria crece con el número de grupos, no de corridas.
+    """
+    groups = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # método mapeado a SA/ILS cuando aplique
+            key = (row["instance"], map_method_label(row.get("method", "")))
+            acc = groups.get(key)
+            if acc is None:
+                acc = groups[key] = GroupAccumulator()
+            acc.add((int(row["C1"]), int(row["C2"]), int(row["C3"])), float(row["runtime_sec"]), row.get("seed", ""))
+    return groups
+
+
+def summarize_csv(path: str) -> list:
+    """Resumen por (instancia, método mapeado) leyendo experiments.csv en streaming."""
+    return [acc.summary(inst, method) for (inst, method), acc in sorted(accumulate_csv(path).items())]
+
+
+def write_stats_csv(path: str, groups: dict) -> None:
+    rows = [acc.stats(inst, method) for (inst, method), acc in sorted(groups.items())]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if not rows:
+            return
+        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        w.writeheader()
+        for row in rows:
+            w.writerow({k: round(v, 6) if isinstance(v, float) else v for k, v in row.items()})
+
+
+def summarize_db(path: str, config_hash=None) -> list:
+    """Mismo resumen con agregados SQL sobre la base de resultados (ver results_db.py)."""
+    conn = connect_db(path)
+    try:
+        return summary_rows(conn, label_fn=map_method_label, config_hash=config_hash)
+    finally:
+        conn.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Summarize experiments.csv")
     parser.add_argument("--in", dest="infile", default="results/experiments.csv")
+    parser.add_argument("--db", default=None,
+                        help="Resume desde la base SQLite de run_experiments.py --db en lugar del CSV")
+    parser.add_argument("--config-hash", default=None,
+                        help="Con --db, resume sólo las corridas de esta configuración (prefijo del hash)")
     parser.add_argument("--out-csv", default="results/summary.csv")
     parser.add_argument("--out-md", default="results/summary.md")
+    parser.add_argument("--out-stats", default=None,
+                        help="CSV adicional con media/desviación (Welford), mín/máx de C1, C2, C3 y runtime, y cuantiles p50/p90 de runtime (sólo desde CSV)")
     args = parser.parse_args()
 
-    rows = []
-    with open(args.infile, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            row["C1"] = int(row["C1"]) ; row["C2"] = int(row["C2"]) ; row["C3"] = int(row["C3"])
-            row["iters"] = int(row["iters"]) ; row["top_k"] = int(row["top_k"]) ; row["runtime_sec"] = float(row["runtime_sec"])
-            # método mapeado a SA/ILS cuando aplique
-            row["method_mapped"] = map_method_label(row.get("method", ""))
-            rows.append(row)
+    for path in (args.out_csv, args.out_md, args.out_stats):
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
 
-    by_key = defaultdict(list)  # (instance, method) -> rows
-    for row in rows:
-        # agrupar por método mapeado (SA / ILS / otros)
-        by_key[(row["instance"], row["method_mapped"])].append(row)
+    if args.db:
+        summary = summarize_db(args.db, args.config_hash)
+    else:
+        groups = accumulate_csv(args.infile)
+        summary = [acc.summary(inst, method) for (inst, method), acc in sorted(groups.items())]
+        if args.out_stats:
+            write_stats_csv(args.out_stats, groups)
 
-    os.makedirs(os.path.dirname(args.out_csv), exist_ok=True)
     # Write CSV summary
     with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -63,20 +244,15 @@ def main():
             "instance", "method", "runs", "avg_C1", "avg_C2", "avg_C3", "best_C1", "best_C2", "best_C3", "avg_runtime_sec", "best_seed"
         ])
         summaries = {}
-        for (inst, method), lst in sorted(by_key.items()):
-            n = len(lst)
-            avg_c1 = sum(int(r["C1"]) for r in lst) / n
-            avg_c2 = sum(int(r["C2"]) for r in lst) / n
-            avg_c3 = sum(int(r["C3"]) for r in lst) / n
-            avg_rt = sum(float(r["runtime_sec"]) for r in lst) / n
-            # elegir mejor por lexicográfico (C1, C2, C3)
-            best = max(lst, key=lambda r: (int(r["C1"]), int(r["C2"]), int(r["C3"])))
+        for s in summary:
             w.writerow([
-                inst, method, n,
-                round(avg_c1, 3), round(avg_c2, 3), round(avg_c3, 3),
-                int(best["C1"]), int(best["C2"]), int(best["C3"]), round(avg_rt, 6), best.get("seed", "")
+                s["instance"], s["method"], s["runs"],
+                round(s["avg_C1"], 3), round(s["avg_C2"], 3), round(s["avg_C3"], 3),
+                s["best_C1"], s["best_C2"], s["best_C3"], round(s["avg_runtime_sec"], 6), s["best_seed"]
             ])
-            summaries[(inst, method)] = {"avg": (avg_c1, avg_c2, avg_c3), "best": (int(best["C1"]), int(best["C2"]), int(best["C3"])), "avg_rt": avg_rt}
+            summaries[(s["instance"], s["method"])] = {"avg": (s["avg_C1"], s["avg_C2"], s["avg_C3"]),
+                                                       "best": (s["best_C1"], s["best_C2"], s["best_C3"]),
+                                                       "avg_rt": s["avg_runtime_sec"]}
 
     # Write Markdown summary for quick view
     with open(args.out_md, "w", encoding="utf-8") as f:
@@ -105,6 +281,8 @@ def main():
         
     print("Wrote:", args.out_csv)
     print("Wrote:", args.out_md)
+    if args.out_stats and not args.db:
+        print("Wrote:", args.out_stats)
     return 0
 
 
@@ -0,0 +1,24 @@
+# Utilidades compartidas por las pruebas
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+#
+# Los módulos viven en instances/ y scripts/ y se importan entre sí
+# directamente, así que las pruebas agregan esas carpetas al path igual que
+# los scripts.
+
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSTANCES_DIR = os.path.join(ROOT, "instances")
+sys.path.append(INSTANCES_DIR)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+# Instancias pequeñas: las pruebas recorren miles de movimientos en cada una
+SMALL_INSTANCES = ["instance1.json", "instance2.json", "instance3.json"]
+
+
+def load_instance(name: str) -> dict:
+    with open(os.path.join(INSTANCES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
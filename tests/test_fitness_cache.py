@@ -0,0 +1,92 @@
+# Propiedad: el hash Zobrist incremental es el de recalcularlo desde cero
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import random
+
+import pytest
+
+from conftest import SMALL_INSTANCES, load_instance
+from compact_assignment import Assignment
+from constructive import constructive_rows
+from entrega2_ILS import (constructive_assignment, iterated_local_search, local_search_swaps_hillclimb,
+                          perturbation_consolidate, perturbation_k_swaps)
+from fitness_cache import FitnessCache, zobrist_hash
+from incremental_eval import IncrementalEvaluator
+from problem_index import compile_instance
+from relocate import random_relocation
+
+
+@pytest.mark.parametrize("name", SMALL_INSTANCES)
+def test_incremental_hash_matches_recomputation(name):
+    """Swaps, reubicaciones, undo, snapshot y restore mantienen `zobrist()` igual a `zobrist_hash(seats)`."""
+    index = compile_instance(load_instance(name))
+    rng = random.Random(5)
+    assignment = Assignment.from_dict(index, index.decode(constructive_rows(index, seed=5)))
+    evaluator = IncrementalEvaluator(assignment)
+    assignment.zobrist()
+    pending = 0
+    snap = None
+    for _ in range(1500):
+        op = rng.random()
+        if op < 0.4:
+            day = rng.randrange(index.n_days)
+            seated = assignment.assigned(day)
+            if len(seated) < 2:
+                continue
+            evaluator.apply_swap(day, *rng.sample(seated, 2))
+            pending += 1
+        elif op < 0.7:
+            move = random_relocation(assignment, rng)
+            if move is None:
+                continue
+            evaluator.apply_relocate(*move)
+            pending += 1
+        elif op < 0.85:
+            if pending:
+                evaluator.undo()
+                pending -= 1
+        elif op < 0.95:
+            evaluator.commit()
+            pending = 0
+            snap = assignment.snapshot()
+            assert snap.zobrist() == assignment.zobrist()
+        elif snap is not None:
+            assignment.restore(snap)
+            evaluator = IncrementalEvaluator(assignment)
+            pending = 0
+        assert assignment.zobrist() == zobrist_hash(assignment.seats)
+
+
+def test_cache_is_bounded_lru():
+    cache = FitnessCache(2)
+    cache.put(1, (1, 0, 0))
+    cache.put(2, (2, 0, 0))
+    assert cache.get(1) == (1, 0, 0)
+    cache.put(3, (3, 0, 0))
+    assert cache.get(2) is None
+    assert len(cache) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("name", SMALL_INSTANCES)
+@pytest.mark.parametrize("perturb", [perturbation_k_swaps, perturbation_consolidate])
+def test_ils_with_cache_matches_plain_ils(name, perturb):
+    """ILS sobre `Assignment` con caché devuelve lo mismo que ILS sobre dicts y consulta una vez por óptimo."""
+    instance = load_instance(name)
+    initial = constructive_assignment(instance, seed=2)
+    kwargs = dict(evaluar=None, local_search_func=local_search_swaps_hillclimb, perturb_func=perturb,
+                  max_iters=30, ls_iters=200, seed=9)
+    plain = iterated_local_search(instance, initial, **kwargs)
+    cache = FitnessCache(64)
+    cached = iterated_local_search(instance, initial, fitness_cache=cache, **kwargs)
+    assert cached == plain
+    assert cache.hits + cache.misses == 31
+
+
+def test_cache_requires_incremental_mode():
+    instance = load_instance("instance1.json")
+    with pytest.raises(ValueError):
+        iterated_local_search(instance, constructive_assignment(instance), evaluar=lambda s: 0,
+                              local_search_func=local_search_swaps_hillclimb, perturb_func=perturbation_k_swaps,
+                              fitness_cache=FitnessCache())
@@ -0,0 +1,39 @@
+# Propiedad: el GA arrastra bien los puntajes por día de cada hijo
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import random
+from collections import Counter
+
+import pytest
+
+from conftest import SMALL_INSTANCES, load_instance
+from entrega3 import _initial_population, _next_generation, _score_all, _total
+from problem_index import compile_instance
+
+
+@pytest.mark.parametrize("name", SMALL_INSTANCES)
+@pytest.mark.parametrize("relocate_prob", [0.0, 0.5])
+def test_next_generation_day_scores_match_rescoring(name, relocate_prob):
+    """
+    Tras cruces y mutaciones (swap y reubicación), los puntajes por día que
+    `_next_generation` hereda y corrige con deltas son los de re-puntuar cada
+    hijo desde cero, y los totales son su suma.
+    """
+    instance = load_instance(name)
+    index = compile_instance(instance)
+    rng = random.Random(3)
+    population = _initial_population(instance, index, 12, rng, top_k_pref=3, c1_optimal=False)
+    day_scores = _score_all(population)
+    scores = [_total(days) for days in day_scores]
+    stats = Counter()
+
+    for _ in range(15):
+        population, day_scores, scores = _next_generation(
+            population, day_scores, scores, 12, cxpb=0.9, mutpb=0.9, rng=rng,
+            relocate_prob=relocate_prob, stats=stats)
+        assert day_scores == _score_all(population)
+        assert scores == [ind.score() for ind in population]
+
+    assert stats["children"] == 15 * 12
+    assert stats["delta_evals"] > 0
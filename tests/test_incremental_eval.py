@@ -0,0 +1,73 @@
+# Propiedad: los contadores incrementales coinciden con el re-puntaje completo
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import random
+
+import pytest
+
+from conftest import SMALL_INSTANCES, load_instance
+from compact_assignment import Assignment
+from constructive import constructive_rows
+from incremental_eval import IncrementalEvaluator, swap_delta
+from problem_index import compile_instance
+from relocate import random_relocation, relocate_delta
+
+
+def _add(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+@pytest.mark.parametrize("name", SMALL_INSTANCES)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_random_moves_match_full_score(name, seed):
+    """
+    Secuencias al azar de swap, reubicación, undo y commit: tras cada paso el
+    puntaje del evaluador (total y por día) es el de `ProblemIndex.score`, y
+    cada delta predicho es la diferencia real de puntaje.
+    """
+    index = compile_instance(load_instance(name))
+    rng = random.Random(seed)
+    rows = constructive_rows(index, seed=seed)
+    assignment = Assignment.from_dict(index, index.decode(rows))
+    evaluator = IncrementalEvaluator(assignment)
+    history = []  # puntaje antes de cada movimiento sin confirmar
+
+    for _ in range(2000):
+        before = evaluator.score
+        op = rng.random()
+        if op < 0.45:
+            day = rng.randrange(index.n_days)
+            seated = assignment.assigned(day)
+            if len(seated) < 2:
+                continue
+            a, b = rng.sample(seated, 2)
+            delta = evaluator.swap_delta(day, a, b)
+            assert swap_delta(assignment, day, a, b) == delta
+            evaluator.apply_swap(day, a, b)
+        elif op < 0.75:
+            move = random_relocation(assignment, rng)
+            if move is None:
+                continue
+            day, e, d = move
+            delta = evaluator.relocate_delta(day, e, d)
+            assert relocate_delta(assignment, day, e, d) == delta
+            # relocate_delta sin estado no debe dejar la fila modificada
+            assert evaluator.score == index.score(assignment.rows())
+            evaluator.apply_relocate(day, e, d)
+        elif op < 0.9:
+            if not history:
+                continue
+            evaluator.undo()
+            assert evaluator.score == history.pop()
+            continue
+        else:
+            evaluator.commit()
+            history.clear()
+            continue
+        history.append(before)
+        assert evaluator.score == _add(before, delta)
+        assert evaluator.score == index.score(assignment.rows())
+
+    for day, row in enumerate(assignment.rows()):
+        assert evaluator.day_score(day) == index.score_day(row)
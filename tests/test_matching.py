@@ -0,0 +1,68 @@
+# Propiedad: Hopcroft–Karp encuentra el emparejamiento máximo
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import random
+from functools import lru_cache
+
+import pytest
+
+from conftest import load_instance
+from constructive import c1_optimal_rows
+from matching import UNMATCHED, hopcroft_karp
+from problem_index import compile_instance
+
+
+def brute_force_size(adj, n_right):
+    """Tamaño del emparejamiento máximo probando todas las opciones (bitmask de derechos usados)."""
+    @lru_cache(maxsize=None)
+    def best(u, used):
+        if u == len(adj):
+            return 0
+        result = best(u + 1, used)
+        for v in adj[u]:
+            if not used >> v & 1:
+                result = max(result, 1 + best(u + 1, used | 1 << v))
+        return result
+
+    return best(0, 0)
+
+
+def check_matching(adj, n_right, match):
+    assert len(match) == len(adj)
+    taken = [v for v in match if v != UNMATCHED]
+    assert len(taken) == len(set(taken))
+    for u, v in enumerate(match):
+        assert v == UNMATCHED or (0 <= v < n_right and v in adj[u])
+    return len(taken)
+
+
+def test_size_matches_brute_force():
+    """Grafos bipartitos al azar de hasta 7×7, sin y con emparejamiento inicial."""
+    for seed in range(300):
+        rng = random.Random(seed)
+        n_left, n_right = rng.randint(0, 7), rng.randint(0, 7)
+        density = rng.random()
+        adj = [sorted(v for v in range(n_right) if rng.random() < density) for _ in range(n_left)]
+        expected = brute_force_size(adj, n_right)
+        assert check_matching(adj, n_right, hopcroft_karp(adj, n_right)) == expected
+
+        # Con un emparejamiento inicial voraz: se aumenta, nadie emparejado lo pierde
+        initial, used = [], set()
+        for u in range(n_left):
+            free = [v for v in adj[u] if v not in used and rng.random() < 0.5]
+            initial.append(free[0] if free else UNMATCHED)
+            used.update(free[:1])
+        match = hopcroft_karp(adj, n_right, initial)
+        assert check_matching(adj, n_right, match) == expected
+        assert all(match[u] != UNMATCHED for u, v in enumerate(initial) if v != UNMATCHED)
+
+
+@pytest.mark.parametrize("name", ["instance1.json", "instance2.json"])
+def test_c1_optimal_rows_reach_max_c1(name):
+    """En instancias pequeñas el constructivo C1-óptimo alcanza el C1 máximo de cada día."""
+    index = compile_instance(load_instance(name))
+    rows = c1_optimal_rows(index, seed=7)
+    for day, row in enumerate(rows):
+        adj = [index.pref_list[e] for e in index.present_list[day]]
+        assert index.score_day(row)[0] == brute_force_size(adj, len(index.desks))
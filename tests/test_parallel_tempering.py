@@ -0,0 +1,27 @@
+# Propiedad: parallel tempering respeta el límite de tiempo
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import time
+
+import pytest
+
+from conftest import load_instance
+from deadline import deadline_after
+from entrega2_ILS import constructive_assignment
+from parallel_tempering import parallel_tempering
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_short_deadline_stops_rounds(workers):
+    """Con rondas de sobra y un plazo de 0.5 s, PT devuelve dentro del presupuesto."""
+    instance = load_instance("instance5.json")
+    initial = constructive_assignment(instance, seed=1)
+    start = time.monotonic()
+    assignment, stats = parallel_tempering(instance, initial, replicas=4, rounds=10**6,
+                                           deadline=deadline_after(0.5), workers=workers)
+    elapsed = time.monotonic() - start
+    # Margen para crear el pool de procesos y terminar la ronda en curso
+    assert elapsed < 2.0
+    assert 1 <= stats["rounds"] < 10**6
+    assert set(assignment) == set(initial)
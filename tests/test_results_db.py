@@ -0,0 +1,24 @@
+# Propiedad: reimportar un CSV no duplica corridas en la base
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import csv
+
+from results_db import CSV_HEADER, connect, import_csv, summary_rows
+
+
+def test_reimport_replaces_rows(tmp_path):
+    path = tmp_path / "experiments.csv"
+    rows = [["instance1.json", "SA", seed, 100, 3, 39, 30 + seed, -7, 0.5] for seed in (1, 2, 3)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_HEADER)
+        w.writerows(rows)
+
+    conn = connect(str(tmp_path / "runs.sqlite"))
+    assert import_csv(conn, str(path)) == 3
+    assert import_csv(conn, str(path)) == 3
+    assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 3
+    summary = summary_rows(conn)
+    assert summary[0]["runs"] == 3 and summary[0]["best_C2"] == 33
+    conn.close()
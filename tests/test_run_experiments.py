@@ -0,0 +1,27 @@
+# Propiedad: un worker colgado no detiene el lote de run_experiments
+# Autores: [Alejandro Arango, Juan Jose Munoz]
+# Universidad EAFIT - 2025
+
+import multiprocessing
+import time
+
+import run_experiments
+
+
+def _fake_task(task):
+    # La semilla 0 simula un worker colgado que no atiende SIGALRM
+    if task[2] == 0:
+        time.sleep(60)
+    return [task[2]], None
+
+
+def test_hung_worker_is_killed_and_batch_continues(monkeypatch):
+    monkeypatch.setattr(run_experiments, "run_task", _fake_task)
+    monkeypatch.setattr(run_experiments, "TIMEOUT_MARGIN", 0.5)
+    tasks = [("instance1.json", "sa", seed, None) for seed in (1, 0, 2, 3)]
+    start = time.monotonic()
+    results = list(run_experiments.run_tasks(tasks, jobs=2, task_timeout=0.1))
+    assert time.monotonic() - start < 10
+    assert [row for row, _ in results] == [[1], None, [2], [3]]
+    assert "Timeout" in results[1][1]
+    assert not multiprocessing.active_children()